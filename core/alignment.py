@@ -0,0 +1,250 @@
+"""
+alignment.py — tempos reais de cada palavra da narração para as legendas.
+
+`generate_ass_from_text` sem alinhamento reparte a duração pelas palavras
+proporcionalmente ao número de letras, e as legendas escorregam em narrações
+longas (pausas, números, ritmo do TTS). Duas fontes de tempo real:
+
+  - edge-tts: os eventos WordBoundary do stream (offset/duração por palavra)
+    são guardados por `save_boundaries` junto do hash do áudio gerado
+  - alinhador offline por energia: em WAVs PCM (Gemini TTS, uploads) detecta
+    os trechos com voz e distribui as palavras só pelo tempo falado, então
+    pausas entre frases deixam de empurrar as legendas
+
+O resultado fica em cache por hash do áudio + texto em output/cache/alignment.
+"""
+import os
+import sys
+import json
+import math
+import wave
+import hashlib
+import logging
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+from config import OUTPUT_DIR
+from core.clip_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+ALIGN_CACHE_DIR = os.path.join(OUTPUT_DIR, "cache", "alignment")
+ALIGNMENT_ENABLED = os.getenv("SUBTITLE_ALIGNMENT", "1") != "0"
+FRAME_SECONDS = 0.01
+MIN_PAUSE_SECONDS = 0.15   # silêncios menores ficam dentro da palavra/frase
+MIN_VOICE_SECONDS = 0.05   # estalos isolados não contam como fala
+TICKS_PER_SECOND = 10_000_000  # offsets do edge-tts são em unidades de 100 ns
+
+
+@dataclass(frozen=True)
+class WordTiming:
+    text: str
+    start: float
+    end: float
+
+
+def _normalize(word: str) -> str:
+    return "".join(ch for ch in word.lower() if ch.isalnum())
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()[:16]
+
+
+def _boundaries_path(audio_digest: str) -> str:
+    return os.path.join(ALIGN_CACHE_DIR, f"{audio_digest}.boundaries.json")
+
+
+def _alignment_path(audio_digest: str, text: str) -> str:
+    return os.path.join(ALIGN_CACHE_DIR, f"{audio_digest}-{_text_hash(text)}.json")
+
+
+def _read_json(path: str):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _write_json(path: str, data) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+# ---------------------------------------------------------------------------
+# edge-tts
+# ---------------------------------------------------------------------------
+
+def boundaries_from_events(events: Iterable[dict]) -> List[WordTiming]:
+    """WordBoundary do edge-tts → WordTiming (segundos)."""
+    timings = []
+    for event in events:
+        start = event.get("offset", 0) / TICKS_PER_SECOND
+        timings.append(WordTiming(event.get("text", ""), start, start + event.get("duration", 0) / TICKS_PER_SECOND))
+    return timings
+
+
+def save_boundaries(audio_path: str, events: Iterable[dict]) -> None:
+    """Guarda os WordBoundary do TTS para o áudio recém-gerado."""
+    timings = boundaries_from_events(events)
+    if not timings or not os.path.exists(audio_path):
+        return
+    _write_json(_boundaries_path(file_digest(audio_path)), [[t.text, t.start, t.end] for t in timings])
+
+
+def match_words(words: List[str], tokens: List[WordTiming]) -> Optional[List[WordTiming]]:
+    """
+    Casa as palavras do roteiro com os tokens do TTS (que vêm sem pontuação e
+    às vezes partidos, ex. "20%" → "20" + "%"). None se não fecharem.
+    """
+    matched = []
+    index = 0
+    last_end = tokens[0].start if tokens else 0.0
+    for word in words:
+        target = _normalize(word)
+        if not target:
+            # Só pontuação (ex. "—"): instantâneo no fim da palavra anterior
+            matched.append(WordTiming(word, last_end, last_end))
+            continue
+        if index >= len(tokens):
+            return None
+        start, consumed = tokens[index].start, ""
+        while index < len(tokens) and len(consumed) < len(target):
+            consumed += _normalize(tokens[index].text)
+            last_end = tokens[index].end
+            index += 1
+        if consumed != target:
+            return None
+        # Tokens só de pontuação logo depois (ex. "%") ainda pertencem a esta palavra
+        while index < len(tokens) and not _normalize(tokens[index].text):
+            last_end = tokens[index].end
+            index += 1
+        matched.append(WordTiming(word, start, last_end))
+    return matched
+
+
+# ---------------------------------------------------------------------------
+# Alinhador por energia
+# ---------------------------------------------------------------------------
+
+def _frame_energies(audio_path: str) -> Optional[List[float]]:
+    """RMS por janela de FRAME_SECONDS de um WAV PCM 16-bit (None em outros formatos)."""
+    try:
+        with wave.open(audio_path, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                return None
+            channels, rate = wav.getnchannels(), wav.getframerate()
+            samples = array("h")
+            samples.frombytes(wav.readframes(wav.getnframes()))
+    except (OSError, EOFError, wave.Error):
+        return None
+    if sys.byteorder == "big":
+        samples.byteswap()
+    if channels > 1:
+        samples = samples[::channels]
+    step = max(1, int(rate * FRAME_SECONDS))
+    stride = max(1, rate // 8000)  # ~8 kHz basta para energia
+    energies = []
+    for offset in range(0, len(samples), step):
+        window = samples[offset:offset + step:stride]
+        energies.append(math.sqrt(sum(x * x for x in window) / len(window)))
+    return energies
+
+
+def _runs(flags: List[bool]) -> List[Tuple[int, int]]:
+    runs, start = [], None
+    for i, flag in enumerate(flags + [False]):
+        if flag and start is None:
+            start = i
+        elif not flag and start is not None:
+            runs.append((start, i))
+            start = None
+    return runs
+
+
+def voiced_segments(energies: List[float]) -> List[Tuple[float, float]]:
+    """Trechos com voz (segundos), com limiar adaptado ao ruído de fundo do áudio."""
+    if not energies:
+        return []
+    ordered = sorted(energies)
+    floor = ordered[len(ordered) // 10]
+    peak = ordered[min(len(ordered) - 1, len(ordered) * 95 // 100)]
+    if peak <= floor:
+        return []
+    threshold = floor + (peak - floor) * 0.15
+    voiced = [energy > threshold for energy in energies]
+    # Pausas curtas (entre sílabas/palavras) contam como fala
+    min_pause = int(MIN_PAUSE_SECONDS / FRAME_SECONDS)
+    for start, end in _runs([not flag for flag in voiced]):
+        if end - start < min_pause and start > 0 and end < len(voiced):
+            voiced[start:end] = [True] * (end - start)
+    min_voice = int(MIN_VOICE_SECONDS / FRAME_SECONDS)
+    return [
+        (start * FRAME_SECONDS, end * FRAME_SECONDS)
+        for start, end in _runs(voiced)
+        if end - start >= min_voice
+    ]
+
+
+def _voiced_to_time(position: float, segments: List[Tuple[float, float]], is_end: bool) -> float:
+    """Posição no tempo só-de-fala → tempo real (início vai para o próximo trecho na borda)."""
+    for start, end in segments:
+        length = end - start
+        if position < length or (is_end and position <= length):
+            return start + position
+        position -= length
+    return segments[-1][1]
+
+
+def energy_align(audio_path: str, words: List[str]) -> Optional[List[WordTiming]]:
+    """Distribui as palavras pelo tempo falado, proporcional ao número de letras."""
+    energies = _frame_energies(audio_path)
+    segments = voiced_segments(energies or [])
+    if not segments or not words:
+        return None
+    weights = [len(_normalize(word)) + 1 for word in words]
+    voiced_total = sum(end - start for start, end in segments)
+    scale = voiced_total / sum(weights)
+    timings, cursor = [], 0.0
+    for word, weight in zip(words, weights):
+        start = _voiced_to_time(cursor, segments, is_end=False)
+        cursor += weight * scale
+        timings.append(WordTiming(word, start, _voiced_to_time(cursor, segments, is_end=True)))
+    return timings
+
+
+# ---------------------------------------------------------------------------
+# Entrada principal
+# ---------------------------------------------------------------------------
+
+def align(audio_path: str, text: str) -> Optional[List[WordTiming]]:
+    """
+    Tempos por palavra de `text` (mesma divisão de generate_ass_from_text) na
+    narração `audio_path`, ou None para cair na estimativa por caracteres.
+    """
+    words = text.replace("\n", " ").split()
+    if not ALIGNMENT_ENABLED or not words or not os.path.exists(audio_path):
+        return None
+    audio_digest = file_digest(audio_path)
+    cache_path = _alignment_path(audio_digest, text)
+    cached = _read_json(cache_path)
+    if cached and len(cached.get("words", [])) == len(words):
+        return [WordTiming(*item) for item in cached["words"]]
+
+    timings, source = None, ""
+    boundaries = _read_json(_boundaries_path(audio_digest))
+    if boundaries:
+        timings, source = match_words(words, [WordTiming(*item) for item in boundaries]), "edge-tts"
+    if timings is None:
+        timings, source = energy_align(audio_path, words), "energy"
+    if timings is None:
+        return None
+
+    logger.info(f"🎯 Legendas alinhadas ao áudio ({source}, {len(timings)} palavras)")
+    _write_json(cache_path, {"source": source, "words": [[t.text, t.start, t.end] for t in timings]})
+    return timings
@@ -0,0 +1,44 @@
+"""
+async_hub_client.py — variante asyncio do hub_client para o worker assíncrono.
+
+Mesmas funções do hub_client, em versão `async`. Cada chamada roda o cliente
+síncrono numa thread (asyncio.to_thread); como o I/O HTTP passa pelo pool
+com keep-alive de core.http_pool, o event loop fica livre para heartbeat,
+comandos remotos e progresso enquanto um render roda em outro processo.
+"""
+import asyncio
+from typing import Optional
+
+from core import hub_client
+
+
+async def fetch_pending_job(wait: int = 0) -> Optional[dict]:
+    return await asyncio.to_thread(hub_client.fetch_pending_job, wait)
+
+
+async def report_job_status(job_id: str, status: str, progress: int = 0, stage: str = "", message: str = "") -> bool:
+    return await asyncio.to_thread(hub_client.report_job_status, job_id, status, progress, stage, message)
+
+
+async def report_job_done(job_id: str, video_path: str) -> bool:
+    return await asyncio.to_thread(hub_client.report_job_done, job_id, video_path)
+
+
+async def report_job_error(job_id: str, error_msg: str) -> bool:
+    return await asyncio.to_thread(hub_client.report_job_error, job_id, error_msg)
+
+
+async def push_telemetry() -> bool:
+    return await asyncio.to_thread(hub_client.push_telemetry)
+
+
+async def poll_commands() -> list:
+    return await asyncio.to_thread(hub_client.poll_commands)
+
+
+async def execute_command(cmd_obj: dict):
+    return await asyncio.to_thread(hub_client.execute_command, cmd_obj)
+
+
+async def hub_is_alive() -> bool:
+    return await asyncio.to_thread(hub_client.hub_is_alive)
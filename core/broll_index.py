@@ -0,0 +1,217 @@
+"""
+broll_index.py — índice persistente da biblioteca de b-roll (assets/broll).
+
+Para cada asset o índice guarda duração, resolução, posições de keyframe e
+alguns frames candidatos já extraídos em 720x1280. A atualização é
+incremental: só arquivos novos ou alterados (tamanho/mtime) são re-indexados,
+e entradas de arquivos removidos são descartadas junto com seus frames.
+Com isso a seleção de b-roll por job vira uma consulta ao índice.
+"""
+import os
+import json
+import shutil
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import ASSETS_DIR, OUTPUT_DIR
+from core.ffmpeg_engine import FFmpegEngine
+from core.media_probe import probe_keyframes, probe_media
+
+logger = logging.getLogger(__name__)
+
+BROLL_DIR = os.path.join(ASSETS_DIR, "broll")
+BROLL_INDEX_PATH = os.path.join(OUTPUT_DIR, "cache", "broll_index.sqlite")
+BROLL_FRAMES_DIR = os.path.join(OUTPUT_DIR, "cache", "broll_frames")
+BROLL_CANDIDATE_FRAMES = int(os.getenv("BROLL_CANDIDATE_FRAMES", "6"))
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
+VIDEO_EXTS = {".mp4", ".mov", ".webm", ".mkv"}
+
+_refresh_lock = threading.Lock()
+
+
+@dataclass
+class BrollAsset:
+    path: str
+    kind: str  # "video" | "image"
+    size: int
+    mtime_ns: int
+    duration: float = 0.0
+    width: int = 0
+    height: int = 0
+    keyframes: List[float] = field(default_factory=list)
+    candidates: List[str] = field(default_factory=list)
+
+
+def candidate_timestamps(duration: float, keyframes: List[float], count: int) -> List[float]:
+    """Pontos espalhados pelo vídeo, encaixados no keyframe mais próximo (sem repetir)."""
+    if duration <= 0 or count <= 0:
+        return []
+    timestamps = []
+    for n in range(count):
+        target = min(max(0.2, duration * (n + 1) / (count + 1)), max(0.2, duration - 0.2))
+        if keyframes:
+            target = min(keyframes, key=lambda k: abs(k - target))
+        if target not in timestamps:
+            timestamps.append(target)
+    return timestamps
+
+
+class BrollIndex:
+    """Índice SQLite de assets de b-roll com frames candidatos pré-extraídos."""
+
+    def __init__(
+        self,
+        broll_dir: str = BROLL_DIR,
+        db_path: str = BROLL_INDEX_PATH,
+        frames_dir: str = BROLL_FRAMES_DIR,
+        candidate_frames: int = BROLL_CANDIDATE_FRAMES,
+    ):
+        self.broll_dir = broll_dir
+        self.db_path = db_path
+        self.frames_dir = frames_dir
+        self.candidate_frames = candidate_frames
+        self._assets: Dict[str, BrollAsset] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS assets (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                duration REAL NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                keyframes TEXT NOT NULL,
+                candidates TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+            """
+        )
+        return conn
+
+    def _load(self) -> Dict[str, BrollAsset]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT path, kind, size, mtime_ns, duration, width, height, keyframes, candidates FROM assets"
+            ).fetchall()
+        return {
+            row[0]: BrollAsset(
+                path=row[0], kind=row[1], size=row[2], mtime_ns=row[3], duration=row[4],
+                width=row[5], height=row[6], keyframes=json.loads(row[7]), candidates=json.loads(row[8]),
+            )
+            for row in rows
+        }
+
+    def _store(self, asset: BrollAsset) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO assets
+                    (path, kind, size, mtime_ns, duration, width, height, keyframes, candidates, indexed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    asset.path, asset.kind, asset.size, asset.mtime_ns, asset.duration,
+                    asset.width, asset.height, json.dumps(asset.keyframes), json.dumps(asset.candidates),
+                    time.time(),
+                ),
+            )
+
+    def _delete(self, paths: List[str]) -> None:
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM assets WHERE path = ?", [(path,) for path in paths])
+        for path in paths:
+            shutil.rmtree(self._frames_dir_for(path), ignore_errors=True)
+
+    def _frames_dir_for(self, path: str) -> str:
+        return os.path.join(self.frames_dir, hashlib.sha1(path.encode("utf-8")).hexdigest()[:16])
+
+    def _is_current(self, asset: Optional[BrollAsset], stat: os.stat_result) -> bool:
+        if asset is None or (asset.size, asset.mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+            return False
+        return all(os.path.exists(candidate) for candidate in asset.candidates)
+
+    def _index_asset(self, path: str, stat: os.stat_result) -> BrollAsset:
+        ext = Path(path).suffix.lower()
+        info = probe_media(path)
+        asset = BrollAsset(
+            path=path,
+            kind="video" if ext in VIDEO_EXTS else "image",
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            duration=float(info.get("duration") or 0.0),
+            width=int(info.get("width") or 0),
+            height=int(info.get("height") or 0),
+        )
+        if asset.kind == "image":
+            asset.candidates = [path]
+            return asset
+
+        frames_dir = self._frames_dir_for(path)
+        shutil.rmtree(frames_dir, ignore_errors=True)
+        os.makedirs(frames_dir, exist_ok=True)
+        asset.keyframes = probe_keyframes(path)
+        frames = [
+            (timestamp, os.path.join(frames_dir, f"cand_{n:02d}.jpg"))
+            for n, timestamp in enumerate(candidate_timestamps(asset.duration, asset.keyframes, self.candidate_frames))
+        ]
+        asset.candidates = FFmpegEngine.extract_frames(path, frames, keyframes=asset.keyframes)
+        logger.info(f"🗂️  B-roll indexado: {os.path.basename(path)} ({len(asset.candidates)} frames candidatos)")
+        return asset
+
+    def refresh(self) -> List[BrollAsset]:
+        """Sincroniza o índice com a pasta de b-roll; re-indexa só o que mudou."""
+        with _refresh_lock:
+            try:
+                known = self._load()
+            except (sqlite3.Error, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Índice de b-roll ilegível, reconstruindo: {e}")
+                known = {}
+
+            assets: Dict[str, BrollAsset] = {}
+            if os.path.isdir(self.broll_dir):
+                for name in sorted(os.listdir(self.broll_dir)):
+                    path = os.path.abspath(os.path.join(self.broll_dir, name))
+                    if Path(path).suffix.lower() not in IMAGE_EXTS.union(VIDEO_EXTS) or not os.path.isfile(path):
+                        continue
+                    stat = os.stat(path)
+                    asset = known.get(path)
+                    if not self._is_current(asset, stat):
+                        asset = self._index_asset(path, stat)
+                        self._store(asset)
+                    assets[path] = asset
+
+            stale = [path for path in known if path not in assets]
+            if stale:
+                self._delete(stale)
+            self._assets = assets
+            return list(assets.values())
+
+    def get(self, path: str) -> Optional[BrollAsset]:
+        return self._assets.get(os.path.abspath(path))
+
+    def candidate_for(self, path: str, scene_index: int, total_scenes: int, scene_count: Optional[int] = None) -> Optional[str]:
+        """
+        Frame candidato na mesma posição relativa que a cena ocupa no roteiro.
+        `scene_count` é quantas cenas usam este vídeo (padrão: `total_scenes`);
+        se passa do número de candidatos, retorna None e o chamador extrai um
+        frame por cena, em vez de repetir o mesmo frame em várias cenas.
+        """
+        asset = self.get(path)
+        if asset is None or not asset.candidates:
+            return None
+        if asset.kind == "video" and (scene_count or total_scenes) > len(asset.candidates):
+            return None
+        spread = (scene_index + 1) / max(2, total_scenes + 1)
+        return asset.candidates[min(len(asset.candidates) - 1, round(spread * (len(asset.candidates) - 1)))]
@@ -0,0 +1,142 @@
+"""
+clip_cache.py — cache content-addressed de clipes de cena pré-renderizados.
+
+Cada clipe Ken Burns (zoompan + color grade) é indexado pelo hash da imagem
+somado ao modo de câmera, ao filtro e aos argumentos de encode — a duração
+fica fora da chave: o clipe é gravado com folga e cortado no concat. Re-renders
+que só mudam narração, legendas ou marca reaproveitam os clipes já codificados.
+Eviction LRU por tamanho total, usando o mtime como marcador de último uso.
+"""
+import os
+import hashlib
+import logging
+import shutil
+import tempfile
+import time
+from typing import Iterable, Optional
+
+from config import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+CLIP_CACHE_DIR = os.path.join(OUTPUT_DIR, "cache", "clips")
+CLIP_CACHE_ENABLED = os.getenv("SCENE_CLIP_CACHE", "1") != "0"
+CLIP_CACHE_MAX_MB = int(os.getenv("SCENE_CLIP_CACHE_MAX_MB", "2048"))
+# Clipes são gravados com essa folga sobre a duração pedida para servir narrações mais longas
+CLIP_CACHE_HEADROOM = float(os.getenv("SCENE_CLIP_CACHE_HEADROOM", "1.25"))
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 do conteúdo de um arquivo, lido em blocos."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class SceneClipCache:
+    """Cache em disco de clipes por cena, com eviction LRU limitada por tamanho."""
+
+    SUFFIX = ".mp4"
+    LABEL = "Clip cache"
+
+    def __init__(self, root: str = CLIP_CACHE_DIR, max_bytes: int = CLIP_CACHE_MAX_MB * 1_048_576, max_age: float = 0):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_age = max_age  # segundos sem uso antes de expirar (0 = sem limite)
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, image_path: str, *params: object) -> str:
+        """Chave = hash da imagem + parâmetros do filtro/encode que geram o clipe."""
+        digest = hashlib.sha256(file_digest(image_path).encode())
+        for param in params:
+            digest.update(b"\0")
+            digest.update(str(param).encode())
+        return digest.hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}{self.SUFFIX}")
+
+    def get(self, key: str) -> Optional[str]:
+        path = self.path_for(key)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return None
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        return path
+
+    def put(self, key: str, source_path: str, replace: bool = False) -> str:
+        """
+        Move um clipe recém-renderizado para o cache (tmp único + rename atômico).
+        Se outro worker já gravou a mesma chave, o clipe existente vale como hit,
+        a menos que `replace` peça para substituí-lo.
+        """
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if not replace and os.path.exists(path):
+            try:
+                os.remove(source_path)
+            except OSError:
+                pass
+            return path
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(path))
+        os.close(fd)
+        try:
+            shutil.move(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def evict(self, keep: Iterable[str] = ()) -> int:
+        """
+        Remove os clipes menos usados até caber em `max_bytes` (e os expirados por
+        `max_age`). Retorna bytes liberados.
+        """
+        keep = {os.path.abspath(p) for p in keep}
+        expire_before = time.time() - self.max_age if self.max_age else 0
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not name.endswith(self.SUFFIX):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                total += stat.st_size
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        freed = 0
+        for mtime, size, path in sorted(entries):
+            if total - freed <= self.max_bytes and mtime >= expire_before:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            try:
+                os.remove(path)
+                freed += size
+            except OSError:
+                pass
+        if freed:
+            logger.info(f"🧹 {self.LABEL}: {freed / 1_048_576:.1f} MB liberados")
+        return freed
+
+
+def default_clip_cache() -> Optional[SceneClipCache]:
+    """Cache padrão em output/cache/clips, ou None se SCENE_CLIP_CACHE=0."""
+    if not CLIP_CACHE_ENABLED:
+        return None
+    try:
+        return SceneClipCache()
+    except OSError as e:
+        logger.warning(f"⚠️ Clip cache indisponível: {e}")
+        return None
@@ -0,0 +1,104 @@
+"""
+encode_profiles.py — perfis nomeados de encode para o render local (FFmpeg).
+
+Perfis:
+    draft    — baixa resolução, 15fps, só local: QA de um job em segundos
+    preview  — meia resolução, rápido, bom para revisar timing e cenas
+    final    — padrão de entrega (720x1280 @ 24fps, o render histórico)
+    archive  — mesma resolução, preset lento e CRF baixo para arquivamento
+
+O perfil pode vir do job, da marca (`encode_profile` no brand.json) ou do
+ENCODE_PROFILE (padrão: final). "auto" é opt-in: escolhe pela duração medida e
+pelos cores locais, então só vale para o render local (ver hosted_render_size).
+"""
+import os
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = os.getenv("ENCODE_PROFILE", "final").lower()
+# Segundos de vídeo que cada core renderiza no perfil final antes do auto cair para preview
+AUTO_SECONDS_PER_CORE = float(os.getenv("ENCODE_AUTO_SECONDS_PER_CORE", "90"))
+
+
+@dataclass(frozen=True)
+class EncodeProfile:
+    name: str
+    width: int
+    height: int
+    fps: int
+    preset: str
+    crf: int
+    audio_bitrate: str = "128k"
+    zoom_scale: int = 2000  # largura do upscale antes do zoompan
+    hosted: bool = True     # pode delegar ao VideoLM
+
+    @property
+    def size(self) -> str:
+        return f"{self.width}x{self.height}"
+
+    def video_args(self) -> List[str]:
+        return ["-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf)]
+
+    def audio_args(self) -> List[str]:
+        return ["-c:a", "aac", "-b:a", self.audio_bitrate]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+PROFILES: Dict[str, EncodeProfile] = {
+    "draft":   EncodeProfile("draft",   360, 640,  15, "ultrafast", 30, "64k",  zoom_scale=900, hosted=False),
+    "preview": EncodeProfile("preview", 540, 960,  24, "veryfast",  26, "96k",  zoom_scale=1400),
+    "final":   EncodeProfile("final",   720, 1280, 24, "ultrafast", 22, "128k", zoom_scale=2000),
+    "archive": EncodeProfile("archive", 720, 1280, 30, "slow",      18, "192k", zoom_scale=2000),
+}
+
+
+def get_profile(name: str = "final") -> EncodeProfile:
+    profile = PROFILES.get((name or "final").lower())
+    if profile is None:
+        raise KeyError(f"Unknown encode profile: {name}")
+    return profile
+
+
+def auto_profile(duration: float, cores: Optional[int] = None) -> EncodeProfile:
+    """Final quando a máquina aguenta a duração; preview em máquinas fracas com vídeos longos."""
+    cores = cores or os.cpu_count() or 1
+    if duration > cores * AUTO_SECONDS_PER_CORE:
+        return PROFILES["preview"]
+    return PROFILES["final"]
+
+
+def requested_profile_name(requested: str = "", brand_cfg: Optional[dict] = None) -> str:
+    """Nome pedido: job > marca > ENCODE_PROFILE (pode ser "auto" ou desconhecido)."""
+    brand_profile = (brand_cfg or {}).get("encode_profile", "") if isinstance(brand_cfg, dict) else ""
+    return (requested or brand_profile or DEFAULT_PROFILE or "final").lower()
+
+
+def resolve_profile(
+    requested: str = "",
+    brand_cfg: Optional[dict] = None,
+    duration: float = 0.0,
+    cores: Optional[int] = None,
+) -> EncodeProfile:
+    """Job > marca > ENCODE_PROFILE; nomes desconhecidos caem para final."""
+    name = requested_profile_name(requested, brand_cfg)
+    if name in PROFILES:
+        return PROFILES[name]
+    if name == "auto":
+        return auto_profile(duration, cores)
+    logger.warning(f"⚠️ Perfil de encode desconhecido '{name}', usando final")
+    return PROFILES["final"]
+
+
+def hosted_render_size(profile: EncodeProfile, requested: str = "", brand_cfg: Optional[dict] = None) -> str:
+    """
+    Resolução pedida ao VideoLM. Perfil escolhido pelo auto (cores desta
+    máquina) não vale para render hospedado: usa a do perfil final.
+    """
+    if requested_profile_name(requested, brand_cfg) == "auto":
+        return PROFILES["final"].size
+    return profile.size
@@ -1,10 +1,25 @@
 import subprocess
 import logging
+import math
 import os
-from typing import List, Optional
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from core.clip_cache import CLIP_CACHE_HEADROOM, SceneClipCache, default_clip_cache
+from core.encode_profiles import EncodeProfile, get_profile
+from core.media_probe import probe_duration
 
 logger = logging.getLogger(__name__)
 
+# Modo de render: "auto" (segmenta vídeos longos), "single" (um filtergraph) ou "segmented"
+RENDER_MODE = os.getenv("FFMPEG_RENDER_MODE", "auto").lower()
+SEGMENT_SCENES = int(os.getenv("FFMPEG_SEGMENT_SCENES", "8"))
+SEGMENTED_MIN_SCENES = int(os.getenv("FFMPEG_SEGMENTED_MIN_SCENES", "24"))
+SEGMENT_WORKERS = int(os.getenv("FFMPEG_SEGMENT_WORKERS", "0"))  # 0 = os.cpu_count()
+KEN_BURNS_MODES = ["zoom_in", "zoom_out", "pan_left", "pan_right"]
+
 class FFmpegEngine:
     """
     Motor especializado em comandos FFmpeg para o pipeline Absolute Cinema.
@@ -12,14 +27,10 @@ class FFmpegEngine:
     
     @staticmethod
     def get_duration(file_path: str) -> float:
-        try:
-            result = subprocess.check_output(
-                ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", file_path]
-            )
-            return float(result.strip())
-        except Exception as e:
-            logger.error(f"Erro ao obter duração de {file_path}: {e}")
-            return 0.0
+        duration = probe_duration(file_path)
+        if not duration:
+            logger.error(f"Erro ao obter duração de {file_path}")
+        return duration
 
     @staticmethod
     def run_command(cmd: List[str]) -> bool:
@@ -43,13 +54,13 @@ class FFmpegEngine:
         return "loudnorm=I=-14:LRA=11:tp=-1.5"
 
     @staticmethod
-    def build_zoompan_filter(index: int, duration: float, fps: int, mode: str = "zoom_in") -> str:
+    def build_zoompan_filter(index: int, duration: float, fps: int, mode: str = "zoom_in", size: str = "720x1280", zoom_scale: int = 2000) -> str:
         """
         Cria o efeito Ken Burns (ZoomPan) Cinematográfico.
         Modos: zoom_in, zoom_out, pan_left, pan_right
         """
         d = int(duration * fps)
-        s = "720x1280" # Resolução vertical para shorts/reels
+        s = size # Resolução vertical para shorts/reels
         
         # Lógica de Movimento de Câmera (Ken Burns 2.0)
         if mode == "zoom_in":
@@ -73,21 +84,69 @@ class FFmpegEngine:
         color_grade = "eq=contrast=1.15:saturation=1.3:brightness=0.02"
         
         return (
-            f"[{index}:v]scale=2000:-1,zoompan=z='{z}':x='{x}':y='{y}':d={d}:s={s}:fps={fps},"
+            f"[{index}:v]scale={zoom_scale}:-1,zoompan=z='{z}':x='{x}':y='{y}':d={d}:s={s}:fps={fps},"
             f"{color_grade},setsar=1,format=yuv420p,trim=duration={duration},setpts=PTS-STARTPTS[v{index}];"
         )
 
     @staticmethod
-    def assemble_video(audio_path: str, image_paths: list, subs_path: str, output_path: str, duration: float, logo_path: str = None, bg_music_path: str = None) -> bool:
+    def build_finish_filter(v_node: str, subs_path: str, voice_idx: int, logo_idx: Optional[int] = None, music_idx: Optional[int] = None) -> str:
+        """
+        Camadas finais do filtergraph: logo, legendas ASS e mixagem de áudio.
+        Gera os nós [v_out] e [a_out].
+        """
+        filter_complex = ""
+        if logo_idx is not None:
+            filter_complex += f"{v_node}[{logo_idx}:v]overlay=W-w-40:40[v_logo];"
+            v_node = "[v_logo]"
+
+        safe_subs = subs_path.replace(":", "\\\\:")
+        fonts_dir = os.path.join(os.getcwd(), "assets", "fonts")
+        filter_complex += f"{v_node}ass='{safe_subs}':fontsdir='{fonts_dir}'[v_out];"
+
+        if music_idx is not None:
+            # Volume Boost na voz e Sidechain na música
+            filter_complex += f"[{voice_idx}:a]volume=1.8[v_a];[{music_idx}:a]volume=0.15[m_a];[v_a][m_a]amix=inputs=2:duration=first[a_out]"
+        else:
+            filter_complex += f"[{voice_idx}:a]volume=1.8[a_out]"
+        return filter_complex
+
+    @staticmethod
+    def use_segmented_render(num_images: int) -> bool:
+        """Decide se o render deve ser dividido em segmentos paralelos."""
+        if RENDER_MODE == "segmented":
+            return num_images > 1
+        if RENDER_MODE == "single":
+            return False
+        return num_images >= SEGMENTED_MIN_SCENES and (os.cpu_count() or 1) > 1
+
+    @staticmethod
+    def assemble_video(audio_path: str, image_paths: list, subs_path: str, output_path: str, duration: float, logo_path: str = None, bg_music_path: str = None, segmented: Optional[bool] = None, profile: Optional[EncodeProfile] = None) -> bool:
         """
         Versão de Alta Performance (v3.1):
         Suporta centenas de assets e vídeos longos (5min+).
+        Com `segmented` (ou FFMPEG_RENDER_MODE), renderiza grupos de cenas em paralelo.
+        `profile` define resolução, fps e encode (padrão: perfil "final").
         """
-        fps = 24 # Reduzindo para 24fps em vídeos longos para salvar processamento no Termux
         num_images = len(image_paths)
         if num_images == 0: return False
-        
+        profile = profile or get_profile("final")
+
+        fps = profile.fps
         clip_duration = duration / num_images
+        clip_cache = default_clip_cache()
+
+        if segmented is None:
+            segmented = FFmpegEngine.use_segmented_render(num_images)
+            if not segmented and FFmpegEngine.scenes_cached(image_paths, clip_duration, profile, clip_cache):
+                # Re-render com todas as cenas no cache: só concat + passada final, sem Ken Burns
+                logger.info("♻️ Todas as cenas estão no clip cache: reaproveitando os clipes")
+                segmented = True
+        if segmented:
+            return FFmpegEngine.assemble_video_segmented(
+                audio_path, image_paths, subs_path, output_path, duration,
+                logo_path=logo_path, bg_music_path=bg_music_path,
+                clip_cache=clip_cache, profile=profile,
+            )
         
         # 1. Preparação de Inputs (Otimizado)
         inputs = []
@@ -102,35 +161,20 @@ class FFmpegEngine:
 
         # 2. Filtros de Vídeo (Ken Burns 3.1)
         filter_complex = ""
-        modes = ["zoom_in", "zoom_out", "pan_left", "pan_right"]
         for i in range(num_images):
-            mode = modes[i % len(modes)]
-            filter_complex += FFmpegEngine.build_zoompan_filter(i, clip_duration, fps, mode)
+            mode = KEN_BURNS_MODES[i % len(KEN_BURNS_MODES)]
+            filter_complex += FFmpegEngine.build_zoompan_filter(i, clip_duration, fps, mode, profile.size, profile.zoom_scale)
         
         concat_v = "".join([f"[v{i}]" for i in range(num_images)])
         filter_complex += f"{concat_v}concat=n={num_images}:v=1:a=0[v_base];"
         
-        # 3. Logo & Legendas (Layered)
-        v_node = "[v_base]"
-        if has_logo:
-            logo_idx = num_images + 1
-            filter_complex += f"{v_node}[{logo_idx}:v]overlay=W-w-40:40[v_logo];"
-            v_node = "[v_logo]"
-        
-        safe_subs = subs_path.replace(":", "\\\\:")
-        fonts_dir = os.path.join(os.getcwd(), "assets", "fonts")
-        filter_complex += f"{v_node}ass='{safe_subs}':fontsdir='{fonts_dir}'[v_out];"
-        
-        # 4. Mixagem de Áudio
+        # 3. Logo, Legendas & Mixagem de Áudio
         voice_idx = num_images
-        if has_music:
-            music_idx = num_images + (2 if has_logo else 1)
-            # Volume Boost na voz e Sidechain na música
-            filter_complex += f"[{voice_idx}:a]volume=1.8[v_a];[{music_idx}:a]volume=0.15[m_a];[v_a][m_a]amix=inputs=2:duration=first[a_out]"
-        else:
-            filter_complex += f"[{voice_idx}:a]volume=1.8[a_out]"
+        logo_idx = num_images + 1 if has_logo else None
+        music_idx = num_images + (2 if has_logo else 1) if has_music else None
+        filter_complex += FFmpegEngine.build_finish_filter("[v_base]", subs_path, voice_idx, logo_idx, music_idx)
 
-        # 5. Renderização (Preset Ultrafast para Celular/Termux)
+        # 4. Renderização (preset/CRF do perfil; "final" = ultrafast para Celular/Termux)
         cmd = [
             "ffmpeg", "-y", "-threads", "0",
             "-hide_banner", "-loglevel", "error"
@@ -139,9 +183,240 @@ class FFmpegEngine:
         cmd.extend([
             "-filter_complex", filter_complex,
             "-map", "[v_out]", "-map", "[a_out]",
-            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "22",
-            "-c:a", "aac", "-b:a", "128k", "-shortest",
+            *profile.video_args(),
+            *profile.audio_args(), "-shortest",
             output_path
         ])
         
         return FFmpegEngine.run_command(cmd)
+
+    @staticmethod
+    def split_segments(num_images: int, segment_scenes: int = SEGMENT_SCENES) -> List[range]:
+        """Divide os índices das cenas em grupos contíguos de até `segment_scenes`."""
+        size = max(1, segment_scenes)
+        return [range(start, min(start + size, num_images)) for start in range(0, num_images, size)]
+
+    @staticmethod
+    def render_segment(image_paths: list, scene_indices: range, clip_duration: float, profile: EncodeProfile, output_path: str, threads: int = 0) -> bool:
+        """
+        Renderiza um grupo de cenas Ken Burns como clipe intermediário (sem áudio).
+        Os modos de câmera seguem o índice global da cena para manter o mesmo visual do render único.
+        """
+        inputs = []
+        filter_complex = ""
+        for local_idx, scene_idx in enumerate(scene_indices):
+            inputs.extend(["-i", image_paths[scene_idx]])
+            mode = KEN_BURNS_MODES[scene_idx % len(KEN_BURNS_MODES)]
+            filter_complex += FFmpegEngine.build_zoompan_filter(local_idx, clip_duration, profile.fps, mode, profile.size, profile.zoom_scale)
+
+        count = len(scene_indices)
+        concat_v = "".join([f"[v{i}]" for i in range(count)])
+        filter_complex += f"{concat_v}concat=n={count}:v=1:a=0[v_seg]"
+
+        cmd = [
+            "ffmpeg", "-y", "-threads", str(threads),
+            "-hide_banner", "-loglevel", "error"
+        ]
+        cmd.extend(inputs)
+        cmd.extend([
+            "-filter_complex", filter_complex,
+            "-map", "[v_seg]",
+            *profile.video_args(),
+            "-an",
+            output_path
+        ])
+        return FFmpegEngine.run_command(cmd)
+
+    @staticmethod
+    def scene_clip_key(image_paths: list, scene_idx: int, profile: EncodeProfile, cache: SceneClipCache) -> str:
+        """
+        Chave do clipe da cena: imagem, modo de câmera, filtro e encode — sem a duração.
+        O filtro entra com duração de referência, então mudanças no filtro ainda invalidam o cache.
+        """
+        mode = KEN_BURNS_MODES[scene_idx % len(KEN_BURNS_MODES)]
+        scene_filter = FFmpegEngine.build_zoompan_filter(0, 1.0, profile.fps, mode, profile.size, profile.zoom_scale)
+        return cache.key(image_paths[scene_idx], mode, scene_filter, " ".join(profile.video_args()))
+
+    @staticmethod
+    def cached_scene_clip(image_paths: list, scene_idx: int, clip_duration: float, profile: EncodeProfile, cache: SceneClipCache) -> Optional[str]:
+        """Clipe em cache da cena, se existir e for longo o bastante para `clip_duration`."""
+        key = FFmpegEngine.scene_clip_key(image_paths, scene_idx, profile, cache)
+        cached = cache.get(key)
+        if cached and FFmpegEngine.get_duration(cached) >= clip_duration:
+            return cached
+        return None
+
+    @staticmethod
+    def scenes_cached(image_paths: list, clip_duration: float, profile: EncodeProfile, cache: Optional[SceneClipCache]) -> bool:
+        """True se todas as cenas já têm clipe utilizável no cache."""
+        if cache is None:
+            return False
+        try:
+            return all(
+                FFmpegEngine.cached_scene_clip(image_paths, idx, clip_duration, profile, cache)
+                for idx in range(len(image_paths))
+            )
+        except OSError:
+            return False
+
+    @staticmethod
+    def render_cached_scene(image_paths: list, scene_idx: int, clip_duration: float, profile: EncodeProfile, cache: SceneClipCache, work_dir: str, threads: int = 0) -> Optional[str]:
+        """
+        Retorna o clipe da cena a partir do cache, renderizando e armazenando em caso de miss.
+        O clipe é gravado com folga (CLIP_CACHE_HEADROOM) e cortado em `clip_duration` no concat;
+        um clipe em cache curto demais para a narração atual é renderizado de novo e substituído.
+        """
+        cached = FFmpegEngine.cached_scene_clip(image_paths, scene_idx, clip_duration, profile, cache)
+        if cached:
+            return cached
+
+        key = FFmpegEngine.scene_clip_key(image_paths, scene_idx, profile, cache)
+        render_duration = float(math.ceil(clip_duration * max(1.0, CLIP_CACHE_HEADROOM)))
+        tmp_path = os.path.join(work_dir, f"scene_{scene_idx:03d}.mp4")
+        if not FFmpegEngine.render_segment(image_paths, range(scene_idx, scene_idx + 1), render_duration, profile, tmp_path, threads):
+            return None
+        return cache.put(key, tmp_path, replace=os.path.exists(cache.path_for(key)))
+
+    @staticmethod
+    def concat_segments(segment_paths: List[str], output_path: str, outpoint: Optional[float] = None) -> bool:
+        """
+        Junta clipes intermediários via concat demuxer (stream copy, sem re-encode).
+        Com `outpoint`, cada clipe é cortado nesse tempo (clipes do cache têm folga).
+        """
+        list_path = f"{output_path}.txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for path in segment_paths:
+                safe_path = os.path.abspath(path).replace("'", "'\\''")
+                f.write(f"file '{safe_path}'\n")
+                if outpoint is not None:
+                    f.write(f"outpoint {outpoint:.6f}\n")
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", list_path,
+            "-c", "copy",
+            output_path
+        ]
+        return FFmpegEngine.run_command(cmd)
+
+    @staticmethod
+    def build_frame_extract_filter(timestamps: List[float], size: str = "720x1280") -> str:
+        """
+        Um decode, N saídas: cada ramo do split descarta até o seu timestamp (trim)
+        e só escala/corta o frame que vai virar imagem.
+        """
+        width, height = size.split("x")
+        branches = "".join(f"[f{n}]" for n in range(len(timestamps)))
+        chains = [f"[0:v]split={len(timestamps)}{branches}"]
+        for n, timestamp in enumerate(timestamps):
+            chains.append(
+                f"[f{n}]trim=start={timestamp:.3f},setpts=PTS-STARTPTS,"
+                f"scale={width}:{height}:force_original_aspect_ratio=increase,"
+                f"crop={width}:{height},setsar=1[o{n}]"
+            )
+        return ";".join(chains)
+
+    @staticmethod
+    def extract_frames(video_path: str, frames: List[Tuple[float, str]], size: str = "720x1280", keyframes: Optional[List[float]] = None) -> List[str]:
+        """
+        Extrai vários frames de um vídeo num único processo ffmpeg.
+        `frames` é uma lista de (timestamp, caminho de destino); retorna os destinos gerados.
+        Com `keyframes`, o input começa no último keyframe antes do primeiro frame pedido.
+        """
+        if not frames:
+            return []
+        first = min(ts for ts, _ in frames)
+        seek = max((k for k in keyframes or [] if k <= first), default=0.0)
+        filter_complex = FFmpegEngine.build_frame_extract_filter([ts - seek for ts, _ in frames], size)
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error"]
+        if seek > 0:
+            cmd.extend(["-ss", f"{seek:.3f}"])
+        cmd.extend([
+            "-i", video_path,
+            "-filter_complex", filter_complex,
+        ])
+        for n, (_, dest_path) in enumerate(frames):
+            cmd.extend(["-map", f"[o{n}]", "-frames:v", "1", dest_path])
+        FFmpegEngine.run_command(cmd)
+        return [
+            dest_path for _, dest_path in frames
+            if os.path.exists(dest_path) and os.path.getsize(dest_path) > 1000
+        ]
+
+    @staticmethod
+    def assemble_video_segmented(audio_path: str, image_paths: list, subs_path: str, output_path: str, duration: float, logo_path: str = None, bg_music_path: str = None, workers: int = SEGMENT_WORKERS, segment_scenes: int = SEGMENT_SCENES, clip_cache: Optional[SceneClipCache] = None, profile: Optional[EncodeProfile] = None) -> bool:
+        """
+        Render segmentado: grupos de cenas viram clipes independentes em paralelo,
+        são unidos com concat demuxer e a passada final aplica logo, legendas e áudio.
+        Com `clip_cache`, cada cena vira um segmento reaproveitável entre renders.
+        """
+        profile = profile or get_profile("final")
+        num_images = len(image_paths)
+        if num_images == 0: return False
+
+        clip_duration = duration / num_images
+        if clip_cache is not None:
+            segment_scenes = 1
+        segments = FFmpegEngine.split_segments(num_images, segment_scenes)
+        cpu_count = os.cpu_count() or 1
+        workers = max(1, min(workers or cpu_count, len(segments)))
+        threads_per_segment = max(1, cpu_count // workers)
+
+        output_dir = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(output_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=".segments_", dir=output_dir)
+        try:
+            logger.info(f"🧩 Render segmentado: {len(segments)} segmentos | {workers} workers | {threads_per_segment} threads/segmento")
+
+            # Cada segmento é um processo ffmpeg independente; threads bastam para orquestrar.
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                if clip_cache is not None:
+                    segment_paths = list(executor.map(
+                        lambda idx: FFmpegEngine.render_cached_scene(image_paths, idx, clip_duration, profile, clip_cache, work_dir, threads_per_segment),
+                        range(num_images),
+                    ))
+                    results = segment_paths
+                else:
+                    segment_paths = [os.path.join(work_dir, f"segment_{n:03d}.mp4") for n in range(len(segments))]
+                    results = list(executor.map(
+                        lambda job: FFmpegEngine.render_segment(image_paths, job[0], clip_duration, profile, job[1], threads_per_segment),
+                        zip(segments, segment_paths),
+                    ))
+            if not all(results):
+                logger.error("❌ Falha renderizando um ou mais segmentos")
+                return False
+
+            base_path = os.path.join(work_dir, "video_base.mp4")
+            concat_ok = FFmpegEngine.concat_segments(
+                segment_paths, base_path, outpoint=clip_duration if clip_cache is not None else None,
+            )
+            if clip_cache is not None:
+                clip_cache.evict(keep=segment_paths)
+            if not concat_ok:
+                return False
+
+            # Passada final: logo, legendas e mixagem de áudio sobre o vídeo base
+            inputs = ["-i", base_path, "-i", audio_path]
+            has_logo = logo_path and os.path.exists(logo_path)
+            if has_logo: inputs.extend(["-i", logo_path])
+            has_music = bg_music_path and os.path.exists(bg_music_path)
+            if has_music: inputs.extend(["-stream_loop", "-1", "-i", bg_music_path])
+
+            logo_idx = 2 if has_logo else None
+            music_idx = (3 if has_logo else 2) if has_music else None
+            filter_complex = FFmpegEngine.build_finish_filter("[0:v]", subs_path, 1, logo_idx, music_idx)
+
+            cmd = [
+                "ffmpeg", "-y", "-threads", "0",
+                "-hide_banner", "-loglevel", "error"
+            ]
+            cmd.extend(inputs)
+            cmd.extend([
+                "-filter_complex", filter_complex,
+                "-map", "[v_out]", "-map", "[a_out]",
+                *profile.video_args(),
+                *profile.audio_args(), "-shortest",
+                output_path
+            ])
+            return FFmpegEngine.run_command(cmd)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
@@ -1,10 +1,10 @@
 import os
-import requests
 import json
 import base64
 import logging
 from typing import Optional
 from config import GEMINI_API_KEY, GEMINI_MODEL
+from core import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +51,7 @@ class GoogleGeminiTTS:
 
             try:
                 logger.info(f"🎙️ Tentando gerar áudio via Gemini REST API ({model}, Voz: {voice_name})...")
-                response = requests.post(
+                response = http_pool.post(
                     url, 
                     headers={"Content-Type": "application/json"},
                     json=payload,
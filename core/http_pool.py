@@ -0,0 +1,110 @@
+"""
+http_pool.py — camada HTTP compartilhada com pool de conexões por host.
+
+Os clientes (Hub, VideoLM, Gemini, Pollinations) chamam `http_pool.get/post`
+com a mesma assinatura de `requests.get/post`. Cada host ganha uma
+`requests.Session` com keep-alive e pool próprio, então polls frequentes
+(Hub a cada 10s, VideoLM a cada 5s) reaproveitam a conexão TCP+TLS.
+
+Configuração:
+    HTTP_POOL_MAXSIZE   — conexões mantidas por host (padrão 10)
+    HTTP_HOST_TIMEOUTS  — timeouts por host, ex. "image.pollinations.ai=90,localhost:8080=5";
+                          quando definido, vale no lugar do timeout passado pelo chamador
+"""
+import os
+import logging
+import threading
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+
+
+def _parse_host_timeouts(raw: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in (raw or "").split(","):
+        host, sep, value = item.strip().partition("=")
+        if not sep:
+            continue
+        try:
+            timeouts[host.strip().lower()] = float(value)
+        except ValueError:
+            logger.warning(f"⚠️ HTTP_HOST_TIMEOUTS inválido para '{host}': {value}")
+    return timeouts
+
+
+HOST_TIMEOUTS = _parse_host_timeouts(os.getenv("HTTP_HOST_TIMEOUTS", ""))
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def session_for(url: str) -> requests.Session:
+    """Session (keep-alive + pool) do host da URL, criada na primeira chamada."""
+    origin = _origin(url)
+    with _lock:
+        session = _sessions.get(origin)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[origin] = session
+        return session
+
+
+def timeout_for(url: str, timeout: Optional[float] = None) -> Optional[float]:
+    netloc = urlsplit(url).netloc.lower()
+    hostname = netloc.rsplit("@", 1)[-1].split(":", 1)[0]
+    return HOST_TIMEOUTS.get(netloc, HOST_TIMEOUTS.get(hostname, timeout))
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    kwargs["timeout"] = timeout_for(url, kwargs.get("timeout"))
+    return session_for(url).request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def iter_sse(response: requests.Response) -> Iterator[Optional[str]]:
+    """
+    Eventos de um stream text/event-stream: o `data` de cada evento, ou None
+    a cada comentário/keep-alive (`: ping`). Lê byte a byte para entregar cada
+    evento assim que chega (são pequenos e raros).
+    """
+    data_lines = []
+    for line in response.iter_lines(chunk_size=1, decode_unicode=True):
+        if line is None:
+            continue
+        if line.startswith(":"):
+            yield None
+        elif line.startswith("data:"):
+            data_lines.append(line[5:].strip())
+        elif line == "" and data_lines:
+            yield "\n".join(data_lines)
+            data_lines = []
+
+
+def close_all() -> None:
+    """Fecha todas as sessions (fim do worker / testes)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
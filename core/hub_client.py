@@ -13,15 +13,22 @@ import os
 import time
 import hmac
 import hashlib
+import gzip
 import json
 import logging
 import platform
 import shutil
 import subprocess
 import requests
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 from dotenv import load_dotenv
 
+from core import http_pool
+from core import remote_artifact
+from core.job_scheduler import SLOTS, read_memory_mb
+from core.media_probe import parse_fps as _parse_fps, probe_media
+from core.telemetry import RecentEvents, RendersCounter, StaticTelemetry, telemetry_delta
+
 # Carregar variáveis de ambiente do .env
 load_dotenv()
 
@@ -32,6 +39,12 @@ HUB_SECRET = os.getenv("HUB_SECRET", "homes_secret_dev")
 ENGINE_ID  = os.getenv("ENGINE_ID", f"engine_{platform.node()}")
 COMMAND_RESULTS = []
 MAX_COMMAND_RESULTS = 20
+# Atualizado pela última resposta de long-poll (header X-Homes-Long-Poll: 1)
+HUB_LONG_POLL_SUPPORTED: Optional[bool] = None  # None = Hub ainda não respondeu um long-poll
+UNSUPPORTED_STATUS = (404, 405, 501)
+LEASE_TTL  = int(os.getenv("HUB_LEASE_TTL", "120"))  # segundos
+HUB_GZIP   = os.getenv("HUB_GZIP", "0") == "1"
+HUB_GZIP_MIN_BYTES = int(os.getenv("HUB_GZIP_MIN_BYTES", "1024"))
 
 
 def _sign(payload: dict) -> str:
@@ -50,12 +63,24 @@ def _signed_body_and_headers(payload: dict) -> tuple[bytes, dict]:
     return body, headers
 
 
-def _post_signed(path: str, payload: dict, timeout: int = 10) -> requests.Response:
+def _post_signed(path: str, payload: dict, timeout: int = 10, compress: Optional[bool] = None) -> requests.Response:
+    """
+    POST assinado. Com `compress` (padrão HUB_GZIP) e corpo acima de
+    HUB_GZIP_MIN_BYTES, envia gzip com Content-Encoding; a assinatura continua
+    sendo do JSON descomprimido.
+    """
     body, headers = _signed_body_and_headers(payload)
-    return requests.post(f"{HUB_BASE}{path}", data=body, headers=headers, timeout=timeout)
+    if (HUB_GZIP if compress is None else compress) and len(body) >= HUB_GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return http_pool.post(f"{HUB_BASE}{path}", data=body, headers=headers, timeout=timeout)
 
 
 _VIDEOLM_ARTIFACT_TYPES_CACHE: Any = None
+_STATIC_TELEMETRY = StaticTelemetry()
+_RECENT_EVENTS = RecentEvents()
+_RENDERS_COUNTER = RendersCounter()
+TELEMETRY_DELTA = telemetry_delta()
 
 
 def _public_artifact_url(artifact_path: str) -> str:
@@ -136,6 +161,9 @@ def _is_video_artifact(path_or_url: str, content_type: str = "") -> bool:
 
 def _video_metadata(video_path: str) -> dict:
     metadata = {}
+    if remote_artifact.is_remote(video_path):
+        # Render mantido no VideoLM: metadados vêm do status, sem ffprobe
+        return remote_artifact.metadata(video_path)
     if not video_path or not os.path.exists(video_path):
         return metadata
 
@@ -144,91 +172,140 @@ def _video_metadata(video_path: str) -> dict:
     except OSError:
         pass
 
-    try:
-        result = subprocess.run(
-            [
-                "ffprobe",
-                "-v",
-                "error",
-                "-select_streams",
-                "v:0",
-                "-show_entries",
-                "stream=width,height,r_frame_rate,codec_name:format=duration",
-                "-of",
-                "json",
-                video_path,
-            ],
-            capture_output=True,
-            text=True,
-            timeout=10,
-            check=False,
-        )
-    except (OSError, subprocess.SubprocessError) as e:
-        logger.warning(f"Não foi possível ler metadata do vídeo {video_path}: {e}")
-        return metadata
+    info = probe_media(video_path)
+    if info.get("duration"):
+        metadata["duration_seconds"] = round(info["duration"], 3)
+    for key in ("width", "height", "codec", "fps"):
+        if info.get(key):
+            metadata[key] = info[key]
+    return metadata
 
-    if result.returncode != 0:
-        logger.warning(f"ffprobe falhou para {video_path}: {result.stderr[:200]}")
-        return metadata
 
+# ---------------------------------------------------------------------------
+# JOBS DE VÍDEO
+# ---------------------------------------------------------------------------
+
+def fetch_pending_job(wait: int = 0) -> Optional[dict]:
+    """
+    Retorna o próximo projeto PENDING ou None.
+    Com `wait`, pede long-poll: o Hub segura a requisição até `wait` segundos
+    esperando um job (Hubs sem suporte ignoram `?wait=` e respondem na hora).
+    HUB_LONG_POLL_SUPPORTED fica None quando não houve resposta conclusiva
+    (erro de rede ou 5xx), para o chamador não tirar conclusão de uma queda.
+    """
+    global HUB_LONG_POLL_SUPPORTED
     try:
-        data = json.loads(result.stdout or "{}")
-    except json.JSONDecodeError as e:
-        logger.warning(f"ffprobe retornou JSON inválido para {video_path}: {e}")
-        return metadata
+        if wait > 0:
+            HUB_LONG_POLL_SUPPORTED = None
+            r = http_pool.get(f"{HUB_BASE}/api/projects/pending", params={"wait": wait}, timeout=wait + 5)
+            if r.status_code == 200:
+                HUB_LONG_POLL_SUPPORTED = r.headers.get("X-Homes-Long-Poll") == "1"
+            elif r.status_code in UNSUPPORTED_STATUS:
+                HUB_LONG_POLL_SUPPORTED = False
+        else:
+            r = http_pool.get(f"{HUB_BASE}/api/projects/pending", timeout=5)
+        if r.status_code == 200:
+            data = r.json()
+            return data if data and data.get("id") else None
+    except requests.RequestException as e:
+        logger.warning(f"Hub offline ou inatingível: {e}")
+    return None
 
-    duration = (data.get("format") or {}).get("duration")
-    if duration:
+
+def stream_pending_jobs(idle_timeout: int = 30) -> Iterator[Optional[dict]]:
+    """
+    Assina o stream SSE de jobs (GET /api/projects/stream).
+    Gera um dict por job recebido e None a cada keep-alive (`: ping`), para o
+    chamador poder checar outras coisas. Termina quando o stream fecha ou fica
+    `idle_timeout` segundos sem nenhum byte; levanta RequestException se o Hub
+    não tem o endpoint.
+    """
+    with http_pool.get(
+        f"{HUB_BASE}/api/projects/stream",
+        headers={"Accept": "text/event-stream"},
+        stream=True,
+        timeout=(5, idle_timeout),
+    ) as r:
+        r.raise_for_status()
         try:
-            metadata["duration_seconds"] = round(float(duration), 3)
-        except (TypeError, ValueError):
-            pass
+            for data in http_pool.iter_sse(r):
+                if data is None:
+                    yield None
+                    continue
+                try:
+                    job = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(job, dict) and job.get("id"):
+                    yield job
+        except requests.RequestException:
+            # Timeout de leitura ou conexão caída: o chamador reconecta
+            return
 
-    streams = data.get("streams") or []
-    stream = streams[0] if streams else {}
-    if stream.get("width"):
-        metadata["width"] = int(stream["width"])
-    if stream.get("height"):
-        metadata["height"] = int(stream["height"])
-    if stream.get("codec_name"):
-        metadata["codec"] = stream["codec_name"]
 
-    fps = _parse_fps(stream.get("r_frame_rate", ""))
-    if fps:
-        metadata["fps"] = fps
+# ---------------------------------------------------------------------------
+# LEASES (claim de vários jobs de uma vez)
+# ---------------------------------------------------------------------------
 
-    return metadata
+def lease_jobs(limit: int, ttl: int = LEASE_TTL, wait: int = 0) -> Optional[list]:
+    """
+    Reserva até `limit` jobs PENDING por `ttl` segundos (POST /api/projects/lease).
+    Com `wait`, o Hub pode segurar a requisição até chegar algum job.
+    Retorna a lista de jobs ([] se nenhum) ou None se o Hub não suporta leases.
+    """
+    payload = {"engine_id": ENGINE_ID, "limit": limit, "ttl": ttl, "wait": wait, "timestamp": time.time()}
+    try:
+        r = _post_signed("/api/projects/lease", payload, timeout=wait + 10)
+        if r.status_code in UNSUPPORTED_STATUS:
+            return None
+        if not r.ok:
+            logger.warning(f"Hub rejeitou lease de jobs: {r.status_code} {r.text[:200]}")
+            return []
+        data = r.json()
+        jobs = data.get("jobs", []) if isinstance(data, dict) else data
+        return [job for job in jobs or [] if isinstance(job, dict) and job.get("id")]
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Falha ao reservar jobs no Hub: {e}")
+    return []
 
 
-def _parse_fps(value: str) -> float:
-    if not value:
-        return 0
+def renew_leases(job_ids: list, ttl: int = LEASE_TTL) -> list:
+    """
+    Renova os leases de `job_ids` (POST /api/projects/lease/renew).
+    Retorna os ids que o Hub NÃO renovou (lease expirado ou reatribuído).
+    Em erro de rede assume que nada foi perdido; a próxima renovação tenta de novo.
+    """
+    if not job_ids:
+        return []
+    payload = {"engine_id": ENGINE_ID, "ids": list(job_ids), "ttl": ttl, "timestamp": time.time()}
     try:
-        if "/" in value:
-            numerator, denominator = value.split("/", 1)
-            denominator_float = float(denominator)
-            if denominator_float == 0:
-                return 0
-            return round(float(numerator) / denominator_float, 3)
-        return round(float(value), 3)
-    except (TypeError, ValueError):
-        return 0
+        r = _post_signed("/api/projects/lease/renew", payload, timeout=10)
+        if r.ok:
+            data = r.json() if r.content else {}
+            renewed = data.get("renewed") if isinstance(data, dict) else None
+            if renewed is not None:
+                renewed = {str(job_id) for job_id in renewed}
+                return [job_id for job_id in job_ids if str(job_id) not in renewed]
+        else:
+            logger.warning(f"Hub rejeitou renovação de leases: {r.status_code} {r.text[:200]}")
+    except (requests.RequestException, ValueError) as e:
+        logger.error(f"Falha ao renovar leases: {e}")
+    return []
 
 
-# ---------------------------------------------------------------------------
-# JOBS DE VÍDEO
-# ---------------------------------------------------------------------------
-
-def fetch_pending_job() -> Optional[dict]:
-    """Retorna o próximo projeto PENDING ou None."""
+def release_leases(job_ids: list) -> bool:
+    """Devolve ao Hub jobs reservados que não serão processados (POST /api/projects/lease/release)."""
+    if not job_ids:
+        return True
+    payload = {"engine_id": ENGINE_ID, "ids": list(job_ids), "timestamp": time.time()}
     try:
-        r = requests.get(f"{HUB_BASE}/api/projects/pending", timeout=5)
-        if r.status_code == 200:
-            data = r.json()
-            return data if data and data.get("id") else None
+        r = _post_signed("/api/projects/lease/release", payload, timeout=10)
+        if not r.ok:
+            logger.warning(f"Hub rejeitou devolução de leases: {r.status_code} {r.text[:200]}")
+        return r.ok
     except requests.RequestException as e:
-        logger.warning(f"Hub offline ou inatingível: {e}")
-    return None
+        logger.error(f"Falha ao devolver leases: {e}")
+    return False
 
 
 def report_job_status(job_id: str, status: str, progress: int = 0, stage: str = "", message: str = "") -> bool:
@@ -335,24 +412,7 @@ def _get_local_telemetry() -> dict:
         "timestamp": time.strftime("%H:%M:%S"),
     }
     try:
-        from core.runtime import build_runtime_manifest, list_recipes, load_profile
-        from core.runtime.default_capabilities import build_default_registry
-
-        registry = build_default_registry()
-        profile = load_profile("default")
-        runtime_manifest = build_runtime_manifest(registry, profile, include_experimental=False)
-        capabilities = runtime_manifest["capabilities"]
-        telemetry["capabilities_count"] = len(capabilities)
-        telemetry["capabilities"] = [
-            {
-                "id": capability["id"],
-                "category": capability["category"],
-                "experimental": capability["experimental"],
-            }
-            for capability in capabilities
-        ]
-        telemetry["runtime_manifest"] = runtime_manifest
-        telemetry["recipes"] = list_recipes()
+        telemetry.update(_STATIC_TELEMETRY.section())
     except Exception as e:
         logger.warning(f"Falha ao anexar capabilities na telemetria: {e}")
     artifact_types = _videolm_artifact_types_for_telemetry()
@@ -361,17 +421,19 @@ def _get_local_telemetry() -> dict:
         telemetry["artifact_types"] = artifact_types
         runtime_manifest = telemetry.get("runtime_manifest")
         if isinstance(runtime_manifest, dict):
-            runtime_manifest["artifactTypes"] = artifact_types
-            runtime_manifest["artifact_types"] = artifact_types
-            runtime_manifest["videolm"] = {
-                **(runtime_manifest.get("videolm") or {}),
+            # Cópia: o manifest em cache não muda
+            telemetry["runtime_manifest"] = {
+                **runtime_manifest,
                 "artifactTypes": artifact_types,
                 "artifact_types": artifact_types,
+                "videolm": {
+                    **(runtime_manifest.get("videolm") or {}),
+                    "artifactTypes": artifact_types,
+                    "artifact_types": artifact_types,
+                },
             }
     try:
-        from core.runtime import StateStore
-
-        telemetry["recent_runtime_events"] = StateStore().recent_events(limit=10)
+        telemetry["recent_runtime_events"] = _RECENT_EVENTS.get()
     except Exception as e:
         logger.warning(f"Falha ao anexar eventos runtime na telemetria: {e}")
     if COMMAND_RESULTS:
@@ -384,26 +446,18 @@ def _get_local_telemetry() -> dict:
     except Exception:
         pass
     # RAM
-    try:
-        with open("/proc/meminfo") as f:
-            lines = f.readlines()
-        total = int(lines[0].split()[1]) // 1024
-        free  = int(lines[2].split()[1]) // 1024  # MemAvailable
+    total, free = read_memory_mb()
+    if total:
         telemetry["ram_usage"] = f"{total - free}/{total}MB"
         telemetry["ram_free_mb"] = free
-    except Exception:
-        pass
-    # Output dir size
+    telemetry["job_slots"] = dict(SLOTS.limits)
+    # Output dir size (contadores incrementais)
     try:
-        renders = os.path.join("output", "renders")
-        if os.path.exists(renders):
-            total_bytes = sum(
-                os.path.getsize(os.path.join(renders, f))
-                for f in os.listdir(renders)
-                if os.path.isfile(os.path.join(renders, f))
-            )
+        renders = _RENDERS_COUNTER.refresh()
+        if renders:
+            total_bytes, count = renders
             telemetry["renders_size_mb"] = f"{total_bytes / 1e6:.1f}"
-            telemetry["renders_count"] = len(os.listdir(renders))
+            telemetry["renders_count"] = count
     except Exception:
         pass
     telemetry["engine_active"] = True
@@ -436,12 +490,15 @@ def _videolm_artifact_types_for_telemetry() -> Any:
 
 
 def push_telemetry() -> bool:
-    """Envia métricas locais para o Hub (POST /api/sensors)."""
-    data = _get_local_telemetry()
+    """Envia métricas locais para o Hub (POST /api/sensors); seções grandes só quando mudam."""
+    snapshot = _get_local_telemetry()
+    data = TELEMETRY_DELTA.payload(snapshot)
     try:
         r = _post_signed("/api/sensors", data, timeout=5)
+        TELEMETRY_DELTA.sent(snapshot, r.ok)
         return r.ok
     except requests.RequestException:
+        TELEMETRY_DELTA.sent(snapshot, False)
         return False
 
 
@@ -455,7 +512,7 @@ def poll_commands() -> list:
     Retorna lista de {command, args} ou [].
     """
     try:
-        r = requests.get(f"{HUB_BASE}/api/actuators/mobile/poll", timeout=5)
+        r = http_pool.get(f"{HUB_BASE}/api/actuators/mobile/poll", timeout=5)
         if r.ok:
             return r.json().get("commands", [])
     except requests.RequestException:
@@ -635,7 +692,7 @@ def _remember_command_result(command: str, result: dict) -> dict:
 
 def hub_is_alive() -> bool:
     try:
-        r = requests.get(f"{HUB_BASE}/health", timeout=3)
+        r = http_pool.get(f"{HUB_BASE}/health", timeout=3)
         return r.ok
     except Exception:
         return False
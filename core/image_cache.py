@@ -0,0 +1,78 @@
+"""
+image_cache.py — cache em disco das imagens geradas (Gemini / FLUX).
+
+A chave é (prompt aprimorado, modelo, largura, altura, seed): cenas repetidas
+entre variações de marca e jobs re-tentados saem do disco em vez da rede.
+Cada job recebe uma cópia no próprio diretório, então jobs concorrentes não
+disputam mais `assets/generated/scene_XXX.jpg`. Eviction por tamanho (LRU) e
+por idade.
+"""
+import os
+import hashlib
+import logging
+import shutil
+from typing import Optional
+
+from config import OUTPUT_DIR
+from core.clip_cache import SceneClipCache
+
+logger = logging.getLogger(__name__)
+
+IMAGE_CACHE_DIR = os.path.join(OUTPUT_DIR, "cache", "images")
+IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE", "1") != "0"
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "1024"))
+IMAGE_CACHE_MAX_AGE_DAYS = float(os.getenv("IMAGE_CACHE_MAX_AGE_DAYS", "30"))
+
+
+class GeneratedImageCache(SceneClipCache):
+    """Imagens geradas indexadas pelos parâmetros de geração, não por arquivo de origem."""
+
+    SUFFIX = ".img"
+    LABEL = "Image cache"
+
+    def __init__(
+        self,
+        root: str = IMAGE_CACHE_DIR,
+        max_bytes: int = IMAGE_CACHE_MAX_MB * 1_048_576,
+        max_age: float = IMAGE_CACHE_MAX_AGE_DAYS * 86400,
+    ):
+        super().__init__(root, max_bytes, max_age)
+
+    def key(self, *params: object) -> str:
+        digest = hashlib.sha256()
+        for param in params:
+            digest.update(str(param).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def put_bytes(self, key: str, data: bytes) -> str:
+        """Grava a imagem de forma atômica (tmp + rename) e devolve o caminho no cache."""
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{id(data)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def materialize(self, key: str, dest_path: str) -> Optional[str]:
+        """Copia a entrada para `dest_path` (o job pode mover/apagar a cópia à vontade)."""
+        cached = self.get(key)
+        if cached is None:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+        tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        shutil.copyfile(cached, tmp_path)
+        os.replace(tmp_path, dest_path)
+        return dest_path
+
+
+def default_image_cache() -> Optional[GeneratedImageCache]:
+    """Cache padrão em output/cache/images, ou None se IMAGE_CACHE=0."""
+    if not IMAGE_CACHE_ENABLED:
+        return None
+    try:
+        return GeneratedImageCache()
+    except OSError as e:
+        logger.warning(f"⚠️ Image cache indisponível: {e}")
+        return None
@@ -1,17 +1,20 @@
-import requests
 import logging
 import os
 import base64
+import hashlib
 import urllib.parse
 import time
 from pathlib import Path
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from config import ASSETS_DIR
 from PIL import Image, ImageDraw, ImageFont
 
 logger = logging.getLogger(__name__)
 
+from core import http_pool
 from core.key_utils import get_gemini_keys
+from core.image_cache import GeneratedImageCache, default_image_cache
 
 class ImageGenerator:
     """
@@ -22,10 +25,12 @@ class ImageGenerator:
     POLLINATIONS_URL = "https://image.pollinations.ai/prompt/"
     # Imagen 3 via Gemini API (pode mudar dependendo da lib)
     GEMINI_MODEL = "gemini-1.5-flash" 
+    POLLINATIONS_MODEL = "flux"
 
-    def __init__(self):
+    def __init__(self, cache: Optional[GeneratedImageCache] = None):
         self.api_keys = get_gemini_keys()
         self.current_idx = 0
+        self._cache = cache
 
     def _enhance_prompt(self, base_prompt: str) -> str:
         """Adiciona camadas de qualidade cinematográfica ao prompt."""
@@ -36,29 +41,83 @@ class ImageGenerator:
         )
         return f"{base_prompt}, {cinematic_tags}"
 
-    def generate(self, prompt: str, filename: str, width: int = 720, height: int = 1280) -> Optional[str]:
-        """Orquestra a geração com resiliência máxima."""
+    def generate(
+        self,
+        prompt: str,
+        filename: str,
+        width: int = 720,
+        height: int = 1280,
+        seed: Optional[int] = None,
+        output_dir: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Orquestra a geração com resiliência máxima.
+        Resultados remotos passam pelo cache de imagens (prompt, modelo, tamanho, seed);
+        o arquivo devolvido é sempre uma cópia em `output_dir` (padrão: assets/generated).
+        """
         enhanced_prompt = self._enhance_prompt(prompt)
-        
+        if seed is None:
+            seed = _prompt_seed(enhanced_prompt)
+        output_path = Path(output_dir or Path(ASSETS_DIR) / "generated") / filename
+        cache = self.cache
+        keys = {
+            model: cache.key(enhanced_prompt, model, width, height, seed) if cache else None
+            for model in (self.GEMINI_MODEL, self.POLLINATIONS_MODEL)
+        }
+
+        if cache:
+            for model, key in keys.items():
+                try:
+                    result = cache.materialize(key, str(output_path))
+                except OSError as e:
+                    # Entrada ilegível ou destino com problema: segue para a geração
+                    logger.warning(f"⚠️ Falha lendo imagem do cache ({model}): {e}")
+                    continue
+                if result:
+                    logger.info(f"♻️  Imagem reaproveitada do cache ({model}): {output_path}")
+                    return str(output_path.absolute())
+
         # 1. Tenta Gemini Image com Rotação de Chaves
         for _ in range(len(self.api_keys)):
             key = self.api_keys[self.current_idx]
-            result = self._try_gemini(enhanced_prompt, filename, key)
-            if result:
-                return result
+            image_data = self._try_gemini(enhanced_prompt, key)
+            if image_data:
+                logger.info(f"✅ Imagem gerada via Gemini ({key[:6]}): {output_path}")
+                return self._save_result(image_data, output_path, keys[self.GEMINI_MODEL])
             # Se falhou, rotaciona a chave e tenta novamente
             self.current_idx = (self.current_idx + 1) % len(self.api_keys)
 
         # 2. Fallback para Pollinations (Flux) - Garantia de entrega
         logger.warning("⚠️ Todas as chaves Gemini falharam na imagem. Usando FLUX (VIP)...")
-        result = self._try_pollinations(enhanced_prompt, filename, width, height)
-        if result:
-            return result
+        image_data = self._try_pollinations(enhanced_prompt, width, height, seed)
+        if image_data:
+            logger.info(f"✅ Imagem gerada via FLUX: {output_path}")
+            return self._save_result(image_data, output_path, keys[self.POLLINATIONS_MODEL])
 
         logger.warning("⚠️ FLUX indisponível. Gerando fallback visual local...")
-        return self._create_local_fallback(prompt, filename, width, height)
+        return self.create_title_cards([(prompt, filename)], width, height, output_dir=str(output_path.parent))[0]
+
+    @property
+    def cache(self) -> Optional[GeneratedImageCache]:
+        if self._cache is None:
+            self._cache = default_image_cache()
+        return self._cache
+
+    def _save_result(self, image_data: bytes, output_path: Path, cache_key: Optional[str]) -> Optional[str]:
+        try:
+            if self.cache and cache_key:
+                self.cache.put_bytes(cache_key, image_data)
+                self.cache.materialize(cache_key, str(output_path))
+                self.cache.evict()
+            else:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(output_path, "wb") as f: f.write(image_data)
+            return str(output_path.absolute())
+        except OSError as e:
+            logger.error(f"❌ Falha salvando imagem gerada {output_path}: {e}")
+            return None
 
-    def _try_gemini(self, prompt: str, filename: str, key: str) -> Optional[str]:
+    def _try_gemini(self, prompt: str, key: str) -> Optional[bytes]:
         """Tenta gerar via Imagen/Gemini API."""
         url = f"https://generativelanguage.googleapis.com/v1beta/models/{self.GEMINI_MODEL}:generateContent?key={key}"
         # Nota: Geração de imagem via Gemini 2.0 exige response_modalities=["IMAGE"]
@@ -68,92 +127,116 @@ class ImageGenerator:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=40)
+            response = http_pool.post(url, json=payload, timeout=40)
             if response.status_code == 200:
                 data = response.json()
                 # Verifica se retornou dados de imagem inline
                 parts = data['candidates'][0]['content']['parts']
                 for part in parts:
                     if 'inlineData' in part:
-                        image_data = base64.b64decode(part['inlineData']['data'])
-                        output_path = Path(ASSETS_DIR) / "generated" / filename
-                        output_path.parent.mkdir(exist_ok=True)
-                        with open(output_path, "wb") as f: f.write(image_data)
-                        logger.info(f"✅ Imagem gerada via Gemini ({key[:6]}): {output_path}")
-                        return str(output_path.absolute())
+                        return base64.b64decode(part['inlineData']['data'])
         except Exception: pass
         return None
 
-    def _try_pollinations(self, prompt: str, filename: str, width: int, height: int) -> Optional[str]:
+    def _try_pollinations(self, prompt: str, width: int, height: int, seed: int) -> Optional[bytes]:
         """Gera via Pollinations (FLUX) - Inquebrável."""
         encoded = urllib.parse.quote(prompt)
-        seed = os.urandom(4).hex()
-        url = f"{self.POLLINATIONS_URL}{encoded}?model=flux&width={width}&height={height}&seed={seed}&nologo=true"
+        url = f"{self.POLLINATIONS_URL}{encoded}?model={self.POLLINATIONS_MODEL}&width={width}&height={height}&seed={seed}&nologo=true"
         
         try:
-            output_path = Path(ASSETS_DIR) / "generated" / filename
-            output_path.parent.mkdir(exist_ok=True)
-            
-            response = requests.get(url, timeout=60)
+            response = http_pool.get(url, timeout=60)
             if response.status_code == 200:
-                with open(output_path, "wb") as f: f.write(response.content)
-                logger.info(f"✅ Imagem gerada via FLUX: {output_path}")
-                return str(output_path.absolute())
+                return response.content
         except Exception as e:
             logger.error(f"❌ Falha crítica no FLUX: {e}")
         return None
 
     def _create_local_fallback(self, prompt: str, filename: str, width: int, height: int) -> Optional[str]:
         """Cria uma imagem vertical simples para manter o pipeline de vídeo funcional."""
+        return self.create_title_cards([(prompt, filename)], width, height)[0]
+
+    def create_title_cards(
+        self,
+        cards: List[Tuple[str, str]],
+        width: int = 720,
+        height: int = 1280,
+        output_dir: Optional[str] = None,
+    ) -> List[Optional[str]]:
+        """
+        Renderiza um lote de title cards locais sobre a mesma base (gradiente + faixas).
+        `cards` é uma lista de (prompt, filename); retorna os caminhos na mesma ordem.
+        """
+        out_dir = Path(output_dir) if output_dir else Path(ASSETS_DIR) / "generated"
         try:
-            output_path = Path(ASSETS_DIR) / "generated" / filename
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            img = Image.new("RGB", (width, height), "#111827")
-            draw = ImageDraw.Draw(img)
-
-            for y in range(height):
-                ratio = y / max(1, height - 1)
-                r = int(17 + ratio * 18)
-                g = int(24 + ratio * 55)
-                b = int(39 + ratio * 85)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-
-            accent = "#f8c537"
-            draw.rectangle([48, 72, width - 48, 88], fill=accent)
-            draw.rectangle([48, height - 132, width - 48, height - 124], fill=accent)
-
-            try:
-                font_title = ImageFont.truetype(str(Path(ASSETS_DIR) / "fonts" / "Montserrat-ExtraBold.ttf"), 42)
-                font_body = ImageFont.truetype(str(Path(ASSETS_DIR) / "fonts" / "Montserrat-ExtraBold.ttf"), 28)
-            except Exception:
-                font_title = ImageFont.load_default()
-                font_body = ImageFont.load_default()
-
-            draw.text((48, 130), "HOMES ENGINE", fill="#ffffff", font=font_title)
-
-            words = prompt.replace("\n", " ").split()
-            lines = []
-            current = []
-            for word in words[:42]:
-                current.append(word)
-                if len(" ".join(current)) > 24:
-                    lines.append(" ".join(current[:-1]))
-                    current = [word]
-            if current:
-                lines.append(" ".join(current))
-
-            y = 250
-            for line in lines[:9]:
-                draw.text((48, y), line.upper(), fill="#e5e7eb", font=font_body)
-                y += 46
-
-            img.save(output_path, "JPEG", quality=92)
-            logger.info(f"✅ Imagem fallback local criada: {output_path}")
-            return str(output_path.absolute())
+            out_dir.mkdir(parents=True, exist_ok=True)
+            base = _base_canvas(width, height)
         except Exception as e:
             logger.error(f"❌ Falha ao criar imagem fallback local: {e}")
-            return None
+            return [None] * len(cards)
+
+        font_body = _load_font(28)
+        results = []
+        for prompt, filename in cards:
+            output_path = out_dir / filename
+            try:
+                img = base.copy()
+                draw = ImageDraw.Draw(img)
+                y = 250
+                for line in _wrap_prompt(prompt)[:9]:
+                    draw.text((48, y), line.upper(), fill="#e5e7eb", font=font_body)
+                    y += 46
+
+                img.save(output_path, "JPEG", quality=92)
+                logger.info(f"✅ Imagem fallback local criada: {output_path}")
+                results.append(str(output_path.absolute()))
+            except Exception as e:
+                logger.error(f"❌ Falha ao criar imagem fallback local: {e}")
+                results.append(None)
+        return results
+
+
+@lru_cache(maxsize=8)
+def _load_font(size: int):
+    try:
+        return ImageFont.truetype(str(Path(ASSETS_DIR) / "fonts" / "Montserrat-ExtraBold.ttf"), size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+@lru_cache(maxsize=8)
+def _base_canvas(width: int, height: int, accent: str = "#f8c537") -> Image.Image:
+    """Fundo em gradiente, faixas e cabeçalho — igual para todos os title cards do mesmo tamanho."""
+    # Uma coluna com o gradiente, esticada na horizontal (sem loop por linha no Python)
+    column = bytearray()
+    for y in range(height):
+        ratio = y / max(1, height - 1)
+        column += bytes((int(17 + ratio * 18), int(24 + ratio * 55), int(39 + ratio * 85)))
+    img = Image.frombytes("RGB", (1, height), bytes(column)).resize((width, height), Image.NEAREST)
+
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([48, 72, width - 48, 88], fill=accent)
+    draw.rectangle([48, height - 132, width - 48, height - 124], fill=accent)
+    draw.text((48, 130), "HOMES ENGINE", fill="#ffffff", font=_load_font(42))
+    return img
+
+
+def _prompt_seed(prompt: str) -> int:
+    """Seed determinística por prompt: o mesmo prompt gera (e reaproveita) a mesma imagem."""
+    return int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _wrap_prompt(prompt: str) -> List[str]:
+    words = prompt.replace("\n", " ").split()
+    lines = []
+    current = []
+    for word in words[:42]:
+        current.append(word)
+        if len(" ".join(current)) > 24:
+            lines.append(" ".join(current[:-1]))
+            current = [word]
+    if current:
+        lines.append(" ".join(current))
+    return lines
 
 # Função estática de compatibilidade
 def generate_image(prompt: str, filename: str) -> Optional[str]:
@@ -0,0 +1,269 @@
+"""
+job_acquisition.py — como o worker busca jobs no Hub.
+
+Modos (HUB_ACQUIRE_MODE):
+    poll       — GET /api/projects/pending a cada ciclo (comportamento antigo)
+    long-poll  — GET ...?wait=N: o Hub segura a requisição até chegar um job
+    sse        — stream de eventos em /api/projects/stream
+    auto       — tenta sse, cai para long-poll e depois para poll quando o Hub
+                 responde que não suporta (404/405/501, ou 200 sem
+                 X-Homes-Long-Poll); queda de conexão só adia a próxima
+                 tentativa no mesmo modo, com backoff
+
+Se o Hub suporta leases (POST /api/projects/lease), qualquer modo passa a
+reservar vários jobs por requisição (`LeasedJobQueue`): os jobs ficam numa
+fila local, os leases são renovados pelo heartbeat do worker e os que não
+começaram são devolvidos no desligamento.
+
+Sem job, o intervalo até a próxima tentativa cresce em backoff exponencial
+(HUB_IDLE_MIN_DELAY → HUB_IDLE_MAX_DELAY); depois de um job concluído a
+próxima busca é imediata.
+"""
+import os
+import logging
+import threading
+import time
+from collections import deque
+from typing import Iterator, List, Optional
+
+import requests
+
+from core import hub_client
+
+logger = logging.getLogger(__name__)
+
+ACQUIRE_MODE = os.getenv("HUB_ACQUIRE_MODE", "auto").lower()
+LONG_POLL_WAIT = int(os.getenv("HUB_LONG_POLL_WAIT", "25"))
+IDLE_MIN_DELAY = float(os.getenv("HUB_IDLE_MIN_DELAY", "2"))
+IDLE_MAX_DELAY = float(os.getenv("HUB_IDLE_MAX_DELAY", "60"))
+LEASE_BATCH = int(os.getenv("HUB_LEASE_BATCH", "0"))  # 0 = slots do worker, -1 = desliga leases
+
+
+def _unsupported(error: requests.RequestException) -> bool:
+    """Resposta definitiva de que o Hub não tem o endpoint (não uma queda de rede)."""
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code in hub_client.UNSUPPORTED_STATUS
+
+
+def job_succeeded(future) -> bool:
+    """Future de job terminou sem exceção e com resultado verdadeiro."""
+    return not future.cancelled() and future.exception() is None and bool(future.result())
+
+
+class AdaptiveBackoff:
+    """Atraso exponencial enquanto ocioso; volta ao mínimo em `reset()`."""
+
+    def __init__(self, min_delay: float = IDLE_MIN_DELAY, max_delay: float = IDLE_MAX_DELAY, factor: float = 2.0):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.factor = factor
+        self._current = min_delay
+
+    def next(self) -> float:
+        delay = self._current
+        self._current = min(self.max_delay, self._current * self.factor)
+        return delay
+
+    def reset(self) -> None:
+        self._current = self.min_delay
+
+
+class LeasedJobQueue:
+    """
+    Fila local de jobs reservados no Hub.
+
+    Reserva até `batch_size` jobs por requisição (descontando os que já estão
+    reservados), entrega um por vez e acompanha os ids reservados até o job
+    terminar. `supported` vira False na primeira resposta 404/405 do Hub.
+    """
+
+    def __init__(self, batch_size: int, ttl: int = hub_client.LEASE_TTL):
+        self.batch_size = max(1, batch_size)
+        self.ttl = ttl
+        self.supported = True
+        self._pending: deque = deque()
+        self._held: set = set()
+        self._lock = threading.Lock()
+        self._last_renew = time.monotonic()
+
+    @property
+    def renew_interval(self) -> float:
+        return max(1.0, self.ttl / 3)
+
+    def held(self) -> List[str]:
+        with self._lock:
+            return sorted(self._held)
+
+    def next(self, wait: int = 0) -> Optional[dict]:
+        """Próximo job reservado; reserva um novo lote quando a fila local esvazia."""
+        with self._lock:
+            if self._pending:
+                return self._pending.popleft()
+            limit = self.batch_size - len(self._held)
+        if limit <= 0 or not self.supported:
+            return None
+        jobs = hub_client.lease_jobs(limit, ttl=self.ttl, wait=wait)
+        if jobs is None:
+            logger.info("📉 Hub sem suporte a leases — buscando um job por vez")
+            self.supported = False
+            return None
+        if not jobs:
+            return None
+        logger.info(f"📦 {len(jobs)} job(s) reservados por {self.ttl}s")
+        with self._lock:
+            self._held.update(str(job["id"]) for job in jobs)
+            self._pending.extend(jobs)
+            self._last_renew = time.monotonic()
+            return self._pending.popleft()
+
+    def done(self, job_id) -> None:
+        """Job terminou (o Hub encerra o lease ao receber complete/error)."""
+        with self._lock:
+            self._held.discard(str(job_id))
+
+    def renew(self, force: bool = False) -> List[str]:
+        """Renova os leases se passou `renew_interval`; descarta da fila local os que o Hub perdeu."""
+        if not force and time.monotonic() - self._last_renew < self.renew_interval:
+            return []
+        job_ids = self.held()
+        self._last_renew = time.monotonic()
+        lost = hub_client.renew_leases(job_ids, ttl=self.ttl) if job_ids else []
+        if lost:
+            logger.warning(f"⚠️ Leases perdidos: {', '.join(lost)}")
+            lost_set = set(lost)
+            with self._lock:
+                self._held -= lost_set
+                self._pending = deque(job for job in self._pending if str(job["id"]) not in lost_set)
+        return lost
+
+    def release_pending(self) -> List[str]:
+        """Devolve ao Hub os jobs reservados que ainda não começaram."""
+        with self._lock:
+            job_ids = [str(job["id"]) for job in self._pending]
+            self._pending.clear()
+            self._held -= set(job_ids)
+        if job_ids and hub_client.release_leases(job_ids):
+            logger.info(f"↩️  {len(job_ids)} job(s) devolvidos ao Hub")
+        return job_ids
+
+
+class JobAcquirer:
+    """Busca o próximo job no modo mais eficiente que o Hub suporta."""
+
+    MODES = ("sse", "long-poll", "poll")
+
+    def __init__(
+        self,
+        mode: str = ACQUIRE_MODE,
+        wait: int = LONG_POLL_WAIT,
+        backoff: Optional[AdaptiveBackoff] = None,
+        leases: Optional[LeasedJobQueue] = None,
+    ):
+        self.mode = "sse" if mode == "auto" else mode
+        if self.mode not in self.MODES:
+            logger.warning(f"⚠️ HUB_ACQUIRE_MODE desconhecido '{mode}', usando poll")
+            self.mode = "poll"
+        self.auto = mode == "auto"
+        self.wait = wait
+        self.backoff = backoff or AdaptiveBackoff()
+        self.wake = threading.Event()
+        self.leases = leases
+        self._stream: Optional[Iterator[Optional[dict]]] = None
+        # Última tentativa de sse/long-poll falhou na rede: espera com backoff
+        self._failing = False
+
+    def _leasing(self) -> bool:
+        return self.leases is not None and self.leases.supported
+
+    def acquire(self) -> Optional[dict]:
+        """Próximo job ou None. Em long-poll/sse pode bloquear até ~`wait` segundos."""
+        if self._leasing():
+            job = self.leases.next(wait=0 if self.mode == "poll" else self.wait)
+            if job or self.leases.supported:
+                return job
+        if self.mode == "sse":
+            return self._from_stream()
+        if self.mode == "long-poll":
+            job = hub_client.fetch_pending_job(wait=self.wait)
+            supported = hub_client.HUB_LONG_POLL_SUPPORTED
+            self._failing = supported is None
+            if not job and self.auto and supported is False:
+                self._downgrade("poll", "Hub não segura requisições (sem X-Homes-Long-Poll)")
+            return job
+        return hub_client.fetch_pending_job()
+
+    def _from_stream(self) -> Optional[dict]:
+        try:
+            if self._stream is None:
+                self._stream = hub_client.stream_pending_jobs(idle_timeout=self.wait + 5)
+            # Pings só mantêm a conexão viva: espera por um job até `wait` segundos
+            deadline = time.monotonic() + self.wait
+            job = next(self._stream, False)
+            while job is None and time.monotonic() < deadline:
+                job = next(self._stream, False)
+        except requests.RequestException as e:
+            self._stream = None
+            if self.auto and _unsupported(e):
+                self._downgrade("long-poll", f"stream SSE indisponível ({e})")
+                return self.acquire()
+            logger.warning(f"Stream de jobs caiu: {e}")
+            self._failing = True
+            return None
+        self._failing = False
+        if job is False:
+            # Stream terminou (timeout ocioso / Hub reiniciou): reconecta na próxima chamada
+            self._stream = None
+            return None
+        return job
+
+    def _downgrade(self, mode: str, reason: str) -> None:
+        logger.info(f"📉 Aquisição de jobs: {self.mode} → {mode} ({reason})")
+        self.mode = mode
+        self._failing = False
+
+    def idle_delay(self) -> float:
+        """Quanto esperar antes da próxima busca quando não veio job."""
+        if self.mode in ("sse", "long-poll") and not self._failing:
+            # O próprio Hub (stream, long-poll ou lease com wait) já segurou a requisição; só evita loop quente se ele responder na hora
+            return self.backoff.min_delay
+        return self.backoff.next()
+
+    def got_job(self) -> None:
+        self.backoff.reset()
+
+    def job_finished(self, *args, job: Optional[dict] = None) -> None:
+        """
+        Chamado ao fim de um job (callback de future): libera o lease e, se o
+        job deu certo, zera o backoff e acorda o loop para buscar o próximo.
+        Falha não acorda o loop: a próxima busca espera o intervalo normal.
+        """
+        if job and self.leases is not None:
+            self.leases.done(job.get("id"))
+        if args and not job_succeeded(args[0]):
+            return
+        self.backoff.reset()
+        self.wake.set()
+
+    def renew_leases(self, force: bool = False) -> List[str]:
+        """Heartbeat dos leases: renova os jobs reservados. Retorna os ids perdidos."""
+        return self.leases.renew(force) if self._leasing() else []
+
+    def close(self) -> None:
+        """Desligamento: devolve os jobs reservados que não começaram e fecha o stream."""
+        if self._leasing():
+            self.leases.release_pending()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def sleep(self, delay: float) -> None:
+        """Espera `delay` segundos ou até `job_finished` acordar o loop."""
+        self.wake.wait(timeout=delay)
+        self.wake.clear()
+
+
+def default_acquirer(max_jobs: int, wait: int = LONG_POLL_WAIT) -> JobAcquirer:
+    """Acquirer do worker: leases em lotes de HUB_LEASE_BATCH (ou `max_jobs`) quando o Hub suporta."""
+    batch = LEASE_BATCH or max_jobs
+    leases = LeasedJobQueue(batch) if batch > 0 else None
+    return JobAcquirer(wait=wait, leases=leases)
@@ -0,0 +1,159 @@
+"""
+job_scheduler.py — execução concorrente de jobs com slots por recurso.
+
+Um job passa a maior parte do tempo esperando APIs remotas (TTS, imagens,
+upload/poll do VideoLM) e só uma parte rodando ffmpeg. Por isso há dois
+pools de slots independentes:
+
+    network — TTS, geração de imagem, upload para o VideoLM
+    cpu     — ffmpeg (render local, extração de frames de b-roll)
+
+`plan_slots` deriva quantos jobs rodam em paralelo a partir dos cores, da
+RAM livre e do perfil de encode ativo; `JobScheduler` mantém até esse
+número de jobs em andamento num pool de threads.
+"""
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.encode_profiles import DEFAULT_PROFILE, PROFILES
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_JOBS = int(os.getenv("WORKER_MAX_JOBS", "0"))  # 0 = automático
+NETWORK_SLOTS = int(os.getenv("WORKER_NETWORK_SLOTS", "0"))   # 0 = automático
+# Jobs por slot de ffmpeg: o resto do tempo o job está esperando rede
+JOBS_PER_CPU_SLOT = int(os.getenv("WORKER_JOBS_PER_CPU_SLOT", "2"))
+
+# Custo aproximado de um render local por perfil: (cores por ffmpeg, MB de RAM por job)
+PROFILE_COST = {
+    "draft":   (1, 300),
+    "preview": (2, 600),
+    "final":   (2, 900),
+    "archive": (4, 1400),
+}
+
+
+@dataclass(frozen=True)
+class SlotPlan:
+    jobs: int
+    network: int
+    cpu: int
+
+
+def read_memory_mb() -> Tuple[int, int]:
+    """(total, disponível) em MB a partir de /proc/meminfo; (0, 0) se indisponível."""
+    try:
+        with open("/proc/meminfo") as f:
+            lines = f.readlines()
+        total = int(lines[0].split()[1]) // 1024
+        free  = int(lines[2].split()[1]) // 1024  # MemAvailable
+        return total, free
+    except Exception:
+        return 0, 0
+
+
+def plan_slots(cores: Optional[int] = None, free_ram_mb: Optional[int] = None, profile_name: str = "") -> SlotPlan:
+    cores = cores or os.cpu_count() or 1
+    if free_ram_mb is None:
+        free_ram_mb = read_memory_mb()[1]
+    profile_name = (profile_name or DEFAULT_PROFILE).lower()
+    cores_per_render, ram_per_job = PROFILE_COST.get(profile_name if profile_name in PROFILES else "final")
+
+    cpu = max(1, cores // cores_per_render)
+    jobs = cpu * max(1, JOBS_PER_CPU_SLOT)
+    if free_ram_mb:
+        jobs = min(jobs, max(1, free_ram_mb // ram_per_job))
+    if MAX_CONCURRENT_JOBS:
+        jobs = min(jobs, MAX_CONCURRENT_JOBS)
+    network = NETWORK_SLOTS or max(2, jobs * 2)
+    return SlotPlan(jobs=jobs, network=network, cpu=min(cpu, jobs))
+
+
+class ResourceSlots:
+    """
+    Semáforos por classe de recurso, compartilhados pelos jobs do processo.
+    Com `shared` (semáforos de um multiprocessing.Manager), o limite vale para
+    todos os processos de um process pool, não só para as threads deste.
+    """
+
+    def __init__(self, network: int = 4, cpu: int = 1, shared: Optional[Dict[str, Any]] = None):
+        self.configure(network, cpu, shared)
+
+    def configure(self, network: int, cpu: int, shared: Optional[Dict[str, Any]] = None) -> None:
+        self.limits = {"network": max(1, network), "cpu": max(1, cpu)}
+        shared = shared or {}
+        self._semaphores = {
+            name: shared.get(name) or threading.BoundedSemaphore(limit)
+            for name, limit in self.limits.items()
+        }
+
+    @contextmanager
+    def slot(self, kind: str):
+        semaphore = self._semaphores[kind]
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    def network(self):
+        return self.slot("network")
+
+    def cpu(self):
+        return self.slot("cpu")
+
+
+_default_plan = plan_slots()
+SLOTS = ResourceSlots(_default_plan.network, _default_plan.cpu)
+
+
+def configure_slots(network: int, cpu: int, shared: Optional[Dict[str, Any]] = None) -> None:
+    """Ajusta os pools do processo (também usado como initializer de process pools)."""
+    SLOTS.configure(network, cpu, shared)
+
+
+def shared_slot_semaphores(manager, plan: SlotPlan) -> Dict[str, Any]:
+    """Semáforos de `manager` com os limites do plano, para `configure_slots` em cada processo."""
+    return {"network": manager.BoundedSemaphore(plan.network), "cpu": manager.BoundedSemaphore(plan.cpu)}
+
+
+class JobScheduler:
+    """Mantém até `max_jobs` jobs rodando em paralelo."""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max(1, max_jobs)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._active = 0
+
+    @property
+    def active(self) -> int:
+        with self._lock:
+            return self._active
+
+    def free_slots(self) -> int:
+        return self.max_jobs - self.active
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """Agenda um job se houver vaga; retorna None quando todos os slots estão ocupados."""
+        with self._lock:
+            if self._active >= self.max_jobs:
+                return None
+            self._active += 1
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._active -= 1
+        if future.exception() is not None:
+            logger.error(f"🔥 Job falhou no scheduler: {future.exception()}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,229 @@
+"""
+media_probe.py — serviço compartilhado de ffprobe com cache persistente.
+
+Uma única chamada ao ffprobe devolve duração, streams, fps e resolução
+(keyframes são listados à parte, sob demanda, pelo índice de b-roll).
+O resultado fica em memória e num SQLite em output/cache, indexado pelo
+caminho e validado por (tamanho, mtime): um arquivo só é re-probado quando
+muda. video_maker, FFmpegEngine e hub_client usam este módulo.
+"""
+import os
+import json
+import sqlite3
+import logging
+import threading
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from config import OUTPUT_DIR
+
+logger = logging.getLogger(__name__)
+
+PROBE_CACHE_PATH = os.path.join(OUTPUT_DIR, "cache", "media_probe.sqlite")
+PROBE_TIMEOUT = int(os.getenv("FFPROBE_TIMEOUT", "10"))
+
+_memory: Dict[str, Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def parse_fps(value: str) -> float:
+    if not value:
+        return 0
+    try:
+        if "/" in value:
+            numerator, denominator = value.split("/", 1)
+            denominator_float = float(denominator)
+            if denominator_float == 0:
+                return 0
+            return round(float(numerator) / denominator_float, 3)
+        return round(float(value), 3)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS probes (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            info TEXT NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def _load_cached(db_path: str, path: str, size: int, mtime_ns: int) -> Optional[Dict[str, Any]]:
+    try:
+        with _connect(db_path) as conn:
+            row = conn.execute(
+                "SELECT info FROM probes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, size, mtime_ns),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, json.JSONDecodeError) as e:
+        logger.warning(f"Cache de ffprobe indisponível: {e}")
+        return None
+
+
+def _store_cached(db_path: str, path: str, size: int, mtime_ns: int, info: Dict[str, Any]) -> None:
+    try:
+        with _connect(db_path) as conn:
+            conn.execute(
+                """
+                INSERT INTO probes(path, size, mtime_ns, info) VALUES (?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size, mtime_ns = excluded.mtime_ns, info = excluded.info
+                """,
+                (path, size, mtime_ns, json.dumps(info, separators=(",", ":"))),
+            )
+    except sqlite3.Error as e:
+        logger.warning(f"Falha gravando cache de ffprobe: {e}")
+
+
+def _run_ffprobe(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-show_entries",
+                "stream=index,codec_type,codec_name,width,height,r_frame_rate,sample_rate,channels:format=duration",
+                "-of",
+                "json",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=PROBE_TIMEOUT,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Não foi possível rodar ffprobe em {path}: {e}")
+        return None
+
+    if result.returncode != 0:
+        logger.warning(f"ffprobe falhou para {path}: {(result.stderr or '')[:200]}")
+        return None
+
+    try:
+        return json.loads(result.stdout or "{}")
+    except json.JSONDecodeError as e:
+        logger.warning(f"ffprobe retornou JSON inválido para {path}: {e}")
+        return None
+
+
+def _summarize(data: Dict[str, Any], size: int) -> Dict[str, Any]:
+    info: Dict[str, Any] = {"size_bytes": size, "duration": 0.0, "streams": data.get("streams") or []}
+    duration = (data.get("format") or {}).get("duration")
+    if duration:
+        try:
+            info["duration"] = float(duration)
+        except (TypeError, ValueError):
+            pass
+
+    video = next(
+        (s for s in info["streams"] if s.get("codec_type") == "video" or s.get("width")),
+        None,
+    )
+    if video:
+        if video.get("width"):
+            info["width"] = int(video["width"])
+        if video.get("height"):
+            info["height"] = int(video["height"])
+        if video.get("codec_name"):
+            info["codec"] = video["codec_name"]
+        fps = parse_fps(video.get("r_frame_rate", ""))
+        if fps:
+            info["fps"] = fps
+    return info
+
+
+def probe_media(path: str, db_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Metadata de mídia: duration, size_bytes, width, height, fps, codec e streams.
+    Retorna {} se o arquivo não existe ou o ffprobe falhar (falhas não são cacheadas).
+    """
+    if not path:
+        return {}
+    db_path = db_path or PROBE_CACHE_PATH
+    abs_path = os.path.abspath(path)
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return {}
+    size, mtime_ns = stat.st_size, stat.st_mtime_ns
+
+    with _lock:
+        cached = _memory.get(abs_path)
+    if cached and cached["size_bytes"] == size and cached.get("_mtime_ns") == mtime_ns:
+        return _public(cached)
+
+    info = _load_cached(db_path, abs_path, size, mtime_ns)
+    if info is None:
+        data = _run_ffprobe(abs_path)
+        if data is None:
+            return {}
+        info = _summarize(data, size)
+        _store_cached(db_path, abs_path, size, mtime_ns, info)
+
+    with _lock:
+        _memory[abs_path] = {**info, "_mtime_ns": mtime_ns}
+    return _public(info)
+
+
+def probe_duration(path: str) -> float:
+    """Duração em segundos (0.0 se desconhecida)."""
+    return float(probe_media(path).get("duration") or 0.0)
+
+
+def probe_keyframes(path: str) -> List[float]:
+    """Timestamps (s) dos keyframes do primeiro stream de vídeo; [] se falhar."""
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "error",
+                "-select_streams",
+                "v:0",
+                "-skip_frame",
+                "nokey",
+                "-show_entries",
+                "frame=best_effort_timestamp_time",
+                "-of",
+                "csv=p=0",
+                path,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=PROBE_TIMEOUT * 6,
+            check=False,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"Não foi possível listar keyframes de {path}: {e}")
+        return []
+    if result.returncode != 0:
+        return []
+
+    keyframes = []
+    for line in (result.stdout or "").splitlines():
+        try:
+            keyframes.append(round(float(line.strip().strip(",")), 3))
+        except ValueError:
+            continue
+    return sorted(set(keyframes))
+
+
+def clear_memory_cache() -> None:
+    with _lock:
+        _memory.clear()
+
+
+def _public(info: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in info.items() if not key.startswith("_")}
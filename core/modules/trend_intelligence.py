@@ -1,7 +1,6 @@
 import os
 import time
 import logging
-import requests
 import xml.etree.ElementTree as ET
 from datetime import datetime
 from dotenv import load_dotenv
@@ -17,6 +16,7 @@ from . import register
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+from core import http_pool
 from core.key_utils import get_gemini_keys
 
 class TrendModel:
@@ -57,7 +57,7 @@ def run(args: list) -> dict:
     top_news = []
     for url in feeds:
         try:
-            resp = requests.get(url, timeout=10)
+            resp = http_pool.get(url, timeout=10)
             root = ET.fromstring(resp.content)
             for item in root.findall('./channel/item')[:3]:
                 top_news.append(f"- {item.find('title').text} ({item.find('link').text})")
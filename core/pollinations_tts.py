@@ -1,9 +1,9 @@
-import requests
 import logging
 from pathlib import Path
 from typing import Optional
 import urllib.parse
 from config import OUTPUT_DIR
+from core import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -46,7 +46,7 @@ class PollinationsTTS:
             }
             
             logger.info(f"🎙️ Gerando voz ({voice}): '{text[:30]}...' via Pollinations...")
-            response = requests.get(url, headers=headers, timeout=60)
+            response = http_pool.get(url, headers=headers, timeout=60)
             
             if response.status_code == 200:
                 with open(file_path, "wb") as f:
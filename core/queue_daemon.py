@@ -1,7 +1,7 @@
 import time, os, json
 from pathlib import Path
 from datetime import datetime
-from core.video_maker import generate_video
+from core.video_maker import generate_video, local_render
 
 PENDING_GLOB = "scripts/*.pending.txt"
 
@@ -21,7 +21,8 @@ def process_job(path: Path):
 
     log(f"START {running_path.name} brand='{brand}'")
     try:
-        generate_video(str(running_path), brand_name=brand)
+        if not local_render(generate_video(str(running_path), brand_name=brand)):
+            raise RuntimeError("render não gerou arquivo local")
         done_path = running_path.with_suffix(".done.txt")
         running_path.rename(done_path)
         log(f"DONE  {done_path.name}")
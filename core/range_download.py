@@ -0,0 +1,260 @@
+"""
+range_download.py — download de arquivos grandes (renders do VideoLM) por
+faixas HTTP em paralelo.
+
+A primeira requisição já pede a faixa inicial (`Range: bytes=0-N`): se o
+servidor responde 206, o resto do arquivo é dividido em partes baixadas por
+várias conexões do pool; se responde 200, o corpo segue em stream único.
+Em ambos os casos:
+
+  - buffers de 1 MB (em vez de milhares de writes de 8 KB)
+  - conexão que cai é retomada do byte onde parou, não do início
+  - o progresso fica em <destino>.part + <destino>.part.json, então um
+    download interrompido continua de onde estava na próxima chamada
+  - tamanho (e sha256, quando informado) são conferidos antes do
+    `os.replace` atômico para o destino final
+
+Configuração:
+    DOWNLOAD_CONNECTIONS — conexões simultâneas por arquivo (padrão 4)
+    DOWNLOAD_PART_MB     — tamanho de cada faixa (padrão 8)
+    DOWNLOAD_RETRIES     — tentativas por faixa (padrão 5)
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Set
+
+import requests
+
+from core import http_pool
+
+logger = logging.getLogger(__name__)
+
+DOWNLOAD_CONNECTIONS = int(os.getenv("DOWNLOAD_CONNECTIONS", "4"))
+DOWNLOAD_PART_MB = float(os.getenv("DOWNLOAD_PART_MB", "8"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "5"))
+BUFFER_SIZE = 1 << 20
+
+
+class DownloadError(OSError):
+    """Download não pôde ser concluído ou não passou na verificação."""
+
+
+def _connections() -> int:
+    return max(1, int(os.getenv("DOWNLOAD_CONNECTIONS", str(DOWNLOAD_CONNECTIONS))))
+
+
+def _part_size() -> int:
+    return max(1, int(float(os.getenv("DOWNLOAD_PART_MB", str(DOWNLOAD_PART_MB))) * 1_048_576))
+
+
+def _retries() -> int:
+    return max(1, int(os.getenv("DOWNLOAD_RETRIES", str(DOWNLOAD_RETRIES))))
+
+
+def _content_range_total(response) -> Optional[int]:
+    """Total de 'Content-Range: bytes 0-99/1234' (None se ausente ou '*')."""
+    value = (getattr(response, "headers", None) or {}).get("Content-Range", "")
+    total = value.rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Progress:
+    """Estado de um download por faixas, persistido ao lado do .part."""
+
+    def __init__(self, path: str, url: str, size: int, part_size: int, done: Optional[Set[int]] = None):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.part_size = part_size
+        self.done = set(done or ())
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, url: str) -> Optional["_Progress"]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("url") != url:
+                return None
+            return cls(path, url, int(data["size"]), int(data["part_size"]), set(data.get("done") or ()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def starts(self) -> list:
+        return list(range(0, self.size, self.part_size))
+
+    def pending(self) -> list:
+        return [start for start in self.starts() if start not in self.done]
+
+    def mark(self, start: int) -> None:
+        with self._lock:
+            self.done.add(start)
+            self.save()
+
+    def save(self) -> None:
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"url": self.url, "size": self.size, "part_size": self.part_size,
+                       "done": sorted(self.done)}, f)
+
+
+def _write_stream(response, f, limit: Optional[int] = None) -> int:
+    """Copia o corpo para `f` em blocos grandes; devolve quantos bytes escreveu."""
+    written = 0
+    for chunk in response.iter_content(chunk_size=BUFFER_SIZE):
+        if not chunk:
+            continue
+        if limit is not None:
+            chunk = chunk[:limit - written]
+        f.write(chunk)
+        written += len(chunk)
+        if limit is not None and written >= limit:
+            break
+    return written
+
+
+def _fetch_range(url: str, headers: dict, part_path: str, start: int, end: int, timeout: float) -> None:
+    """Baixa [start, end] para a mesma posição do .part, retomando onde a conexão caiu."""
+    pos = start
+    for attempt in range(_retries()):
+        try:
+            with http_pool.get(url, headers={**headers, "Range": f"bytes={pos}-{end}"}, stream=True, timeout=timeout) as r:
+                r.raise_for_status()
+                if r.status_code != 206:
+                    raise DownloadError(f"servidor ignorou Range (HTTP {r.status_code})")
+                with open(part_path, "r+b") as f:
+                    f.seek(pos)
+                    # pos avança a cada bloco: se a conexão cair, a retomada começa daqui
+                    for chunk in r.iter_content(chunk_size=BUFFER_SIZE):
+                        chunk = chunk[:end + 1 - pos]
+                        f.write(chunk)
+                        pos += len(chunk)
+                        if pos > end:
+                            break
+            if pos > end:
+                return
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Faixa {start}-{end} interrompida em {pos} ({e}); retomando")
+        time.sleep(min(2 ** attempt * 0.5, 10))
+    raise DownloadError(f"faixa {start}-{end} incompleta após {_retries()} tentativas")
+
+
+def _download_ranges(url: str, headers: dict, part_path: str, progress: _Progress, timeout: float) -> None:
+    pending = progress.pending()
+    if not pending:
+        return
+    logger.info(
+        f"⬇️  {len(pending)} faixa(s) de {progress.part_size / 1_048_576:.0f} MB "
+        f"em até {_connections()} conexões ({progress.size / 1_048_576:.1f} MB no total)"
+    )
+
+    def fetch(start: int) -> None:
+        end = min(start + progress.part_size, progress.size) - 1
+        _fetch_range(url, headers, part_path, start, end, timeout)
+        progress.mark(start)
+
+    with ThreadPoolExecutor(max_workers=min(_connections(), len(pending))) as pool:
+        # list() propaga a primeira falha
+        list(pool.map(fetch, pending))
+
+
+def _download_single(url: str, headers: dict, part_path: str, first, timeout: float) -> None:
+    """Stream único (servidor sem Range); retoma com Range se a conexão cair."""
+    response, offset = first, 0
+    for attempt in range(_retries()):
+        try:
+            if response is None:
+                offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+                response = http_pool.get(url, headers={**headers, "Range": f"bytes={offset}-"}, stream=True, timeout=timeout)
+            with response as r:
+                r.raise_for_status()
+                # 206 continua o .part; 200 (ou a primeira resposta) recomeça do zero
+                mode = "ab" if offset and r.status_code == 206 else "wb"
+                with open(part_path, mode) as f:
+                    _write_stream(r, f)
+            return
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Download interrompido ({e}); retomando")
+            response = None
+        time.sleep(min(2 ** attempt * 0.5, 10))
+    raise DownloadError(f"download de {url} incompleto após {_retries()} tentativas")
+
+
+def download(
+    url: str,
+    dest: str,
+    headers: Optional[dict] = None,
+    expected_size: Optional[int] = None,
+    sha256: Optional[str] = None,
+    timeout: float = 180,
+) -> str:
+    """
+    Baixa `url` para `dest` (faixas paralelas quando o servidor aceita Range).
+    Levanta DownloadError se o arquivo não fechar com `expected_size`/`sha256`.
+    """
+    headers = dict(headers or {})
+    os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+    part_path = f"{dest}.part"
+    state_path = f"{dest}.part.json"
+
+    progress = _Progress.load(state_path, url) if os.path.exists(part_path) else None
+    if progress:
+        logger.info(f"↩️  Retomando download: {len(progress.done)}/{len(progress.starts())} faixa(s) já no disco")
+    else:
+        part_size = _part_size()
+        first = http_pool.get(url, headers={**headers, "Range": f"bytes=0-{part_size - 1}"}, stream=True, timeout=timeout)
+        if first.status_code >= 400:
+            with first:
+                first.raise_for_status()
+        total = _content_range_total(first) if first.status_code == 206 else None
+        if total is None:
+            _download_single(url, headers, part_path, first, timeout)
+        else:
+            progress = _Progress(state_path, url, total, part_size)
+            written = 0
+            with open(part_path, "wb") as f:
+                f.truncate(total)
+                try:
+                    with first as r:
+                        written = _write_stream(r, f, limit=min(part_size, total))
+                except requests.RequestException as e:
+                    logger.warning(f"⚠️ Primeira faixa interrompida ({e}); vai junto com as demais")
+            if written >= min(part_size, total):
+                progress.done.add(0)
+            progress.save()
+
+    if progress:
+        _download_ranges(url, headers, part_path, progress, timeout)
+
+    size = os.path.getsize(part_path)
+    expected = expected_size if expected_size is not None else (progress.size if progress else None)
+    if expected is not None and size != expected:
+        _discard(part_path, state_path)
+        raise DownloadError(f"tamanho {size} != esperado {expected}")
+    if sha256 and sha256_file(part_path).lower() != sha256.lower():
+        _discard(part_path, state_path)
+        raise DownloadError("sha256 não confere")
+
+    os.replace(part_path, dest)
+    _discard(state_path)
+    return dest
+
+
+def _discard(*paths: str) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
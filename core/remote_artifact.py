@@ -0,0 +1,81 @@
+"""
+remote_artifact.py — artifacts que ficam no VideoLM em vez de no disco local.
+
+Com VIDEOLM_REMOTE_ARTIFACTS=1 o engine não baixa o render: grava só o
+sidecar `<arquivo>.source.json` marcado como remoto, com a URL pública e os
+metadados (tamanho, duração, resolução) vindos do status do VideoLM. O
+caminho local continua sendo o "nome" do artifact no pipeline — o Hub recebe
+a URL e os metadados do sidecar, sem ffprobe — e `ensure_local` baixa o
+arquivo só quando alguém realmente precisa dele.
+"""
+import os
+import json
+import logging
+from typing import Optional
+
+from core import range_download
+
+logger = logging.getLogger(__name__)
+
+REMOTE_ARTIFACTS = os.getenv("VIDEOLM_REMOTE_ARTIFACTS", "0") == "1"
+
+METADATA_KEYS = ("size_bytes", "duration_seconds", "width", "height", "codec", "fps")
+
+
+def enabled() -> bool:
+    return os.getenv("VIDEOLM_REMOTE_ARTIFACTS", "1" if REMOTE_ARTIFACTS else "0") == "1"
+
+
+def sidecar_path(path: str) -> str:
+    return f"{path}.source.json"
+
+
+def read_source(path: str) -> dict:
+    try:
+        with open(sidecar_path(path), "r", encoding="utf-8") as f:
+            source = json.load(f)
+        return source if isinstance(source, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def write_stub(path: str, source: dict, metadata: Optional[dict] = None) -> str:
+    """Registra `path` como artifact remoto (sem baixar) e devolve o próprio caminho."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if os.path.exists(path):
+        # Cópia local de um render anterior não vale mais
+        os.remove(path)
+    record = {**source, "remote": True}
+    record["metadata"] = {key: value for key, value in (metadata or {}).items() if key in METADATA_KEYS and value}
+    with open(sidecar_path(path), "w", encoding="utf-8") as f:
+        json.dump(record, f, indent=2)
+    return path
+
+
+def is_remote(path: str) -> bool:
+    """Artifact só no VideoLM: sem arquivo local, com sidecar remoto e URL."""
+    if not path or os.path.exists(path):
+        return False
+    source = read_source(path)
+    return bool(source.get("remote") and source.get("video_url"))
+
+
+def exists(path: str) -> bool:
+    """Arquivo local presente (não vazio) ou artifact remoto registrado."""
+    return bool(path) and ((os.path.exists(path) and os.path.getsize(path) > 0) or is_remote(path))
+
+
+def metadata(path: str) -> dict:
+    """Metadados gravados do status do VideoLM ({} se não é remoto)."""
+    return dict(read_source(path).get("metadata") or {}) if is_remote(path) else {}
+
+
+def ensure_local(path: str, headers: Optional[dict] = None) -> str:
+    """Devolve `path`, baixando o artifact remoto na primeira vez que é pedido."""
+    if not is_remote(path):
+        return path
+    source = read_source(path)
+    size = (source.get("metadata") or {}).get("size_bytes")
+    logger.info(f"⬇️  Baixando artifact remoto sob demanda: {source['video_url']}")
+    range_download.download(source["video_url"], path, headers=headers, expected_size=size)
+    return path
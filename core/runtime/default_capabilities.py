@@ -8,7 +8,7 @@ import time
 from pathlib import Path
 from typing import Any, Dict
 
-from core.video_maker import generate_video
+from core.video_maker import generate_video, local_render
 from core.modules import list_modules, run_module
 from core.videolm_client import (
     engine_demo_url,
@@ -322,6 +322,7 @@ def build_default_registry() -> CapabilityRegistry:
                     "topic": {"type": "string"},
                     "brand": {"type": "string"},
                     "theme": {"type": "string"},
+                    "encode_profile": {"type": "string", "enum": ["auto", "draft", "preview", "final", "archive"]},
                 },
             },
             outputs_schema={
@@ -353,7 +354,8 @@ def build_default_registry() -> CapabilityRegistry:
                 f.write(inline_script.strip() or topic)
 
         record_event(context, "capability.started", {"id": "production.video_render", "script_path": script_path})
-        output_path = generate_video(script_path, brand_name=brand)
+        render_kwargs = {"encode_profile": args["encode_profile"]} if args.get("encode_profile") else {}
+        output_path = local_render(generate_video(script_path, brand_name=brand, **render_kwargs))
         if not output_path:
             record_event(context, "capability.failed", {"id": "production.video_render", "script_path": script_path})
             return {"status": "error", "script_path": script_path, "output_path": ""}
@@ -0,0 +1,79 @@
+"""
+stage_graph.py — execução de estágios do pipeline como DAG.
+
+Cada estágio declara de quais outros depende; estágios sem dependência
+pendente rodam em paralelo numa thread pool. Um estágio só começa quando
+todas as suas dependências terminaram, e recebe os resultados delas como
+argumentos nomeados.
+"""
+import time
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StageError(RuntimeError):
+    """Falha de um estágio; os dependentes dele não chegam a rodar."""
+
+    def __init__(self, stage: str, cause: BaseException):
+        super().__init__(f"Estágio '{stage}' falhou: {cause}")
+        self.stage = stage
+        self.cause = cause
+
+
+class StageGraph:
+    """DAG mínimo de estágios com execução concorrente."""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages: Dict[str, Callable[..., Any]] = {}
+        self._deps: Dict[str, List[str]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, fn: Callable[..., Any], deps: Optional[List[str]] = None) -> "StageGraph":
+        deps = list(deps or [])
+        missing = [dep for dep in deps if dep not in self._stages]
+        if missing:
+            raise ValueError(f"Estágio '{name}' depende de estágios não declarados: {missing}")
+        self._stages[name] = fn
+        self._deps[name] = deps
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """Executa o DAG e retorna {estágio: resultado}. Propaga StageError na primeira falha."""
+        results: Dict[str, Any] = {}
+        pending = dict(self._deps)
+        running: Dict[Future, str] = {}
+        failure: Optional[StageError] = None
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [name for name, deps in pending.items() if all(dep in results for dep in deps)]
+                    for name in ready:
+                        kwargs = {dep: results[dep] for dep in pending.pop(name)}
+                        running[executor.submit(self._timed, name, kwargs)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        if failure is None:
+                            failure = e if isinstance(e, StageError) else StageError(name, e)
+
+        if failure is not None:
+            raise failure
+        return results
+
+    def _timed(self, name: str, kwargs: Dict[str, Any]) -> Any:
+        started_at = time.time()
+        try:
+            return self._stages[name](**kwargs)
+        finally:
+            self.timings[name] = round(time.time() - started_at, 3)
+            logger.info(f"⏱️  Estágio {name}: {self.timings[name]:.1f}s")
@@ -0,0 +1,92 @@
+"""
+stage_manifest.py — checkpoints por estágio do pipeline de vídeo.
+
+Cada VideoProject guarda em `stages.json` os hashes de entrada, os arquivos
+de saída e o tempo de cada estágio (TTS, legendas, cenas, render). Um job
+re-tentado reaproveita qualquer estágio cujas entradas não mudaram e cujas
+saídas ainda existem em disco (ou no VideoLM, para renders remotos), em vez de pagar TTS e imagens de novo.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from core import remote_artifact
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "stages.json"
+
+
+def hash_inputs(*parts: Any) -> str:
+    """Hash estável (SHA-256) de entradas serializáveis em JSON."""
+    raw = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class StageManifest:
+    """Manifest JSON de estágios concluídos de um projeto."""
+
+    def __init__(self, project_dir: str):
+        self.path = os.path.join(project_dir, MANIFEST_NAME)
+        self.data: Dict[str, Any] = {"stages": {}}
+        self._lock = threading.RLock()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if isinstance(loaded, dict) and isinstance(loaded.get("stages"), dict):
+                    self.data = loaded
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"⚠️ Manifest de estágios ilegível ({self.path}): {e}")
+
+    @property
+    def stages(self) -> Dict[str, Any]:
+        return self.data["stages"]
+
+    def get(self, stage: str) -> Optional[Dict[str, Any]]:
+        return self.stages.get(stage)
+
+    def is_valid(self, stage: str, inputs_hash: str) -> bool:
+        """Estágio reaproveitável: mesmas entradas e todas as saídas presentes."""
+        entry = self.stages.get(stage)
+        if not entry or entry.get("inputs_hash") != inputs_hash:
+            return False
+        outputs = entry.get("outputs") or []
+        return bool(outputs) and all(remote_artifact.exists(path) for path in outputs)
+
+    def record(self, stage: str, inputs_hash: str, outputs: List[str], started_at: float, **extra: Any) -> None:
+        finished_at = time.time()
+        with self._lock:
+            self.stages[stage] = {
+                "inputs_hash": inputs_hash,
+                "outputs": list(outputs),
+                "started_at": started_at,
+                "finished_at": finished_at,
+                "elapsed_seconds": round(finished_at - started_at, 3),
+                **extra,
+            }
+            self.save()
+
+    def invalidate(self, *stages: str) -> None:
+        with self._lock:
+            for stage in stages:
+                self.stages.pop(stage, None)
+            self.save()
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self.data[key] = value
+            self.save()
+
+    def save(self) -> None:
+        # Estágios concorrentes (ver stage_graph) gravam o mesmo manifest
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, indent=2)
+            os.replace(tmp_path, self.path)
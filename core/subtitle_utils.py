@@ -1,82 +1,147 @@
-import math
-from datetime import timedelta
-from typing import List
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+MAX_WORDS_PER_SCREEN = 3  # 2 a 3 palavras por vez para alta retenção
+
+# Evento compacto: (início_cs, fim_cs, primeira palavra do bloco, tamanho do bloco, posição destacada)
+WordEvent = Tuple[int, int, int, int, int]
+
+
+def to_centiseconds(seconds: float) -> int:
+    """
+    Segundos → centésimos inteiros, truncando como timedelta (microssegundos
+    arredondados half-even, depois truncados para centésimos).
+    """
+    if seconds <= 0:
+        return 0
+    whole = int(seconds)
+    return (whole * 1_000_000 + round((seconds - whole) * 1e6)) // 10_000
+
+
+def format_centiseconds(cs: int) -> str:
+    return f"{cs // 360_000}:{cs // 6000 % 60:02d}:{cs // 100 % 60:02d}.{cs % 100:02d}"
+
 
 def format_ass_timestamp(seconds: float) -> str:
     """Converte segundos para formato ASS (H:MM:SS.cc)."""
-    td = timedelta(seconds=max(0, seconds))
-    total_seconds = int(td.total_seconds())
-    hours = total_seconds // 3600
-    minutes = (total_seconds % 3600) // 60
-    secs = total_seconds % 60
-    centis = int(td.microseconds / 10000)
-    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
-
-def generate_ass_from_text(text: str, total_duration: float, output_path: str, brand_colors: dict = None, font_name="Montserrat-ExtraBold", font_size=24, start_offset=0.0):
+    return format_centiseconds(to_centiseconds(seconds))
+
+
+@dataclass
+class KaraokeStyle:
     """
-    Gera legendas ASS Cinematográficas:
-    - Word-Level Highlighting (Karaoke)
-    - Sombras agressivas e bordas para leitura em qualquer fundo
-    - Cores dinâmicas da marca
+    Estilo padrão: palavra atual na cor de destaque com leve aumento de escala,
+    sombras agressivas e bordas para leitura em qualquer fundo. Outros estilos
+    só precisam de `header_lines()` e `dialogue_text(words, index)`.
     """
-    words = text.replace('\n', ' ').split()
-    if not words: return False
 
     # Cores (ASS usa formato BGR: &H00BBGGRR)
-    primary = "&H00FFFFFF" # Branco
-    highlight = "&H0000FFFF" # Amarelo (Destaque)
-    outline = "&H00000000"  # Preto (Borda)
-    back = "&H64000000"     # Sombra semi-transparente
-
-    if brand_colors:
-        if "primary" in brand_colors: primary = brand_colors["primary"]
-        if "highlight" in brand_colors: highlight = brand_colors["highlight"]
-
-    header = [
-        "[Script Info]", "ScriptType: v4.00+", "PlayResX: 720", "PlayResY: 1280", "ScaledBorderAndShadow: yes", "",
-        "[V4+ Styles]", 
-        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
-        f"Style: Default,{font_name},{font_size},{primary},{highlight},{outline},{back},1,0,0,0,100,100,0,0,1,3,4,5,30,30,120,1", ""
-    ]
-
-    # Lógica de Chunking: 2 a 3 palavras por vez para alta retenção
-    max_words_per_screen = 3
-    chunks = [words[i:i + max_words_per_screen] for i in range(0, len(words), max_words_per_screen)]
-    
+    primary: str = "&H00FFFFFF"    # Branco
+    highlight: str = "&H0000FFFF"  # Amarelo (Destaque)
+    outline: str = "&H00000000"    # Preto (Borda)
+    back: str = "&H64000000"       # Sombra semi-transparente
+    font_name: str = "Montserrat-ExtraBold"
+    font_size: int = 24
+
+    @classmethod
+    def from_brand(cls, brand_colors: Optional[dict] = None, **kwargs) -> "KaraokeStyle":
+        style = cls(**kwargs)
+        if brand_colors:
+            if "primary" in brand_colors: style.primary = brand_colors["primary"]
+            if "highlight" in brand_colors: style.highlight = brand_colors["highlight"]
+        return style
+
+    def header_lines(self) -> List[str]:
+        return [
+            "[Script Info]", "ScriptType: v4.00+", "PlayResX: 720", "PlayResY: 1280", "ScaledBorderAndShadow: yes", "",
+            "[V4+ Styles]",
+            "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+            f"Style: Default,{self.font_name},{self.font_size},{self.primary},{self.highlight},{self.outline},{self.back},1,0,0,0,100,100,0,0,1,3,4,5,30,30,120,1", "",
+        ]
+
+    def dialogue_text(self, words: Sequence[str], index: int) -> str:
+        """Texto do bloco (já em maiúsculas) com a palavra `index` destacada."""
+        styled = f"{{\\c{self.highlight}\\fscx110\\fscy110}}{words[index]}{{\\fscx100\\fscy100\\c{self.primary}}}"
+        return " ".join([*words[:index], styled, *words[index + 1:]])
+
+
+def iter_word_events(words: Sequence[str], total_duration: float, start_offset: float = 0.0, word_timings: Optional[Sequence] = None) -> Iterator[WordEvent]:
+    """
+    Um evento por palavra, bloco a bloco. Sem `word_timings`, o tempo é estimado
+    por caracteres (mesma aritmética de ponto flutuante de sempre, para as
+    legendas não mudarem); com eles, o destaque vai do início da palavra ao
+    início da próxima do bloco (sem piscar nas pausas).
+    """
+    if word_timings is not None:
+        for first in range(0, len(words), MAX_WORDS_PER_SCREEN):
+            size = min(MAX_WORDS_PER_SCREEN, len(words) - first)
+            for i in range(size):
+                timing = word_timings[first + i]
+                end = word_timings[first + i + 1].start if i + 1 < size else timing.end
+                yield to_centiseconds(timing.start), to_centiseconds(max(end, timing.start)), first, size, i
+        return
+
     total_chars = sum(len(w) for w in words)
     effective_duration = max(0.1, total_duration - start_offset)
     time_per_char = effective_duration / total_chars
-
-    lines = ["[Events]", "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"]
     current_time = start_offset
-
-    for chunk in chunks:
-        chunk_text = " ".join(chunk).upper()
-        chunk_duration = sum(len(w) for w in chunk) * time_per_char
+    for first in range(0, len(words), MAX_WORDS_PER_SCREEN):
+        chunk = words[first:first + MAX_WORDS_PER_SCREEN]
         chunk_start = current_time
-        chunk_end = chunk_start + chunk_duration
-        
-        # Word-Level Timing (Animação de cor na palavra atual)
         word_start_offset = 0.0
-        for i, target_word in enumerate(chunk):
-            word_duration = len(target_word) * time_per_char
-            event_start = format_ass_timestamp(chunk_start + word_start_offset)
-            event_end = format_ass_timestamp(chunk_start + word_start_offset + word_duration)
-            
-            # Cria o efeito de destaque na palavra atual
-            styled_parts = []
-            for j, w in enumerate(chunk):
-                if i == j:
-                    # Palavra atual: Cor de destaque + Aumento leve de escala (via tag fscx/fscy)
-                    styled_parts.append(f"{{\\c{highlight}\\fscx110\\fscy110}}{w.upper()}{{\\fscx100\\fscy100\\c{primary}}}")
-                else:
-                    styled_parts.append(w.upper())
-            
-            lines.append(f"Dialogue: 0,{event_start},{event_end},Default,,0,0,0,,{' '.join(styled_parts)}")
+        for i, word in enumerate(chunk):
+            word_duration = len(word) * time_per_char
+            yield (
+                to_centiseconds(chunk_start + word_start_offset),
+                to_centiseconds(chunk_start + word_start_offset + word_duration),
+                first, len(chunk), i,
+            )
             word_start_offset += word_duration
-        
-        current_time += chunk_duration
+        current_time += sum(len(w) for w in chunk) * time_per_char
+
+
+def iter_ass_lines(words: Sequence[str], events: Iterator[WordEvent], style: KaraokeStyle) -> Iterator[str]:
+    """Linhas do arquivo ASS, geradas sob demanda (cabeçalho, depois um Dialogue por evento)."""
+    yield from style.header_lines()
+    yield "[Events]"
+    yield "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+    upper_chunk: List[str] = []
+    upper_first = -1
+    last_cs, last_stamp = -1, ""
+    for start_cs, end_cs, first, size, index in events:
+        if first != upper_first:
+            upper_chunk = [w.upper() for w in words[first:first + size]]
+            upper_first = first
+        # O início de um evento quase sempre é o fim do anterior: formata uma vez só
+        start = last_stamp if start_cs == last_cs else format_centiseconds(start_cs)
+        last_cs, last_stamp = end_cs, format_centiseconds(end_cs)
+        yield f"Dialogue: 0,{start},{last_stamp},Default,,0,0,0,,{style.dialogue_text(upper_chunk, index)}"
 
+
+def write_ass(lines: Iterator[str], output_path: str) -> None:
+    """Grava as linhas separadas por '\\n' (sem quebra final), sem montar o arquivo inteiro em memória."""
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write("\n".join(header + lines))
+        for n, line in enumerate(lines):
+            f.write(line if n == 0 else "\n" + line)
+
+
+def generate_ass_from_text(text: str, total_duration: float, output_path: str, brand_colors: dict = None, font_name="Montserrat-ExtraBold", font_size=24, start_offset=0.0, word_timings: Optional[Sequence] = None, style: Optional[KaraokeStyle] = None):
+    """
+    Gera legendas ASS Cinematográficas:
+    - Word-Level Highlighting (Karaoke)
+    - Sombras agressivas e bordas para leitura em qualquer fundo
+    - Cores dinâmicas da marca (ou outro `style` com a interface de KaraokeStyle)
+
+    Com `word_timings` (core.alignment.align: um item com .start/.end por palavra),
+    cada destaque segue o tempo real da fala; sem, o tempo é estimado por caracteres.
+    O arquivo é escrito em stream, evento a evento.
+    """
+    words = text.replace('\n', ' ').split()
+    if not words: return False
+    if word_timings is not None and len(word_timings) != len(words):
+        word_timings = None
+
+    style = style or KaraokeStyle.from_brand(brand_colors, font_name=font_name, font_size=font_size)
+    events = iter_word_events(words, total_duration, start_offset, word_timings)
+    write_ass(iter_ass_lines(words, events, style), output_path)
     return True
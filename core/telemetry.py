@@ -0,0 +1,350 @@
+"""
+telemetry.py — snapshots baratos para a telemetria do Hub.
+
+push_telemetry roda a cada minuto em cada engine, então nada aqui refaz
+trabalho se a origem não mudou:
+
+    StaticTelemetry  — runtime manifest, capabilities e recipes; reconstruídos
+                       só quando profile/recipes mudam no disco
+    RendersCounter   — bytes/arquivos em output/renders com contadores
+                       incrementais (só arquivos novos ou ainda crescendo
+                       levam stat)
+    RecentEvents     — eventos do StateStore, relidos só quando o SQLite muda
+    TelemetryDelta   — com TELEMETRY_PROTOCOL=sections, omite do payload as
+                       seções que não mudaram desde o último envio bem-sucedido
+                       (envio completo a cada TELEMETRY_FULL_EVERY pushes ou
+                       depois de uma falha); no padrão `full`, todo push é completo
+    HashedTelemetryDelta — protocolo compacto (TELEMETRY_PROTOCOL=delta):
+                       hash do manifest + só os campos alterados, sem as
+                       chaves duplicadas em camelCase
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_FULL_EVERY = int(os.getenv("TELEMETRY_FULL_EVERY", "10"))  # 1 = sempre completo
+TELEMETRY_PROTOCOL = os.getenv("TELEMETRY_PROTOCOL", "full").lower()  # full | sections | delta
+RENDERS_DIR = os.path.join("output", "renders")
+STATE_PATH = os.path.join("output", "engine_state.sqlite")
+
+STATIC_KEYS = ("capabilities_count", "capabilities", "runtime_manifest", "recipes", "artifactTypes", "artifact_types")
+# Seções grandes que só vão no payload quando mudam
+DELTA_KEYS = STATIC_KEYS + ("recent_runtime_events", "recent_command_results")
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _sources_signature(profile_root: str = "profiles", recipes_root: str = "recipes") -> tuple:
+    """Tudo de que o manifest depende: arquivos de profile/recipes e as variáveis lidas por ele."""
+    recipes = []
+    try:
+        with os.scandir(recipes_root) as entries:
+            recipes = sorted(
+                (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+                for entry in entries if entry.name.endswith(".json")
+            )
+    except OSError:
+        pass
+    return (
+        os.getcwd(),
+        _stat_key(os.path.join(profile_root, "default.json")),
+        _stat_key("profile.json"),
+        tuple(recipes),
+        os.getenv("ENGINE_ID", ""),
+        os.getenv("HOMES_HUB_URL", ""),
+    )
+
+
+class StaticTelemetry:
+    """Manifest/capabilities/recipes em cache até profile ou recipes mudarem."""
+
+    def __init__(self):
+        self._registry = None
+        self._signature = None
+        self._section: Optional[Dict[str, Any]] = None
+
+    def section(self) -> Dict[str, Any]:
+        signature = _sources_signature()
+        if self._section is None or signature != self._signature:
+            self._section = self._build()
+            self._signature = signature
+        return self._section
+
+    def _build(self) -> Dict[str, Any]:
+        from core.runtime import build_runtime_manifest, list_recipes, load_profile
+        from core.runtime.default_capabilities import build_default_registry
+
+        if self._registry is None:
+            # O registry é definido em código: não muda durante o processo
+            self._registry = build_default_registry()
+        profile = load_profile("default")
+        runtime_manifest = build_runtime_manifest(self._registry, profile, include_experimental=False)
+        capabilities = runtime_manifest["capabilities"]
+        return {
+            "capabilities_count": len(capabilities),
+            "capabilities": [
+                {
+                    "id": capability["id"],
+                    "category": capability["category"],
+                    "experimental": capability["experimental"],
+                }
+                for capability in capabilities
+            ],
+            "runtime_manifest": runtime_manifest,
+            "recipes": runtime_manifest["recipes"],
+        }
+
+    def invalidate(self) -> None:
+        self._section = None
+
+
+class RendersCounter:
+    """
+    Tamanho e quantidade de arquivos em output/renders.
+
+    A listagem só é refeita quando o mtime do diretório muda (arquivo criado,
+    renomeado ou removido); entre uma e outra só os arquivos modificados nos
+    últimos SETTLE_SECONDS (renders ainda sendo escritos) levam stat.
+    """
+
+    SETTLE_SECONDS = 120
+
+    def __init__(self, path: str = RENDERS_DIR):
+        self.path = path
+        self._reset(None)
+
+    def _reset(self, abs_path: Optional[str]) -> None:
+        self._abs_path = abs_path
+        self._dir_key = None
+        self._files: Dict[str, Tuple[int, int]] = {}  # nome → (bytes, mtime_ns)
+        self.total_bytes = 0
+        self.count = 0
+
+    def refresh(self) -> Optional[Tuple[int, int]]:
+        """(total_bytes, count) ou None se o diretório não existe."""
+        abs_path = os.path.abspath(self.path)
+        if abs_path != self._abs_path:
+            self._reset(abs_path)
+        dir_key = _stat_key(abs_path)
+        if dir_key is None:
+            self._reset(abs_path)
+            return None
+        if dir_key != self._dir_key:
+            self._rescan(abs_path)
+            self._dir_key = dir_key
+        else:
+            self._restat_recent(abs_path)
+        return self.total_bytes, self.count
+
+    def _rescan(self, abs_path: str) -> None:
+        names = os.listdir(abs_path)
+        self.count = len(names)
+        current = set(names)
+        for name in [name for name in self._files if name not in current]:
+            self.total_bytes -= self._files.pop(name)[0]
+        recent = time.time_ns() - self.SETTLE_SECONDS * 1_000_000_000
+        for name in names:
+            known = self._files.get(name)
+            if known is None or known[1] >= recent:
+                self._update(abs_path, name)
+
+    def _restat_recent(self, abs_path: str) -> None:
+        recent = time.time_ns() - self.SETTLE_SECONDS * 1_000_000_000
+        for name, (_size, mtime_ns) in list(self._files.items()):
+            if mtime_ns >= recent:
+                self._update(abs_path, name)
+
+    def _update(self, abs_path: str, name: str) -> None:
+        full_path = os.path.join(abs_path, name)
+        previous = self._files.pop(name, (0, 0))
+        self.total_bytes -= previous[0]
+        if not os.path.isfile(full_path):
+            return
+        key = _stat_key(full_path)
+        if key is None:
+            return
+        mtime_ns, size = key
+        self._files[name] = (size, mtime_ns)
+        self.total_bytes += size
+
+
+class RecentEvents:
+    """Últimos eventos do StateStore; a consulta só roda quando o arquivo SQLite muda."""
+
+    def __init__(self, path: str = STATE_PATH, limit: int = 10):
+        self.path = path
+        self.limit = limit
+        self._store = None
+        self._store_path = None
+        self._key = None
+        self._events: List[Dict[str, Any]] = []
+
+    def get(self) -> List[Dict[str, Any]]:
+        abs_path = os.path.abspath(self.path)
+        if abs_path != self._store_path:
+            from core.runtime import StateStore
+
+            self._store = StateStore(abs_path)
+            self._store_path = abs_path
+            self._key = None
+        key = (_stat_key(abs_path), _stat_key(abs_path + "-wal"))
+        if key != self._key:
+            self._events = self._store.recent_events(limit=self.limit)
+            self._key = key
+        return self._events
+
+
+class TelemetryDelta:
+    """Decide quais seções grandes vão no próximo push."""
+
+    def __init__(self, full_every: int = TELEMETRY_FULL_EVERY):
+        self.full_every = max(1, full_every)
+        self._sent: Dict[str, Any] = {}
+        self._pushes = 0
+
+    def payload(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        if not self._sent or self._pushes % self.full_every == 0:
+            return dict(snapshot)
+        payload = {
+            key: value for key, value in snapshot.items()
+            if key not in DELTA_KEYS or key not in self._sent or self._sent[key] != value
+        }
+        unchanged = [key for key in DELTA_KEYS if key in snapshot and key not in payload]
+        if unchanged:
+            # O Hub mantém o último valor recebido dessas seções
+            payload["unchanged"] = unchanged
+        return payload
+
+    def sent(self, snapshot: Dict[str, Any], ok: bool) -> None:
+        if ok:
+            self._sent = {key: snapshot[key] for key in DELTA_KEYS if key in snapshot}
+            self._pushes += 1
+        else:
+            # Hub pode ter perdido estado: próximo push vai completo
+            self._sent = {}
+            self._pushes = 0
+
+
+def _snake(key: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])([A-Z])", r"_\1", key).lower()
+
+
+def dedupe_keys(value: Any) -> Any:
+    """Remove chaves camelCase que repetem uma irmã snake_case com o mesmo valor."""
+    if isinstance(value, list):
+        return [dedupe_keys(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    result = {}
+    for key, item in value.items():
+        twin = _snake(key)
+        if twin != key and twin in value and value[twin] == item:
+            continue
+        result[key] = dedupe_keys(item)
+    return result
+
+
+def content_hash(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class HashedTelemetryDelta:
+    """
+    Protocolo compacto de telemetria ("delta-v1").
+
+    O manifest (runtime manifest + artifact types) vira um hash de conteúdo e
+    só é enviado quando o hash muda; capabilities/recipes soltos não vão
+    (estão dentro do manifest). Os demais campos seguem como delta em
+    `changed`/`removed` contra o último push aceito. Sincronização completa
+    (`full: true`, todos os campos + manifest) no primeiro push, a cada
+    TELEMETRY_FULL_EVERY pushes e depois de qualquer falha — o Hub responde
+    409 quando perdeu o estado e quer uma.
+    """
+
+    PROTOCOL = "delta-v1"
+    ALWAYS = ("engine_id", "timestamp")
+    # Derivados do manifest: não trafegam no modo delta
+    MANIFEST_KEYS = STATIC_KEYS
+
+    def __init__(self, full_every: int = TELEMETRY_FULL_EVERY):
+        self.full_every = max(1, full_every)
+        self._fields: Dict[str, Any] = {}
+        self._manifest_hash = ""
+        self._pushes = 0
+        self._seq = 0
+        self._hash_memo: Tuple[Any, str] = (None, "")
+
+    def _manifest(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        manifest = {"runtime_manifest": snapshot.get("runtime_manifest") or {}}
+        if snapshot.get("artifact_types"):
+            manifest["artifact_types"] = snapshot["artifact_types"]
+        return dedupe_keys(manifest)
+
+    def _hash(self, manifest: Dict[str, Any]) -> str:
+        # Comparar é mais barato que serializar + sha256 o manifest inteiro
+        previous, digest = self._hash_memo
+        if previous != manifest:
+            digest = content_hash(manifest)
+            self._hash_memo = (manifest, digest)
+        return digest
+
+    def _split(self, snapshot: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        manifest = self._manifest(snapshot)
+        fields = {
+            key: dedupe_keys(value) for key, value in snapshot.items()
+            if key not in self.MANIFEST_KEYS and key not in self.ALWAYS
+        }
+        return manifest, fields
+
+    def payload(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        manifest, fields = self._split(snapshot)
+        manifest_hash = self._hash(manifest)
+        self._seq += 1
+        payload = {key: snapshot[key] for key in self.ALWAYS if key in snapshot}
+        payload.update({"protocol": self.PROTOCOL, "seq": self._seq, "manifest_hash": manifest_hash})
+
+        if not self._manifest_hash or self._pushes % self.full_every == 0:
+            payload.update({"full": True, "changed": fields, "removed": [], "manifest": manifest})
+            return payload
+
+        payload["full"] = False
+        payload["changed"] = {key: value for key, value in fields.items() if self._fields.get(key, object()) != value}
+        payload["removed"] = sorted(key for key in self._fields if key not in fields)
+        if manifest_hash != self._manifest_hash:
+            payload["manifest"] = manifest
+        return payload
+
+    def sent(self, snapshot: Dict[str, Any], ok: bool) -> None:
+        if ok:
+            manifest, self._fields = self._split(snapshot)
+            self._manifest_hash = self._hash(manifest)
+            self._pushes += 1
+        else:
+            self._fields = {}
+            self._manifest_hash = ""
+            self._pushes = 0
+
+
+def telemetry_delta(protocol: str = TELEMETRY_PROTOCOL):
+    """
+    Codificador de payload para o protocolo configurado. `full` (padrão) manda
+    o payload completo em todo push; omitir seções exige Hub que as mantenha.
+    """
+    if protocol == "delta":
+        return HashedTelemetryDelta()
+    if protocol == "sections":
+        return TelemetryDelta()
+    return TelemetryDelta(full_every=1)
@@ -6,10 +6,47 @@ from config import (
     TTS_LANGUAGE, TTS_GENDER, AUDIO_SAMPLE_RATE,
     GOOGLE_CLOUD_TTS_API_KEY, GEMINI_API_KEY
 )
+from core.alignment import save_boundaries
 from core.google_tts import GoogleGeminiTTS
 
 logger = logging.getLogger(__name__)
 
+def _communicate(text: str, voice: str) -> "edge_tts.Communicate":
+    try:
+        return edge_tts.Communicate(text, voice, boundary="WordBoundary")
+    except TypeError:  # edge-tts < 7: WordBoundary já é o padrão
+        return edge_tts.Communicate(text, voice)
+
+
+async def stream_edge_tts(text: str, output_audio: str, voice: str, submaker=None) -> list:
+    """
+    Grava o áudio do edge-tts (MP3) em `output_audio` e guarda os WordBoundary
+    do stream para as legendas ASS (core.alignment). Retorna os boundaries.
+    """
+    boundaries = []
+    with open(output_audio, "wb") as f:
+        async for chunk in _communicate(text, voice).stream():
+            if chunk["type"] == "audio":
+                f.write(chunk["data"])
+            elif chunk["type"] == "WordBoundary":
+                if submaker is not None:
+                    submaker.feed(chunk)
+                boundaries.append(chunk)
+    # Tempos exatos por palavra para as legendas ASS (core.alignment)
+    save_boundaries(output_audio, boundaries)
+    return boundaries
+
+
+def edge_tts_narration(text: str, output_audio: str, voice: str) -> bool:
+    """Versão síncrona para o pipeline (fallback do Gemini TTS em core.video_maker)."""
+    try:
+        asyncio.run(stream_edge_tts(text, output_audio, voice))
+    except Exception as e:
+        logger.error(f"❌ Erro no edge-tts: {e}")
+        return False
+    return os.path.exists(output_audio) and os.path.getsize(output_audio) > 0
+
+
 async def generate_audio_and_subs(text: str, output_audio: str, output_subs: str, voice: str = "pt-BR-AntonioNeural") -> bool:
     """
     Gera áudio e legendas. Prioriza Google Gemini TTS (v3.0).
@@ -33,15 +70,8 @@ async def generate_audio_and_subs(text: str, output_audio: str, output_subs: str
     # 2. Fallback para edge-tts (Gera áudio + legendas sincronizadas)
     logger.warning("⚠️  Usando edge-tts como fallback...")
     try:
-        communicate = edge_tts.Communicate(text, voice)
         submaker = edge_tts.SubMaker()
-        
-        with open(output_audio, "wb") as f:
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    f.write(chunk["data"])
-                elif chunk["type"] == "WordBoundary":
-                    submaker.feed(chunk)
+        await stream_edge_tts(text, output_audio, voice, submaker)
 
         srt_content = submaker.get_srt()
         if srt_content:
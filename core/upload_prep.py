@@ -0,0 +1,152 @@
+"""
+upload_prep.py — encolhe os assets antes do upload para o VideoLM.
+
+Nos engines de borda o upload domina a latência: a narração sai do TTS como
+WAV 24 kHz 16-bit (~14 MB para 5 min) e as cenas como JPEGs maiores que o
+vídeo final. Antes de enviar:
+
+  - narração → FLAC (sem perda) ou Opus, conforme o que o manifest do VideoLM
+    declara aceitar (sem declaração, segue em WAV)
+  - cenas → reduzidas até cobrir a resolução de render (sem crop e sem
+    upscale: o enquadramento continua com o VideoLM)
+
+Os arquivos derivados ficam em <projeto>/upload/ e são reaproveitados
+enquanto a origem e o alvo (formato, resolução) não mudam.
+"""
+import os
+import logging
+import subprocess
+from dataclasses import dataclass
+from typing import Any, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_AUDIO = os.getenv("VIDEOLM_UPLOAD_AUDIO", "auto").lower()  # auto | flac | opus | wav
+OPUS_BITRATE = os.getenv("VIDEOLM_OPUS_BITRATE", "128k")
+RESIZE_IMAGES = os.getenv("VIDEOLM_UPLOAD_RESIZE", "1") != "0"
+# Narrações menores que isso vão como estão (não compensa o ffmpeg nem a consulta ao manifest)
+TRANSCODE_MIN_KB = int(os.getenv("VIDEOLM_TRANSCODE_MIN_KB", "512"))
+JPEG_QUALITY = 90
+
+AUDIO_EXTENSIONS = {"flac": ".flac", "opus": ".opus", "wav": ".wav"}
+CONTENT_TYPES = {".wav": "audio/wav", ".flac": "audio/flac", ".opus": "audio/ogg", ".mp3": "audio/mpeg"}
+AUDIO_CODEC_ARGS = {
+    "flac": ["-c:a", "flac", "-compression_level", "8"],
+    "opus": ["-c:a", "libopus", "-b:a", OPUS_BITRATE],
+}
+
+
+@dataclass(frozen=True)
+class UploadTargets:
+    audio_format: str = "wav"
+    size: Optional[Tuple[int, int]] = None
+
+
+def content_type(path: str) -> str:
+    return CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), "audio/wav")
+
+
+def manifest_value(manifest: dict, *keys: str) -> Any:
+    """Procura a chave no topo do manifest e nas seções de assemble/upload."""
+    sections = [manifest] + [manifest.get(name) for name in ("assemble", "upload", "uploads", "render")]
+    for section in sections:
+        if not isinstance(section, dict):
+            continue
+        for key in keys:
+            if section.get(key):
+                return section[key]
+    return None
+
+
+def parse_size(value: Any) -> Optional[Tuple[int, int]]:
+    """'1080x1920', [1080, 1920] ou {'width':..,'height':..} → (w, h)."""
+    try:
+        if isinstance(value, str) and "x" in value:
+            width, height = value.lower().split("x", 1)
+            return int(width), int(height)
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            return int(value[0]), int(value[1])
+        if isinstance(value, dict):
+            return int(value["width"]), int(value["height"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+def negotiate(manifest: dict, render_size: str = "") -> UploadTargets:
+    """Formato de áudio e resolução das cenas a partir do manifest do VideoLM (e do perfil local)."""
+    manifest = manifest or {}
+    accepted = manifest_value(manifest, "audioFormats", "audio_formats") or []
+    accepted = {str(fmt).lower().lstrip(".").split("/")[-1] for fmt in accepted}
+    if UPLOAD_AUDIO in AUDIO_EXTENSIONS:
+        audio_format = UPLOAD_AUDIO
+    else:
+        audio_format = next((fmt for fmt in ("flac", "opus") if fmt in accepted), "wav")
+    size = parse_size(manifest_value(manifest, "renderSize", "render_size", "resolution")) or parse_size(render_size)
+    return UploadTargets(audio_format=audio_format, size=size)
+
+
+def should_transcode(audio_path: str) -> bool:
+    return (
+        UPLOAD_AUDIO != "wav"
+        and audio_path.lower().endswith(".wav")
+        and os.path.getsize(audio_path) >= TRANSCODE_MIN_KB * 1024
+    )
+
+
+def _is_fresh(derived: str, source: str) -> bool:
+    return os.path.exists(derived) and os.path.getmtime(derived) >= os.path.getmtime(source)
+
+
+def transcode_audio(audio_path: str, audio_format: str, out_dir: str) -> str:
+    """WAV → FLAC/Opus via ffmpeg; devolve o original se o formato é wav ou o encode falha."""
+    if audio_format not in AUDIO_CODEC_ARGS:
+        return audio_path
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.splitext(os.path.basename(audio_path))[0]
+    dest = os.path.join(out_dir, base + AUDIO_EXTENSIONS[audio_format])
+    if _is_fresh(dest, audio_path):
+        return dest
+    cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", audio_path,
+           *AUDIO_CODEC_ARGS[audio_format], dest]
+    try:
+        subprocess.run(cmd, check=True, capture_output=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        logger.warning(f"⚠️ Falha ao converter narração para {audio_format}, enviando WAV: {e}")
+        return audio_path
+    if not os.path.exists(dest) or os.path.getsize(dest) >= os.path.getsize(audio_path):
+        return audio_path
+    return dest
+
+
+def downsize_image(image_path: str, size: Tuple[int, int], out_dir: str, index: int = 0) -> str:
+    """Reduz a imagem até cobrir `size` mantendo o aspecto; nunca amplia nem corta."""
+    try:
+        with Image.open(image_path) as img:
+            width, height = img.size
+            scale = max(size[0] / width, size[1] / height)
+            if scale >= 1:
+                return image_path
+            os.makedirs(out_dir, exist_ok=True)
+            base = os.path.splitext(os.path.basename(image_path))[0]
+            # O alvo entra no nome: mudar a resolução de render não reaproveita um JPEG menor
+            dest = os.path.join(out_dir, f"{index:03d}_{base}_{size[0]}x{size[1]}.jpg")
+            if _is_fresh(dest, image_path):
+                return dest
+            new_size = (max(size[0], round(width * scale)), max(size[1], round(height * scale)))
+            img.convert("RGB").resize(new_size, Image.LANCZOS).save(dest, "JPEG", quality=JPEG_QUALITY)
+            return dest
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível reduzir {image_path}: {e}")
+        return image_path
+
+
+def prepare_upload(audio_path: str, image_paths: List[str], targets: UploadTargets, out_dir: str) -> Tuple[str, List[str]]:
+    """Aplica `targets` aos assets; retorna (áudio, imagens) a enviar."""
+    if should_transcode(audio_path):
+        audio_path = transcode_audio(audio_path, targets.audio_format, out_dir)
+    if RESIZE_IMAGES and targets.size:
+        image_paths = [downsize_image(path, targets.size, out_dir, n) for n, path in enumerate(image_paths)]
+    return audio_path, image_paths
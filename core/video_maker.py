@@ -1,4 +1,6 @@
-import os, sys, logging, random, json, math, shutil, subprocess
+import os, sys, logging, random, json, math, shutil, socket, threading, time, hashlib
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
 from typing import List, Optional
 from concurrent.futures import ThreadPoolExecutor
@@ -9,35 +11,166 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import VIDEO_FPS, OUTPUT_DIR, ASSETS_DIR, SCRIPTS_DIR, TTS_ENGINE
 from core.ffmpeg_engine import FFmpegEngine
 from core.gemini_tts import GeminiTTS
+from core.tts_engine import edge_tts_narration
+from core.alignment import align as align_words
 from core.subtitle_utils import generate_ass_from_text
 from core.branding_loader import BrandingLoader
 from core.image_gen import ImageGenerator
-from core.videolm_client import assemble_via_videolm
+from core.videolm_client import fetch_remote_render
+from core.videolm_tracker import assemble_tracked
+from core.stage_manifest import StageManifest, hash_inputs
+from core.stage_graph import StageError, StageGraph
+from core.encode_profiles import hosted_render_size, resolve_profile
+from core.media_probe import probe_duration
+from core.broll_index import BROLL_DIR, VIDEO_EXTS, BrollIndex
+from core.job_scheduler import SLOTS
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-BROLL_DIR  = os.path.join(ASSETS_DIR, "broll")
 AUDIO_DIR  = os.path.join(ASSETS_DIR, "audio")
 RENDER_DIR = os.path.join(OUTPUT_DIR,  "renders")
 CACHE_DIR  = os.path.join(OUTPUT_DIR,  "cache")
 
-IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp"}
-VIDEO_EXTS = {".mp4", ".mov", ".webm", ".mkv"}
 TARGET_SCENE_SECONDS = 6.0
+SPEECH_WORDS_PER_SECOND = float(os.getenv("TTS_WORDS_PER_SECOND", "2.5"))
 MAX_VIDEOLM_IMAGES = 100
+# Projeto "running" de outra máquina sem gravar o manifest há tanto tempo é dado como morto
+RESUME_STALE_SECONDS = int(os.getenv("RESUME_STALE_SECONDS", "21600"))
+
+try:
+    import fcntl
+except ImportError:  # Windows: só o lock entre threads
+    fcntl = None
+
+_claim_lock = threading.Lock()
 
 
 class VideoProject:
-    def __init__(self, script_path: str, brand_name: str = "default"):
-        self.timestamp   = datetime.now().strftime("%H%M%S")
+    def __init__(self, script_path: str, brand_name: str = "default", resume: bool = True):
         self.script_name = Path(script_path).stem.replace(".pending", "")
-        self.project_id  = f"{self.script_name}_{self.timestamp}"
-        self.project_dir = os.path.join(CACHE_DIR, self.project_id)
-        os.makedirs(self.project_dir, exist_ok=True)
-        self.audio_file  = os.path.join(self.project_dir, "narration.wav")
-        self.subs_file   = os.path.join(self.project_dir, "subtitles.ass")
-        self.output_file = os.path.join(RENDER_DIR, f"HOMES_{self.project_id}.mp4")
+        self.brand_name  = brand_name
+        self.script_hash = _script_hash(script_path)
+        # Busca + reserva atômicas: dois jobs do mesmo roteiro não retomam o mesmo projeto
+        with _project_claim_lock():
+            resumable = _find_resumable_project(self.script_name, self.script_hash, brand_name) if resume else None
+            if resumable:
+                self.project_id = resumable
+                self.timestamp  = resumable.rsplit("_", 1)[-1]
+                logger.info(f"♻️  Retomando projeto {self.project_id} a partir do manifest de estágios")
+            else:
+                self.timestamp  = datetime.now().strftime("%H%M%S")
+                self.project_id = f"{self.script_name}_{self.timestamp}"
+            self.project_dir = os.path.join(CACHE_DIR, self.project_id)
+            os.makedirs(self.project_dir, exist_ok=True)
+            self.audio_file  = os.path.join(self.project_dir, "narration.wav")
+            self.subs_file   = os.path.join(self.project_dir, "subtitles.ass")
+            self.output_file = os.path.join(RENDER_DIR, f"HOMES_{self.project_id}.mp4")
+            self.manifest    = StageManifest(self.project_dir)
+            if not resumable:
+                self.manifest.data.update({
+                    "project_id":  self.project_id,
+                    "script_hash": self.script_hash,
+                    "brand":       brand_name,
+                })
+            self.manifest.data.update({"status": "running", "owner": _owner()})
+            self.manifest.save()
+
+    def attach_audio(self, audio_path: str) -> str:
+        """
+        Narração enviada pelo usuário: copia para o projeto e registra em
+        `audio_upload` (o estágio de TTS passa a usá-la em vez de gerar).
+        """
+        ext = os.path.splitext(audio_path)[1].lower() or ".wav"
+        self.audio_file = os.path.join(self.project_dir, f"narration{ext}")
+        if os.path.abspath(audio_path) != os.path.abspath(self.audio_file):
+            shutil.copyfile(audio_path, self.audio_file)
+        self.manifest.set("audio_upload", _file_signature(self.audio_file))
+        return self.audio_file
+
+    def release(self, status: str) -> None:
+        """Fim do run: grava o status final e libera o projeto para ser retomado."""
+        self.manifest.data.pop("owner", None)
+        self.manifest.set("status", status)
+
+
+def _owner() -> dict:
+    return {"host": socket.gethostname(), "pid": os.getpid()}
+
+
+@contextmanager
+def _project_claim_lock():
+    """Serializa a reserva de projetos entre as threads e os processos do worker."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with _claim_lock, open(os.path.join(CACHE_DIR, ".claim.lock"), "a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        yield
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True  # outra thread deste worker
+    if os.name != "posix":
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _run_is_live(manifest: StageManifest) -> bool:
+    """Projeto "running" com dono vivo: processo ainda existe (mesma máquina) ou manifest recente."""
+    owner = manifest.data.get("owner") or {}
+    if owner.get("host") == socket.gethostname() and isinstance(owner.get("pid"), int):
+        return _pid_alive(owner["pid"])
+    try:
+        return time.time() - os.path.getmtime(manifest.path) < RESUME_STALE_SECONDS
+    except OSError:
+        return False
+
+
+def _script_hash(script_path: str) -> str:
+    try:
+        with open(script_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ""
+
+
+def _find_resumable_project(script_name: str, script_hash: str, brand_name: str) -> Optional[str]:
+    """
+    Projeto anterior do mesmo roteiro/marca que não chegou a concluir e não
+    está rodando em outro job (chamar dentro de `_project_claim_lock`).
+    """
+    if not script_hash or not os.path.isdir(CACHE_DIR):
+        return None
+    candidates = []
+    for name in os.listdir(CACHE_DIR):
+        prefix, _, suffix = name.rpartition("_")
+        if prefix != script_name or not suffix.isdigit():
+            continue
+        manifest = StageManifest(os.path.join(CACHE_DIR, name))
+        data = manifest.data
+        if data.get("script_hash") != script_hash or data.get("brand") != brand_name:
+            continue
+        if data.get("status") == "completed":
+            continue
+        if data.get("status") == "running" and _run_is_live(manifest):
+            continue
+        candidates.append((os.path.getmtime(manifest.path), name))
+    return max(candidates)[1] if candidates else None
+
+
+def _file_signature(path: str) -> list:
+    try:
+        stat = os.stat(path)
+        return [os.path.basename(path), stat.st_size, int(stat.st_mtime)]
+    except OSError:
+        return [os.path.basename(path)]
 
 
 def _sentence_chunks(content: str) -> List[str]:
@@ -54,47 +187,47 @@ def _target_scene_count(duration: float, content: str) -> int:
     return min(MAX_VIDEOLM_IMAGES, max(sentence_count, cadence_count))
 
 
+def _estimate_duration(content: str) -> float:
+    """Duração estimada da narração pelo número de palavras (antes do TTS terminar)."""
+    return max(1.0, len(content.split()) / max(0.1, SPEECH_WORDS_PER_SECOND))
+
+
 def _media_duration(path: str) -> float:
-    try:
-        result = subprocess.check_output(
-            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", path],
-            stderr=subprocess.DEVNULL,
-        )
-        return max(0.1, float(result.strip()))
-    except Exception:
-        return 1.0
+    duration = probe_duration(path)
+    return max(0.1, duration) if duration else 1.0
 
 
-def _broll_assets() -> List[str]:
-    if not os.path.isdir(BROLL_DIR):
+def _broll_index() -> BrollIndex:
+    return BrollIndex(BROLL_DIR)
+
+
+def _broll_assets(index: Optional[BrollIndex] = None) -> List[str]:
+    index = index or _broll_index()
+    try:
+        return [asset.path for asset in index.refresh()]
+    except Exception as e:
+        logger.warning(f"⚠️ Índice de b-roll indisponível: {e}")
         return []
-    assets = []
-    for name in sorted(os.listdir(BROLL_DIR)):
-        path = os.path.join(BROLL_DIR, name)
-        ext = Path(path).suffix.lower()
-        if os.path.isfile(path) and ext in IMAGE_EXTS.union(VIDEO_EXTS):
-            assets.append(path)
-    return assets
 
 
-def _extract_broll_frame(video_path: str, dest_path: str, scene_index: int, total_scenes: int) -> Optional[str]:
-    duration = _media_duration(video_path)
+def _broll_timestamp(duration: float, scene_index: int, total_scenes: int) -> float:
     spread = (scene_index + 1) / max(2, total_scenes + 1)
-    timestamp = min(max(0.2, duration * spread), max(0.2, duration - 0.2))
-    cmd = [
-        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
-        "-ss", f"{timestamp:.2f}",
-        "-i", video_path,
-        "-frames:v", "1",
-        "-vf", "scale=720:1280:force_original_aspect_ratio=increase,crop=720:1280,setsar=1",
-        dest_path,
-    ]
+    return min(max(0.2, duration * spread), max(0.2, duration - 0.2))
+
+
+def _extract_broll_frames(video_path: str, scenes: List[tuple], total_scenes: int, keyframes: Optional[List[float]] = None) -> dict:
+    """
+    Extrai todos os frames de cena de um vídeo de b-roll num único processo ffmpeg.
+    `scenes` é uma lista de (scene_index, dest_path); retorna {scene_index: dest_path}.
+    """
+    duration = _media_duration(video_path)
+    frames = [(_broll_timestamp(duration, i, total_scenes), dest) for i, dest in scenes]
     try:
-        subprocess.run(cmd, check=True)
-        return dest_path if os.path.exists(dest_path) and os.path.getsize(dest_path) > 1000 else None
+        extracted = set(FFmpegEngine.extract_frames(video_path, frames, keyframes=keyframes))
     except Exception as e:
         logger.warning(f"⚠️ Falha extraindo b-roll {video_path}: {e}")
-        return None
+        return {}
+    return {i: dest for i, dest in scenes if dest in extracted}
 
 
 def _copy_broll_image(image_path: str, dest_path: str) -> Optional[str]:
@@ -106,10 +239,202 @@ def _copy_broll_image(image_path: str, dest_path: str) -> Optional[str]:
         return None
 
 
+def _run_tts_stage(proj: VideoProject, content: str, voice: str) -> bool:
+    """
+    Estágio 2: narração. Reaproveita checkpoint válido ou áudio enviado pelo
+    usuário: o registrado por `VideoProject.attach_audio` ou qualquer narração
+    no projeto que não seja saída de um TTS anterior (o TTS grava num arquivo
+    temporário e só renomeia no fim, então não sobra narração pela metade).
+    """
+    inputs_hash = hash_inputs("tts", content, voice)
+    recorded = proj.manifest.get("tts") or {}
+    upload = proj.manifest.data.get("audio_upload")
+    if upload:
+        proj.audio_file = os.path.join(proj.project_dir, upload[0])
+    elif recorded.get("outputs"):
+        # Narração do edge-tts fica em .mp3: o manifest diz qual arquivo vale
+        proj.audio_file = recorded["outputs"][0]
+    current = _file_signature(proj.audio_file) if os.path.exists(proj.audio_file) else None
+    if proj.manifest.is_valid("tts", inputs_hash) and recorded.get("audio") in (None, current):
+        logger.info("♻️  TTS reaproveitado do checkpoint")
+        return True
+
+    started_at = time.time()
+    logger.info(f"🎙️  TTS → {proj.audio_file}")
+    if current and (current == upload or current != recorded.get("audio")):
+        logger.info("♻️  Usando áudio enviado pelo usuário")
+    else:
+        with SLOTS.network():
+            base, ext = os.path.splitext(proj.audio_file)
+            partial = f"{base}.partial{ext}"
+            tts_success = GeminiTTS().generate(content, partial, voice=voice)
+            # Fallback para Edge-TTS se o Gemini falhar (ex: cota 429)
+            if not tts_success or not os.path.exists(partial):
+                logger.warning("⚠️ Gemini TTS falhou ou cota excedida. Usando Edge-TTS como fallback...")
+                voice_fallback = "pt-BR-AntonioNeural" if "pt" in content.lower() else "en-US-ChristopherNeural"
+                # edge-tts gera MP3 (e os WordBoundary para as legendas alinhadas)
+                proj.audio_file = f"{base}.mp3"
+                partial = f"{base}.partial.mp3"
+                edge_tts_narration(content, partial, voice_fallback)
+            if os.path.exists(partial):
+                os.replace(partial, proj.audio_file)
+
+    if not os.path.exists(proj.audio_file):
+        logger.error("❌ Falha crítica no TTS — nenhum motor funcionou")
+        return False
+
+    proj.manifest.record("tts", inputs_hash, [proj.audio_file], started_at, audio=_file_signature(proj.audio_file))
+    return True
+
+
+def _run_subtitles_stage(proj: VideoProject, content: str, duration: float, brand_colors: Optional[dict]) -> None:
+    """Estágio 3: legendas ASS locais (debug / fallback), nos tempos reais da narração quando alinháveis."""
+    word_timings = align_words(proj.audio_file, content)
+    inputs_hash = hash_inputs(
+        "subtitles", content, round(duration, 3), brand_colors,
+        [(t.start, t.end) for t in word_timings] if word_timings else None,
+    )
+    if proj.manifest.is_valid("subtitles", inputs_hash):
+        logger.info("♻️  Legendas reaproveitadas do checkpoint")
+        return
+
+    started_at = time.time()
+    generate_ass_from_text(
+        content,
+        duration,
+        proj.subs_file,
+        brand_colors=brand_colors,
+        start_offset=1.0,
+        word_timings=word_timings,
+    )
+    if os.path.exists(proj.subs_file):
+        proj.manifest.record("subtitles", inputs_hash, [proj.subs_file], started_at)
+
+
+def _run_scenes_stage(
+    proj: VideoProject,
+    content: str,
+    target_scenes: int,
+    brand_style: str,
+    broll_assets: List[str],
+    broll_index: Optional[BrollIndex] = None,
+) -> List[str]:
+    """
+    Estágio 4: imagens de cena em paralelo (b-roll, title cards locais, geração remota).
+    Com `broll_index`, cenas de b-roll usam os frames candidatos já extraídos.
+    """
+    inputs_hash = hash_inputs(
+        "scenes", content, target_scenes, brand_style,
+        [_file_signature(path) for path in broll_assets],
+    )
+    if proj.manifest.is_valid("scenes", inputs_hash):
+        scene_assets = proj.manifest.get("scenes")["outputs"]
+        logger.info(f"♻️  {len(scene_assets)} cenas reaproveitadas do checkpoint")
+        return scene_assets
+
+    started_at = time.time()
+    sentences = _sentence_chunks(content)
+    logger.info(
+        f"🖼️  Preparando {target_scenes} cenas visuais "
+        f"({len(broll_assets)} b-roll assets disponíveis)"
+    )
+
+    img_gen = ImageGenerator()
+
+    def scene_dest(i: int) -> str:
+        return os.path.join(proj.project_dir, f"scene_{i:03d}.jpg")
+
+    def broll_source(i: int) -> Optional[str]:
+        # Intercala title cards locais com b-roll extraído de vídeos/imagens.
+        # Isso evita depender de uma chamada externa de imagem a cada poucos segundos.
+        if broll_assets and i % 5 != 0:
+            return broll_assets[i % len(broll_assets)]
+        return None
+
+    # Cenas por arquivo de b-roll: com mais cenas que candidatos no índice, extrai por cena
+    scenes_per_source = Counter(broll_source(i) for i in range(target_scenes))
+
+    def indexed_frame(i: int) -> Optional[str]:
+        source = broll_source(i)
+        if not source or broll_index is None:
+            return None
+        return broll_index.candidate_for(source, i, target_scenes, scenes_per_source[source])
+
+    # Frames de vídeo sem candidato no índice, agrupados por arquivo:
+    # um decode por vídeo em vez de um processo por cena
+    video_scenes = {}
+    for i in range(target_scenes):
+        source = broll_source(i)
+        if source and Path(source).suffix.lower() in VIDEO_EXTS and not indexed_frame(i):
+            video_scenes.setdefault(source, []).append((i, scene_dest(i)))
+    broll_frames = {}
+    if video_scenes:
+        def extract(item):
+            asset = broll_index.get(item[0]) if broll_index is not None else None
+            with SLOTS.cpu():
+                return _extract_broll_frames(item[0], item[1], target_scenes, asset.keyframes if asset else None)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for frames in executor.map(extract, video_scenes.items()):
+                broll_frames.update(frames)
+
+    def scene_prompt(i: int) -> str:
+        sentence = sentences[i % len(sentences)]
+        return (
+            f"Cinematic editorial scene, {sentence[:180]}, "
+            f"{brand_style}, vertical 9:16, strong composition, no text, no watermark"
+        )
+
+    # Title cards locais (cenas sem b-roll) saem num único lote, direto no projeto
+    card_scenes = [i for i in range(target_scenes) if broll_source(i) is None]
+    title_cards = dict(zip(card_scenes, img_gen.create_title_cards(
+        [(scene_prompt(i), f"scene_{i:03d}.jpg") for i in card_scenes],
+        720, 1280, output_dir=proj.project_dir,
+    )))
+
+    def generate_scene_image(i: int):
+        img_name = f"scene_{i:03d}.jpg"
+        dest = scene_dest(i)
+        prompt = scene_prompt(i)
+
+        if title_cards.get(i):
+            return title_cards[i]
+        if i in broll_frames:
+            return broll_frames[i]
+        source = broll_source(i)
+        candidate = indexed_frame(i)
+        if candidate is None and source and Path(source).suffix.lower() not in VIDEO_EXTS:
+            candidate = source
+        if candidate:
+            result = _copy_broll_image(candidate, dest)
+            if result:
+                return result
+
+        result = img_gen.create_title_cards([(prompt, img_name)], 720, 1280, output_dir=proj.project_dir)[0]
+        if result:
+            return result
+
+        with SLOTS.network():
+            return img_gen.generate(prompt, img_name, output_dir=proj.project_dir)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        scene_assets = [
+            r for r in executor.map(generate_scene_image, range(target_scenes))
+            if r is not None
+        ]
+
+    if scene_assets:
+        proj.manifest.record("scenes", inputs_hash, scene_assets, started_at, target_scenes=target_scenes)
+    return scene_assets
+
+
 def generate_video(
     script_path: str,
     theme_name:  str = "yellow_punch",
     brand_name:  str = "default",
+    resume:      bool = True,
+    encode_profile: str = "",
+    audio_path:  Optional[str] = None,
 ) -> Optional[str]:
     """
     Pipeline principal — Engine como orquestrador, VideoLM como renderizador.
@@ -117,17 +442,27 @@ def generate_video(
     Estágios:
         1. Carrega roteiro
         2. Gemini TTS  → narration.wav
-        3. Legenda ASS (local, para referência)
-        4. Gera imagens de cena em paralelo (Gemini → Pollinations fallback)
+        3. Legenda ASS (local, para referência) — após o TTS
+        4. Gera imagens de cena em paralelo (Gemini → Pollinations fallback) — junto com o TTS
         5. Delega montagem FFmpeg ao VideoLM via videolm_client
         6. Copia .mp4 final para output/renders e salva metadata.json
+
+    Cada estágio é registrado em `stages.json` no diretório do projeto; com
+    `resume`, um job re-tentado retoma do último estágio válido.
+
+    `encode_profile` (draft/preview/final/archive/auto) vale para o render
+    local; sem ele, usa `encode_profile` da marca ou ENCODE_PROFILE.
+    `audio_path` é uma narração pronta (pula o TTS).
     """
-    proj     = VideoProject(script_path, brand_name)
+    proj     = VideoProject(script_path, brand_name, resume=resume)
     branding = BrandingLoader(brand_name)
     brand_cfg   = branding.get_config() if hasattr(branding, "get_config") else {}
     brand_style = branding.get_style_prompt()
 
     try:
+        if audio_path:
+            proj.attach_audio(audio_path)
+
         # ---- 1. Roteiro ----
         with open(script_path, "r", encoding="utf-8") as f:
             content = f.read().strip()
@@ -136,115 +471,99 @@ def generate_video(
             logger.error("❌ Script vazio")
             return None
 
-        # ---- 2. TTS ----
-        logger.info(f"🎙️  TTS → {proj.audio_file}")
+        # ---- 2-4. TTS, legendas e cenas como DAG ----
+        # As cenas só dependem do texto: a contagem usa a duração estimada e
+        # a duração real só entra na renderização, então imagens/b-roll rodam
+        # em paralelo ao TTS. Legendas esperam a duração real do áudio.
         voice = brand_cfg.get("voice", "Kore")
-        
-        # Se o áudio já existir (user upload), pula a geração
-        if os.path.exists(proj.audio_file) and os.path.getsize(proj.audio_file) > 1000:
-            logger.info("♻️  Usando áudio pré-existente (upload detectado)")
-        else:
-            tts_success = GeminiTTS().generate(content, proj.audio_file, voice=voice)
-            # Fallback para Edge-TTS se o Gemini falhar (ex: cota 429)
-            if not tts_success or not os.path.exists(proj.audio_file):
-                logger.warning("⚠️ Gemini TTS falhou ou cota excedida. Usando Edge-TTS como fallback...")
-                voice_fallback = "pt-BR-AntonioNeural" if "pt" in content.lower() else "en-US-ChristopherNeural"
-                import subprocess
-                subprocess.run(["edge-tts", "--text", content, "--write-media", proj.audio_file, "--voice", voice_fallback], check=True)
-
-        if not os.path.exists(proj.audio_file):
-            logger.error("❌ Falha crítica no TTS — nenhum motor funcionou")
-            return None
-
-        duration = FFmpegEngine.get_duration(proj.audio_file)
-        logger.info(f"⏱️  Duração detectada: {duration:.1f}s")
-
-        # ---- 3. Legendas locais (para debug / fallback) ----
-        generate_ass_from_text(
-            content, 
-            duration, 
-            proj.subs_file, 
-            brand_colors=brand_cfg.get("colors"), 
-            start_offset=1.0
-        )
-
-        # ---- 4. Cenas visuais ----
-        sentences = _sentence_chunks(content)
-        target_scenes = _target_scene_count(duration, content)
-        broll_assets = _broll_assets()
-        logger.info(
-            f"🖼️  Preparando {target_scenes} cenas visuais "
-            f"({len(broll_assets)} b-roll assets disponíveis)"
+        broll_index = _broll_index()
+        with SLOTS.cpu():
+            broll_assets = _broll_assets(broll_index)
+        target_scenes = _target_scene_count(_estimate_duration(content), content)
+
+        def tts_stage():
+            if not _run_tts_stage(proj, content, voice):
+                raise RuntimeError("nenhum motor de TTS funcionou")
+            return proj.audio_file
+
+        def duration_stage(tts):
+            duration = FFmpegEngine.get_duration(tts)
+            logger.info(f"⏱️  Duração detectada: {duration:.1f}s")
+            return duration
+
+        def subtitles_stage(duration):
+            _run_subtitles_stage(proj, content, duration, brand_cfg.get("colors"))
+            return proj.subs_file
+
+        def scenes_stage():
+            return _run_scenes_stage(proj, content, target_scenes, brand_style, broll_assets, broll_index)
+
+        graph = (
+            StageGraph(max_workers=3)
+            .add("tts", tts_stage)
+            .add("duration", duration_stage, deps=["tts"])
+            .add("subtitles", subtitles_stage, deps=["duration"])
+            .add("scenes", scenes_stage)
         )
-
-        img_gen = ImageGenerator()
-
-        def generate_scene_image(i: int):
-            sentence = sentences[i % len(sentences)]
-            img_name = f"scene_{i:03d}.jpg"
-            dest = os.path.join(proj.project_dir, img_name)
-            prompt = (
-                f"Cinematic editorial scene, {sentence[:180]}, "
-                f"{brand_style}, vertical 9:16, strong composition, no text, no watermark"
-            )
-
-            # Intercala title cards locais com b-roll extraído de vídeos/imagens.
-            # Isso evita depender de uma chamada externa de imagem a cada poucos segundos.
-            if broll_assets and i % 5 != 0:
-                source = broll_assets[i % len(broll_assets)]
-                ext = Path(source).suffix.lower()
-                if ext in VIDEO_EXTS:
-                    result = _extract_broll_frame(source, dest, i, target_scenes)
-                else:
-                    result = _copy_broll_image(source, dest)
-                if result:
-                    return result
-
-            result = img_gen._create_local_fallback(prompt, img_name, 720, 1280)
-            if result:
-                shutil.move(result, dest)
-                return dest
-
-            result = img_gen.generate(prompt, img_name)
-            if result:
-                shutil.move(result, dest)
-                return dest
+        try:
+            results = graph.run()
+        except StageError as e:
+            logger.error(f"❌ {e}")
             return None
 
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            scene_assets = [
-                r for r in executor.map(generate_scene_image, range(target_scenes))
-                if r is not None
-            ]
+        duration = results["duration"]
+        scene_assets = results["scenes"]
 
         if not scene_assets:
             logger.error("❌ Nenhuma imagem gerada — pipeline abortado")
             return None
 
-        logger.info(f"✅ {len(scene_assets)}/{target_scenes} cenas prontas")
+        logger.info(
+            f"✅ {len(scene_assets)}/{target_scenes} cenas prontas "
+            f"(~{duration / len(scene_assets):.1f}s por cena)"
+        )
 
         # ---- 5. Renderização (VideoLM com Fallback Local) ----
+        profile = resolve_profile(encode_profile, brand_cfg, duration)
+        logger.info(f"🎛️  Perfil de encode: {profile.name} ({profile.size} @ {profile.fps}fps)")
         bg_music_id = (
             brand_cfg.get("music", {}).get("file", "")
             if isinstance(brand_cfg.get("music"), dict)
             else ""
         )
 
+        render_hash = hash_inputs(
+            "render",
+            proj.manifest.get("tts")["inputs_hash"],
+            (proj.manifest.get("subtitles") or {}).get("inputs_hash"),
+            proj.manifest.get("scenes")["inputs_hash"],
+            bg_music_id,
+            profile.to_dict(),
+        )
+        if proj.manifest.is_valid("render", render_hash):
+            output_path = proj.manifest.get("render")["outputs"][0]
+            logger.info(f"♻️  Render reaproveitado do checkpoint: {output_path}")
+        else:
+            output_path = None
+
         os.makedirs(RENDER_DIR, exist_ok=True)
-        output_path = None
+        render_started = time.time()
+        engine = (proj.manifest.get("render") or {}).get("engine", "VideoLM")
 
-        # Tenta VideoLM se configurado
-        if os.getenv("VIDEOLM_URL"):
+        # Tenta VideoLM se configurado (perfis só-locais, como draft, pulam)
+        if not output_path and profile.hosted and os.getenv("VIDEOLM_URL"):
             logger.info("🚀 Tentando renderização via VideoLM...")
             try:
-                output_path = assemble_via_videolm(
+                output_path = assemble_tracked(
                     audio_path   = proj.audio_file,
                     image_paths  = scene_assets,
                     script       = content,
                     project_id   = proj.project_id,
                     bg_music_id  = bg_music_id,
                     output_dir   = RENDER_DIR,
+                    render_size  = hosted_render_size(profile, encode_profile, brand_cfg),
                 )
+                engine = "VideoLM"
             except Exception as e:
                 logger.warning(f"⚠️ VideoLM falhou: {e}. Mudando para FFmpeg Local...")
 
@@ -252,25 +571,32 @@ def generate_video(
         if not output_path:
             logger.info("🎬 Iniciando Renderização Local (FFmpeg Engine)...")
             
-            output_filename = f"HOMES_{proj.project_id}.mp4"
+            suffix = "" if profile.name == "final" else f"_{profile.name}"
+            output_filename = f"HOMES_{proj.project_id}{suffix}.mp4"
             output_path = os.path.join(RENDER_DIR, output_filename)
             
             # Busca Assets de Branding
             logo_path = branding.get_asset_path("logo.png")
             bg_music = branding.get_asset_path("signature_music.mp3") or branding.get_asset_path("music.mp3")
             
-            success = FFmpegEngine.assemble_video(
-                audio_path=proj.audio_file,
-                image_paths=scene_assets,
-                subs_path=proj.subs_file,
-                output_path=output_path,
-                duration=duration,
-                logo_path=logo_path,
-                bg_music_path=bg_music
-            )
+            with SLOTS.cpu():
+                success = FFmpegEngine.assemble_video(
+                    audio_path=proj.audio_file,
+                    image_paths=scene_assets,
+                    subs_path=proj.subs_file,
+                    output_path=output_path,
+                    duration=duration,
+                    logo_path=logo_path,
+                    bg_music_path=bg_music,
+                    profile=profile,
+                )
             if not success:
                 logger.error("❌ Falha na renderização local via FFmpeg")
                 return None
+            engine = "FFmpeg"
+
+        if not proj.manifest.is_valid("render", render_hash):
+            proj.manifest.record("render", render_hash, [output_path], render_started, engine=engine)
 
         # ---- 6. Metadata ----
         metadata = {
@@ -283,10 +609,17 @@ def generate_video(
             "status":      "completed",
             "timestamp":   datetime.now().isoformat(),
             "output_file": output_path,
-            "engine":      "VideoLM",
+            "engine":      engine,
+            "encode_profile": profile.name,
+            "stages":      {
+                name: stage.get("elapsed_seconds")
+                for name, stage in proj.manifest.stages.items()
+            },
+            "stage_timings": graph.timings,
         }
         with open(os.path.join(proj.project_dir, "metadata.json"), "w") as f:
             json.dump(metadata, f, indent=4)
+        proj.release("completed")
 
         logger.info(f"🎬 CONCLUÍDO → {output_path}")
         return output_path
@@ -294,6 +627,25 @@ def generate_video(
     except Exception as e:
         logger.error(f"🔥 Erro no pipeline: {e}", exc_info=True)
         return None
+    finally:
+        if proj.manifest.data.get("status") != "completed":
+            # Run encerrado sem concluir: fica retomável pelo próximo job
+            proj.release("failed")
+
+
+def local_render(output_path: Optional[str]) -> Optional[str]:
+    """
+    Render em disco para quem abre o arquivo (fila local, CLI, capability).
+    Com VIDEOLM_REMOTE_ARTIFACTS=1 o pipeline devolve só o stub remoto; aqui ele
+    é baixado. O Hub não passa por aqui: recebe a URL do sidecar.
+    """
+    if not output_path:
+        return None
+    try:
+        return fetch_remote_render(output_path)
+    except Exception as e:
+        logger.error(f"❌ Falha ao baixar o render remoto {output_path}: {e}")
+        return None
 
 
 if __name__ == "__main__":
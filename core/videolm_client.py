@@ -4,9 +4,16 @@ import logging
 import json
 import requests
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 from dotenv import load_dotenv
 
+from core import http_pool
+from core import range_download
+from core import remote_artifact
+from core import upload_prep
+from core.clip_cache import file_digest
+from core.job_scheduler import SLOTS
+
 # Carregar variáveis de ambiente
 load_dotenv()
 
@@ -20,6 +27,20 @@ VIDEOLM_TOKEN = os.getenv("VIDEOLM_TOKEN", "")   # JWT opcional
 VIDEOLM_ASSEMBLE_PATH = os.getenv("VIDEOLM_ASSEMBLE_PATH", "")
 POLL_INTERVAL = int(os.getenv("VIDEOLM_POLL_INTERVAL", "5"))   # segundos
 POLL_TIMEOUT  = int(os.getenv("VIDEOLM_POLL_TIMEOUT",  "600"))  # 10 min max
+POLL_MIN_INTERVAL = float(os.getenv("VIDEOLM_POLL_MIN_INTERVAL", "1"))   # perto do fim do render
+POLL_MAX_INTERVAL = float(os.getenv("VIDEOLM_POLL_MAX_INTERVAL", "30"))  # início de renders longos
+VIDEOLM_STATUS_STREAM = os.getenv("VIDEOLM_STATUS_STREAM", "auto")       # auto | on | off
+VIDEOLM_UPLOAD_MODE = os.getenv("VIDEOLM_UPLOAD_MODE", "auto")
+VIDEOLM_CHUNK_MB = float(os.getenv("VIDEOLM_CHUNK_MB", "4"))
+VIDEOLM_CHUNKED_MIN_MB = float(os.getenv("VIDEOLM_CHUNKED_MIN_MB", "8"))  # auto: abaixo disso, multipart
+VIDEOLM_UPLOAD_RETRIES = int(os.getenv("VIDEOLM_UPLOAD_RETRIES", "5"))   # por parte
+
+# Base URL → servidor aceita upload em partes? (descoberto no primeiro job)
+_CHUNKED_SUPPORT: dict = {}
+# Base URL → manifest do VideoLM (negociação de formatos de upload)
+_MANIFEST_CACHE: dict = {}
+# Base URL → servidor tem stream SSE de status? (False depois de um 404)
+_STATUS_STREAM_SUPPORT: dict = {}
 
 
 def _base_url() -> str:
@@ -80,13 +101,13 @@ def engine_demo_url() -> str:
 
 
 def fetch_engine_health(timeout: int = 10) -> dict:
-    resp = requests.get(f"{_base_url()}/api/engine/health", headers=_headers(), timeout=timeout)
+    resp = http_pool.get(f"{_base_url()}/api/engine/health", headers=_headers(), timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
 
 def fetch_engine_manifest(timeout: int = 15) -> dict:
-    resp = requests.get(f"{_base_url()}/api/engine/manifest", headers=_headers(), timeout=timeout)
+    resp = http_pool.get(f"{_base_url()}/api/engine/manifest", headers=_headers(), timeout=timeout)
     resp.raise_for_status()
     return resp.json()
 
@@ -139,7 +160,7 @@ def submit_notebooklm_video(
             handles.append(fh)
             files.append(("assets", (Path(path).name, fh, "application/octet-stream")))
 
-        resp = requests.post(
+        resp = http_pool.post(
             endpoint,
             data=data,
             files=files or None,
@@ -157,7 +178,7 @@ def poll_notebooklm_video(project_id: str, timeout: int = 30) -> dict:
     """Consulta o endpoint de download/cache de um job NotebookLM video."""
     if not project_id:
         raise ValueError("project_id is required")
-    resp = requests.get(
+    resp = http_pool.get(
         f"{_base_url()}/api/research/{project_id}/download",
         headers=_headers(),
         timeout=timeout,
@@ -212,7 +233,7 @@ def submit_studio_artifact(
     body = {key: value for key, value in body.items() if value not in ("", None, [], {})}
     files, handles = _open_asset_files(asset_paths or [], field_name="assets")
     try:
-        resp = requests.post(
+        resp = http_pool.post(
             endpoint,
             data=body,
             files=files or None,
@@ -276,7 +297,7 @@ def submit_factory_infographic_assets(
         "profileId": profile_id or "default",
     }
     body = {key: value for key, value in body.items() if value not in ("", None, [], {})}
-    resp = requests.post(
+    resp = http_pool.post(
         f"{_base_url()}/api/research/{project_id}/factory-infographic-assets",
         json=body,
         headers=_headers(),
@@ -289,7 +310,7 @@ def submit_factory_infographic_assets(
 def poll_factory_infographic_assets(job_id: str, timeout: int = 30) -> dict:
     if not job_id:
         raise ValueError("job_id is required")
-    resp = requests.get(
+    resp = http_pool.get(
         f"{_base_url()}/api/research/factory-infographic-assets/{job_id}",
         headers=_headers(),
         timeout=timeout,
@@ -402,7 +423,7 @@ def _submit_studio_artifact_legacy(
         "title": title,
     }
     body = {key: value for key, value in body.items() if value not in ("", None, [], {})}
-    resp = requests.post(
+    resp = http_pool.post(
         f"{_base_url()}/api/research/{project_id}/trigger",
         json=body,
         headers=_headers(),
@@ -432,7 +453,7 @@ def _add_research_sources(project_id: str, urls: list, timeout: int = 120) -> No
     clean_urls = [url for url in urls or [] if url]
     if not clean_urls:
         return
-    resp = requests.post(
+    resp = http_pool.post(
         f"{_base_url()}/api/research/{project_id}/sources",
         json={"urls": clean_urls},
         headers=_headers(),
@@ -459,7 +480,7 @@ def _add_research_files(
         data = {"profileId": profile_id or "default"}
         if notebook_id:
             data["notebookId"] = notebook_id
-        resp = requests.post(
+        resp = http_pool.post(
             f"{_base_url()}/api/research/{project_id}/source-files",
             data=data,
             files=files,
@@ -521,6 +542,197 @@ def _guess_content_type(url: str) -> str:
     return ""
 
 
+# ---------------------------------------------------------------------------
+# UPLOAD DOS ASSETS
+# ---------------------------------------------------------------------------
+
+def _upload_mode() -> str:
+    """auto (em partes acima de VIDEOLM_CHUNKED_MIN_MB), chunked ou multipart."""
+    return os.getenv("VIDEOLM_UPLOAD_MODE", VIDEOLM_UPLOAD_MODE).lower()
+
+
+def _chunk_size() -> int:
+    return int(float(os.getenv("VIDEOLM_CHUNK_MB", str(VIDEOLM_CHUNK_MB))) * 1_048_576)
+
+
+def _assets_endpoint() -> str:
+    """Assets do upload em partes ficam ao lado do endpoint de assemble."""
+    return f"{_base_url()}{_assemble_path().rsplit('/', 1)[0]}/assets"
+
+
+def _use_chunked_upload(audio_path: str, image_paths: list) -> bool:
+    mode = _upload_mode()
+    if mode == "chunked":
+        return True
+    if mode != "auto" or _CHUNKED_SUPPORT.get(_base_url()) is False:
+        return False
+    total = sum(os.path.getsize(path) for path in [audio_path, *image_paths])
+    return total >= VIDEOLM_CHUNKED_MIN_MB * 1_048_576
+
+
+def _cached_manifest() -> dict:
+    base = _base_url()
+    if base not in _MANIFEST_CACHE:
+        try:
+            _MANIFEST_CACHE[base] = fetch_engine_manifest(timeout=5)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"⚠️  Manifest do VideoLM indisponível ({e}); upload sem negociação")
+            return {}
+    return _MANIFEST_CACHE[base]
+
+
+def _optimize_upload(audio_path: str, image_paths: list, render_size: str) -> tuple:
+    """Narração comprimida e cenas na resolução de render, conforme o manifest do VideoLM."""
+    # O manifest só é consultado quando há narração grande o bastante para converter
+    manifest = _cached_manifest() if upload_prep.should_transcode(audio_path) else {}
+    targets = upload_prep.negotiate(manifest, render_size)
+    out_dir = os.path.join(os.path.dirname(os.path.abspath(audio_path)), "upload")
+    before = sum(os.path.getsize(path) for path in [audio_path, *image_paths])
+    audio_path, image_paths = upload_prep.prepare_upload(audio_path, image_paths, targets, out_dir)
+    after = sum(os.path.getsize(path) for path in [audio_path, *image_paths])
+    if after < before:
+        logger.info(f"🗜️  Upload reduzido: {before / 1_048_576:.1f} MB → {after / 1_048_576:.1f} MB")
+    return audio_path, image_paths
+
+
+def _assemble_multipart(endpoint: str, audio_path: str, image_paths: list, data: dict, headers: dict) -> requests.Response:
+    """Upload antigo: áudio + imagens num único multipart/form-data."""
+    files = []
+    audio_handle = None
+    image_handles = []
+    try:
+        audio_handle = open(audio_path, "rb")
+        files.append(("audio", (Path(audio_path).name, audio_handle, upload_prep.content_type(audio_path))))
+
+        for img in image_paths:
+            fh = open(img, "rb")
+            image_handles.append(fh)
+            files.append(("images", (Path(img).name, fh, "image/jpeg")))
+
+        resp = http_pool.post(endpoint, files=files, data=data, headers=headers, timeout=120)
+        fallback_endpoint = _alternate_assemble_endpoint()
+        if fallback_endpoint and resp.status_code in (401, 404, 405):
+            logger.warning(
+                f"⚠️  VideoLM retornou HTTP {resp.status_code} em {endpoint}. "
+                f"Tentando fallback {fallback_endpoint}"
+            )
+            for _, file_tuple in files:
+                file_tuple[1].seek(0)
+            resp = http_pool.post(
+                fallback_endpoint,
+                files=files,
+                data=data,
+                headers=headers,
+                timeout=120,
+            )
+        return resp
+    finally:
+        if audio_handle:
+            audio_handle.close()
+        for fh in image_handles:
+            fh.close()
+
+
+def _asset_ref(path: str, content_type: str) -> dict:
+    return {
+        "name": Path(path).name,
+        "hash": file_digest(path),
+        "size": os.path.getsize(path),
+        "contentType": content_type,
+        "path": path,
+    }
+
+
+def _known_assets(hashes: list, headers: dict) -> Optional[set]:
+    """Hashes que o VideoLM já tem; None se o servidor não suporta upload em partes."""
+    resp = http_pool.post(f"{_assets_endpoint()}/check", json={"hashes": hashes}, headers=headers, timeout=30)
+    if resp.status_code in (401, 404, 405, 501):
+        return None
+    resp.raise_for_status()
+    known = resp.json().get("known")
+    return set(known) if isinstance(known, list) else None
+
+
+def _asset_offset(url: str, headers: dict) -> int:
+    """Quantos bytes do asset o servidor já recebeu (header Upload-Offset do HEAD)."""
+    resp = http_pool.request("HEAD", url, headers=headers, timeout=15)
+    if resp.status_code == 404:
+        return 0
+    resp.raise_for_status()
+    return int(resp.headers.get("Upload-Offset") or 0)
+
+
+def _upload_asset(ref: dict, headers: dict) -> None:
+    """
+    Envia um asset em partes de VIDEOLM_CHUNK_MB com Content-Range. Uma parte
+    que falha é retentada a partir do offset que o servidor confirma, então
+    um link lento ou instável não recomeça o asset (nem o job) do zero.
+    """
+    url = f"{_assets_endpoint()}/{ref['hash']}"
+    size = ref["size"]
+    chunk_size = max(1, _chunk_size())
+    offset = _asset_offset(url, headers)
+    failures = 0
+    with open(ref["path"], "rb") as f:
+        while offset < size:
+            f.seek(offset)
+            chunk = f.read(chunk_size)
+            end = offset + len(chunk)
+            chunk_headers = {
+                **headers,
+                "Content-Type": "application/octet-stream",
+                "Content-Range": f"bytes {offset}-{end - 1}/{size}",
+                "X-Asset-Content-Type": ref["contentType"],
+            }
+            try:
+                resp = http_pool.request("PUT", url, data=chunk, headers=chunk_headers, timeout=120)
+                resp.raise_for_status()
+                offset = int(resp.headers.get("Upload-Offset") or end)
+                failures = 0
+            except requests.RequestException as e:
+                failures += 1
+                if failures > VIDEOLM_UPLOAD_RETRIES:
+                    raise
+                logger.warning(f"⚠️  Parte {offset}-{end - 1} de {ref['name']} falhou ({e}); retomando")
+                time.sleep(min(30, 2 ** failures))
+                offset = _asset_offset(url, headers)
+
+
+def _assemble_chunked(audio_path: str, image_paths: list, data: dict, headers: dict) -> Optional[requests.Response]:
+    """
+    Upload em partes: hash de cada asset, envio só dos que o VideoLM não tem
+    (retomável por asset) e um POST pequeno de assemble referenciando os hashes.
+    Retorna None se o servidor não suporta esse fluxo.
+    """
+    audio = _asset_ref(audio_path, upload_prep.content_type(audio_path))
+    images = [_asset_ref(path, "image/jpeg") for path in image_paths]
+    refs = [audio, *images]
+
+    known = _known_assets(sorted({ref["hash"] for ref in refs}), headers)
+    _CHUNKED_SUPPORT[_base_url()] = known is not None
+    if known is None:
+        logger.info("ℹ️  VideoLM sem upload em partes — usando multipart")
+        return None
+
+    pending = {ref["hash"]: ref for ref in refs if ref["hash"] not in known}
+    skipped = len(refs) - len(pending)
+    logger.info(f"📦 Upload em partes: {len(pending)} asset(s) a enviar, {skipped} já no VideoLM")
+    for ref in pending.values():
+        _upload_asset(ref, headers)
+
+    def public(ref: dict) -> dict:
+        return {key: value for key, value in ref.items() if key != "path"}
+
+    payload = {**data, "audio": public(audio), "images": [public(ref) for ref in images]}
+    resp = http_pool.post(f"{_assemble_endpoint()}/refs", json=payload, headers=headers, timeout=60)
+    fallback_endpoint = _alternate_assemble_endpoint()
+    if fallback_endpoint and resp.status_code in (401, 404, 405):
+        # Só o pedido de assemble (pequeno) é repetido; os assets já estão no servidor
+        logger.warning(f"⚠️  VideoLM retornou HTTP {resp.status_code} no assemble. Tentando {fallback_endpoint}/refs")
+        resp = http_pool.post(f"{fallback_endpoint}/refs", json=payload, headers=headers, timeout=60)
+    return resp
+
+
 def assemble_via_videolm(
     audio_path: str,
     image_paths: list,
@@ -528,13 +740,16 @@ def assemble_via_videolm(
     project_id: str,
     bg_music_id: str = "",
     output_dir: str = "output/renders",
+    render_size: str = "",
 ) -> Optional[str]:
     """
     Envia os assets gerados pelo Engine para o backend do VideoLM renderizar.
 
     Fluxo:
         1. POST multipart/form-data -> /api/video/assemble
-        2. Polling em GET /api/video/:projectId/status até status=completed
+           (ou, em jobs grandes, upload em partes por hash + POST .../assemble/refs)
+        2. Acompanha o render: stream SSE em /api/video/:projectId/events quando o
+           VideoLM oferece, senão polling adaptativo em GET /api/video/:projectId/status
         3. Baixa o .mp4 final e salva em output_dir
         4. Retorna o caminho local do arquivo, ou None em caso de falha
 
@@ -545,6 +760,36 @@ def assemble_via_videolm(
         project_id   : ID único do projeto (ex: "topic_142305")
         bg_music_id  : nome do arquivo de música em data/music/ (opcional)
         output_dir   : pasta local onde o .mp4 final será salvo
+        render_size  : resolução de render ("720x1280"); cenas maiores são reduzidas antes
+                       do upload (o manifest do VideoLM tem prioridade)
+    """
+    # Slot de rede só no upload e no download: o acompanhamento só espera
+    with SLOTS.network():
+        submitted = submit_assembly(audio_path, image_paths, script, project_id, bg_music_id, render_size)
+    if submitted is None:
+        return None
+
+    # --- Acompanhamento (stream SSE ou polling adaptativo) ---
+    headers = _headers()
+    status = _wait_for_render(project_id, headers)
+    if status is None:
+        return None
+    with SLOTS.network():
+        return _download_render(status, submitted["video_url"], project_id, output_dir, headers)
+
+
+def submit_assembly(
+    audio_path: str,
+    image_paths: list,
+    script: str,
+    project_id: str,
+    bg_music_id: str = "",
+    render_size: str = "",
+) -> Optional[dict]:
+    """
+    Só o envio de assemble_via_videolm: valida, otimiza e sobe os assets.
+    Retorna {"project_id", "video_url"} com o job aceito (sem esperar o
+    render — ver core.videolm_tracker), ou None em caso de falha.
     """
     endpoint = _assemble_endpoint()
     headers  = _headers()
@@ -557,60 +802,43 @@ def assemble_via_videolm(
         logger.error("❌ Nenhuma imagem fornecida para montagem")
         return None
 
-    # --- Monta o multipart ---
-    files = []
-    audio_handle = None
-    image_handles = []
-    try:
-        audio_handle = open(audio_path, "rb")
-        files.append(("audio", (Path(audio_path).name, audio_handle, "audio/wav")))
-
-        for img in image_paths:
-            if not os.path.exists(img):
-                logger.warning(f"⚠️  Imagem ausente, pulando: {img}")
-                continue
-            fh = open(img, "rb")
-            image_handles.append(fh)
-            files.append(("images", (Path(img).name, fh, "image/jpeg")))
+    valid_images = []
+    for img in image_paths:
+        if not os.path.exists(img):
+            logger.warning(f"⚠️  Imagem ausente, pulando: {img}")
+            continue
+        valid_images.append(img)
 
-        if not image_handles:
-            logger.error("❌ Nenhuma imagem válida encontrada")
-            return None
+    if not valid_images:
+        logger.error("❌ Nenhuma imagem válida encontrada")
+        return None
 
-        data = {
-            "script":     script or "",
-            "bgMusicId":  bg_music_id,
-            "projectId":  project_id,
-            "duration":   "0",  # VideoLM calcula pelo áudio
-        }
+    audio_path, valid_images = _optimize_upload(audio_path, valid_images, render_size)
 
-        logger.info(
-            f"📤 Enviando para VideoLM [{endpoint}]\n"
-            f"   projeto={project_id} | imagens={len(image_handles)} | áudio={Path(audio_path).name}"
-        )
+    data = {
+        "script":     script or "",
+        "bgMusicId":  bg_music_id,
+        "projectId":  project_id,
+        "duration":   "0",  # VideoLM calcula pelo áudio
+    }
 
-        resp = requests.post(endpoint, files=files, data=data, headers=headers, timeout=120)
-        fallback_endpoint = _alternate_assemble_endpoint()
-        if fallback_endpoint and resp.status_code in (401, 404, 405):
-            logger.warning(
-                f"⚠️  VideoLM retornou HTTP {resp.status_code} em {endpoint}. "
-                f"Tentando fallback {fallback_endpoint}"
-            )
-            for _, file_tuple in files:
-                file_tuple[1].seek(0)
-            resp = requests.post(
-                fallback_endpoint,
-                files=files,
-                data=data,
-                headers=headers,
-                timeout=120,
-            )
+    logger.info(
+        f"📤 Enviando para VideoLM [{endpoint}]\n"
+        f"   projeto={project_id} | imagens={len(valid_images)} | áudio={Path(audio_path).name}"
+    )
 
-    finally:
-        if audio_handle:
-            audio_handle.close()
-        for fh in image_handles:
-            fh.close()
+    resp = None
+    if _use_chunked_upload(audio_path, valid_images):
+        try:
+            resp = _assemble_chunked(audio_path, valid_images, data, headers)
+        except requests.RequestException as e:
+            logger.error(f"❌ Upload em partes para o VideoLM falhou: {e}")
+            return None
+        if resp is None and _upload_mode() == "chunked":
+            logger.error("❌ VideoLM não suporta upload em partes (VIDEOLM_UPLOAD_MODE=chunked)")
+            return None
+    if resp is None:
+        resp = _assemble_multipart(endpoint, audio_path, valid_images, data, headers)
 
     if not resp.ok:
         logger.error(
@@ -622,32 +850,164 @@ def assemble_via_videolm(
     result    = resp.json()
     video_url = result.get("videoUrl", "")
     logger.info(f"✅ Job aceito. URL futura: {video_url}")
+    return {"project_id": project_id, "video_url": video_url}
+
+
+def _status_progress(s: dict) -> tuple:
+    status = s.get("status", "UNKNOWN")
+    progress = s.get("progress")
+    stage = s.get("stage") or (s.get("render") or {}).get("stage") or ""
+    return status, progress, stage
+
 
-    # --- Polling ---
-    status_url    = _status_endpoint(project_id)
-    elapsed       = 0
+class RenderPollSchedule:
+    """
+    Intervalo entre consultas de status guiado pelo progresso reportado.
+
+    Com dois pontos de progresso estima o tempo restante e consulta na metade
+    dele: espaçado no começo de um render longo, denso perto do fim. Sem
+    progresso, o intervalo cresce aos poucos a partir do inicial; estágios
+    finais (ou progresso >= 90%) voltam ao mínimo.
+    """
+
+    FINAL_STAGES = ("encoding", "finalizing", "muxing", "uploading", "upload", "completed")
+
+    def __init__(self, initial: float, min_delay: float, max_delay: float, growth: float = 1.5):
+        self.min_delay = min_delay
+        self.max_delay = max(min_delay, max_delay)
+        self.growth = growth
+        self._delay = min(max(initial, min_delay), self.max_delay)
+        self._first: Optional[tuple] = None   # (t, progress)
+        self._last: Optional[tuple] = None
+        self._stage = ""
+
+    def observe(self, progress: Any, stage: str = "", now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        if stage != self._stage:
+            self._stage = stage
+            # Estágio novo costuma ter outro ritmo: recomeça a estimativa
+            self._first = None
+        try:
+            progress = float(progress)
+        except (TypeError, ValueError):
+            return
+        if self._first is None or progress < self._first[1]:
+            self._first = (now, progress)
+        self._last = (now, progress)
+
+    def remaining(self) -> Optional[float]:
+        """Segundos estimados até 100%, ou None sem dados suficientes."""
+        if not self._first or not self._last:
+            return None
+        (t0, p0), (t1, p1) = self._first, self._last
+        if t1 <= t0 or p1 <= p0:
+            return None
+        rate = (p1 - p0) / (t1 - t0)
+        return max(0.0, (100 - p1) / rate)
+
+    def next_delay(self) -> float:
+        if self._stage.lower() in self.FINAL_STAGES or (self._last and self._last[1] >= 90):
+            return self.min_delay
+        remaining = self.remaining()
+        if remaining is not None:
+            return min(self.max_delay, max(self.min_delay, remaining / 2))
+        delay = self._delay
+        self._delay = min(self.max_delay, self._delay * self.growth)
+        return delay
+
+
+def _poll_bounds() -> tuple:
+    min_delay = float(os.getenv("VIDEOLM_POLL_MIN_INTERVAL", str(POLL_MIN_INTERVAL)))
+    max_delay = float(os.getenv("VIDEOLM_POLL_MAX_INTERVAL", str(POLL_MAX_INTERVAL)))
+    return min(min_delay, _poll_interval()), max_delay
+
+
+def _status_stream_enabled() -> bool:
+    mode = os.getenv("VIDEOLM_STATUS_STREAM", VIDEOLM_STATUS_STREAM).lower()
+    if mode in ("1", "on", "true"):
+        return True
+    if mode != "auto" or _STATUS_STREAM_SUPPORT.get(_base_url()) is False:
+        return False
+    # auto: só quando o manifest (já em cache pela negociação de upload) anuncia o stream
+    manifest = _MANIFEST_CACHE.get(_base_url()) or {}
+    return bool(upload_prep.manifest_value(manifest, "statusStream", "status_stream"))
+
+
+def _stream_render_status(project_id: str, headers: dict, deadline: float) -> Optional[dict]:
+    """
+    Acompanha o render por GET /api/video/:id/events (SSE). Retorna o último
+    status terminal, ou None se o stream não existe ou caiu antes do fim
+    (o chamador segue com polling).
+    """
+    url = f"{_status_endpoint(project_id).rsplit('/', 1)[0]}/events"
+    idle_timeout = max(15.0, _poll_bounds()[1] * 2)
+    last = None
+    try:
+        with http_pool.get(url, headers={**headers, "Accept": "text/event-stream"}, stream=True, timeout=(10, idle_timeout)) as r:
+            if r.status_code in (404, 405, 501):
+                _STATUS_STREAM_SUPPORT[_base_url()] = False
+                return None
+            r.raise_for_status()
+            for data in http_pool.iter_sse(r):
+                if time.monotonic() >= deadline:
+                    return None
+                if data is None:
+                    continue
+                try:
+                    s = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(s, dict):
+                    continue
+                status, progress, stage = _status_progress(s)
+                if (status, progress, stage) != last:
+                    progress_label = f" | progress={progress}%" if progress is not None else ""
+                    stage_label = f" | stage={stage}" if stage else ""
+                    logger.info(f"📡 VideoLM status: {status}{progress_label}{stage_label}")
+                    last = (status, progress, stage)
+                if status in ("completed", "done", "error", "failed", "FAILED"):
+                    return s
+    except requests.RequestException as e:
+        logger.warning(f"⚠️  Stream de status do VideoLM caiu ({e}); voltando ao polling")
+    return None
+
+
+def _wait_for_render(project_id: str, headers: dict) -> Optional[dict]:
+    """
+    Espera o render terminar. Retorna o status final (completed) ou None em
+    falha/timeout. `elapsed` é tempo de relógio, incluindo as requisições.
+    """
+    status_url = _status_endpoint(project_id)
+    poll_timeout = _poll_timeout()
+    started = time.monotonic()
+    deadline = started + poll_timeout
+
+    s = None
+    if _status_stream_enabled():
+        s = _stream_render_status(project_id, headers, deadline)
+
+    min_delay, max_delay = _poll_bounds()
+    schedule = RenderPollSchedule(_poll_interval(), min_delay, max_delay)
     last_status   = ""
     last_progress = None
     last_stage    = ""
+    polls = 0
 
-    poll_interval = _poll_interval()
-    poll_timeout = _poll_timeout()
-
-    while elapsed < poll_timeout:
-        time.sleep(poll_interval)
-        elapsed += poll_interval
+    while s is None and time.monotonic() < deadline:
+        time.sleep(min(schedule.next_delay(), max(0.0, deadline - time.monotonic())))
+        elapsed = int(time.monotonic() - started)
+        polls += 1
 
         try:
-            s_resp = requests.get(status_url, headers=headers, timeout=15)
+            s_resp = http_pool.get(status_url, headers=headers, timeout=15)
             if not s_resp.ok:
                 logger.warning(f"⚠️  Status endpoint retornou {s_resp.status_code}")
                 continue
 
-            s       = s_resp.json()
-            status = s.get("status", "UNKNOWN")
-            progress = s.get("progress")
-            stage = s.get("stage") or (s.get("render") or {}).get("stage") or ""
-            
+            current = s_resp.json()
+            status, progress, stage = _status_progress(current)
+            schedule.observe(progress, stage)
+
             if status != last_status or progress != last_progress or stage != last_stage:
                 progress_label = f" | progress={progress}%" if progress is not None else ""
                 stage_label = f" | stage={stage}" if stage else ""
@@ -656,62 +1016,116 @@ def assemble_via_videolm(
                 last_progress = progress
                 last_stage = stage
 
-            if status in ("completed", "done"):
-                # Resolve URL de download
-                video_path = (
-                    s.get("videoPath")
-                    or s.get("videoUrl")
-                    or s.get("url")
-                    or video_url
-                )
-                if not video_path:
-                    logger.error(f"❌ Status completo sem URL de vídeo: {s}")
-                    return None
-                download_url = (
-                    video_path if video_path.startswith("http")
-                    else f"{_base_url()}{video_path}"
-                )
-
-                os.makedirs(output_dir, exist_ok=True)
-                out_file = os.path.join(output_dir, f"HOMES_{project_id}.mp4")
-
-                logger.info(f"⬇️  Baixando vídeo: {download_url}")
-                dl = requests.get(download_url, headers=headers, stream=True, timeout=180)
-                dl.raise_for_status()
-
-                with open(out_file, "wb") as f:
-                    for chunk in dl.iter_content(chunk_size=8192):
-                        f.write(chunk)
-
-                with open(f"{out_file}.source.json", "w", encoding="utf-8") as f:
-                    json.dump(
-                        {
-                            "project_id": project_id,
-                            "video_url": download_url,
-                            "video_path": video_path,
-                        },
-                        f,
-                        indent=2,
-                    )
-
-                size_mb = os.path.getsize(out_file) / 1_048_576
-                logger.info(f"🎬 Vídeo salvo: {out_file} ({size_mb:.1f} MB)")
-                return out_file
-
-            elif status in ("error", "failed", "FAILED"):
-                logger.error(
-                    f"❌ VideoLM reportou falha no job {project_id}\n"
-                    f"   Detalhe: {s.get('error', 'sem detalhe')}"
-                )
-                return None
+            if status in ("completed", "done", "error", "failed", "FAILED"):
+                s = current
 
         except requests.RequestException as e:
             logger.warning(f"⚠️  Erro de conexão no polling [{elapsed}s]: {e}")
 
-    logger.error(f"⏰ Timeout ({poll_timeout}s) aguardando VideoLM para {project_id}")
+    if s is None:
+        logger.error(f"⏰ Timeout ({poll_timeout}s) aguardando VideoLM para {project_id}")
+        return None
+
+    status = s.get("status", "UNKNOWN")
+    if status not in ("completed", "done"):
+        logger.error(
+            f"❌ VideoLM reportou falha no job {project_id}\n"
+            f"   Detalhe: {s.get('error', 'sem detalhe')}"
+        )
+        return None
+    logger.info(f"⏱️  Render VideoLM concluído em {time.monotonic() - started:.0f}s ({polls} consultas de status)")
+    return s
+
+
+def _status_int(s: dict, *keys: str) -> Optional[int]:
+    for key in keys:
+        try:
+            return int(s[key])
+        except (KeyError, TypeError, ValueError):
+            continue
     return None
 
 
+def _status_metadata(s: dict) -> dict:
+    """Metadados do vídeo (chaves de hub_client._video_metadata) a partir do status."""
+    render = s.get("render") if isinstance(s.get("render"), dict) else {}
+    merged = {**render, **s}
+    metadata = {"size_bytes": _status_int(merged, "size", "sizeBytes", "size_bytes", "fileSize", "videoSize")}
+    for key in ("duration", "durationSeconds", "duration_seconds"):
+        try:
+            metadata["duration_seconds"] = round(float(merged[key]), 3)
+            break
+        except (KeyError, TypeError, ValueError):
+            continue
+    size = upload_prep.parse_size(
+        merged.get("resolution") or merged.get("renderSize")
+        or ({"width": merged["width"], "height": merged["height"]} if "width" in merged and "height" in merged else None)
+    )
+    if size:
+        metadata["width"], metadata["height"] = size
+    for key in ("codec", "fps"):
+        if merged.get(key):
+            metadata[key] = merged[key]
+    return {key: value for key, value in metadata.items() if value}
+
+
+def fetch_remote_render(path: str) -> str:
+    """Cópia local de um render mantido no VideoLM (baixa na primeira chamada)."""
+    return remote_artifact.ensure_local(path, headers=_headers())
+
+
+def _download_render(s: dict, video_url: str, project_id: str, output_dir: str, headers: dict) -> Optional[str]:
+    """Baixa o .mp4 de um render concluído para output_dir."""
+    # Resolve URL de download
+    video_path = (
+        s.get("videoPath")
+        or s.get("videoUrl")
+        or s.get("url")
+        or video_url
+    )
+    if not video_path:
+        logger.error(f"❌ Status completo sem URL de vídeo: {s}")
+        return None
+    download_url = (
+        video_path if video_path.startswith("http")
+        else f"{_base_url()}{video_path}"
+    )
+
+    os.makedirs(output_dir, exist_ok=True)
+    out_file = os.path.join(output_dir, f"HOMES_{project_id}.mp4")
+    source = {
+        "project_id": project_id,
+        "video_url": download_url,
+        "video_path": video_path,
+    }
+
+    if remote_artifact.enabled():
+        # O Hub só precisa da URL pública: nada de download nem ffprobe
+        remote_artifact.write_stub(out_file, source, _status_metadata(s))
+        logger.info(f"🔗 Render mantido no VideoLM: {download_url}")
+        return out_file
+
+    logger.info(f"⬇️  Baixando vídeo: {download_url}")
+    try:
+        range_download.download(
+            download_url,
+            out_file,
+            headers=headers,
+            expected_size=_status_int(s, "size", "fileSize", "videoSize"),
+            sha256=s.get("sha256") or s.get("videoSha256"),
+        )
+    except (requests.RequestException, range_download.DownloadError) as e:
+        logger.error(f"❌ Falha ao baixar vídeo do VideoLM: {e}")
+        return None
+
+    with open(f"{out_file}.source.json", "w", encoding="utf-8") as f:
+        json.dump(source, f, indent=2)
+
+    size_mb = os.path.getsize(out_file) / 1_048_576
+    logger.info(f"🎬 Vídeo salvo: {out_file} ({size_mb:.1f} MB)")
+    return out_file
+
+
 # ---------------------------------------------------------------------------
 # Teste rápido de conectividade — rode: python -m core.videolm_client
 # ---------------------------------------------------------------------------
@@ -719,7 +1133,7 @@ if __name__ == "__main__":
     import json
     print(f"[HOMES-Engine] VideoLM Client — conectando em {_base_url()}")
     try:
-        r = requests.get(f"{_base_url()}/api/video/music", headers=_headers(), timeout=5)
+        r = http_pool.get(f"{_base_url()}/api/video/music", headers=_headers(), timeout=5)
         r.raise_for_status()
         print(f"✅ VideoLM respondeu! Músicas disponíveis: {json.dumps(r.json(), indent=2)}")
     except Exception as e:
@@ -0,0 +1,353 @@
+"""
+videolm_tracker.py — acompanha muitos jobs hospedados com uma thread só.
+
+`assemble_via_videolm` prende uma thread por projeto até o render acabar, e
+os `poll_*` de NotebookLM Studio e factory-infographic são consultas avulsas
+que o chamador precisa repetir. O tracker junta tudo:
+
+    tracker = VideoLMTracker(StateStore())
+    tracker.start()
+    submitted = submit_assembly(...)
+    tracker.track("render", submitted["project_id"], video_url=submitted["video_url"],
+                  output_dir="output/renders", on_done=callback)
+
+Uma thread agenda as consultas (cada job com seu RenderPollSchedule, então
+renders longos são consultados de longe em longe) e um pool pequeno faz as
+requisições. O estado de cada job fica no StateStore (namespace
+`videolm_jobs`): depois de reiniciar o engine, `start()` retoma os jobs que
+ainda estavam em andamento. Conclusões viram eventos no StateStore e chamam
+o callback do job e os listeners do tracker.
+
+No pipeline, `assemble_tracked` (usado por generate_video) sobe os assets e
+entrega o render ao tracker compartilhado do processo (`shared_tracker`): a
+thread do job só espera um Event, e as consultas de status de todos os jobs
+saem da thread do tracker.
+
+Configuração:
+    VIDEOLM_TRACKER_WORKERS — requisições de status simultâneas (padrão 4)
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from core import videolm_client
+from core.job_scheduler import SLOTS
+from core.runtime.state import StateStore
+
+logger = logging.getLogger(__name__)
+
+TRACKER_WORKERS = int(os.getenv("VIDEOLM_TRACKER_WORKERS", "4"))
+NAMESPACE = "videolm_jobs"
+
+DONE_STATUSES = {"completed", "done", "ready", "success", "succeeded"}
+FAILED_STATUSES = {"error", "failed", "cancelled", "canceled"}
+
+Callback = Callable[[dict], None]
+
+
+def _poll_render(record: dict) -> dict:
+    resp = videolm_client.http_pool.get(
+        videolm_client._status_endpoint(record["job_id"]), headers=videolm_client._headers(), timeout=15
+    )
+    resp.raise_for_status()
+    return resp.json()
+
+
+def _poll_studio(record: dict) -> dict:
+    return videolm_client.poll_studio_artifact(record["job_id"], artifact_type=record.get("artifact_type", ""))
+
+
+def _poll_factory(record: dict) -> dict:
+    return videolm_client.poll_factory_infographic_assets(record["job_id"])
+
+
+POLLERS: Dict[str, Callable[[dict], dict]] = {
+    "render": _poll_render,
+    "studio": _poll_studio,
+    "factory": _poll_factory,
+}
+
+
+class VideoLMTracker:
+    """Polling multiplexado de jobs VideoLM/Studio/factory com estado no StateStore."""
+
+    def __init__(self, state: Optional[StateStore] = None, workers: int = TRACKER_WORKERS):
+        self.state = state
+        self.workers = max(1, workers)
+        self._jobs: Dict[str, dict] = {}
+        self._schedules: Dict[str, videolm_client.RenderPollSchedule] = {}
+        self._callbacks: Dict[str, Callback] = {}
+        self._listeners: List[Callback] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    # --- registro -----------------------------------------------------------
+
+    def add_listener(self, callback: Callback) -> None:
+        """Chamado para todo job que termina (inclusive os retomados do StateStore)."""
+        self._listeners.append(callback)
+
+    def track(
+        self,
+        kind: str,
+        job_id: str,
+        on_done: Optional[Callback] = None,
+        artifact_type: str = "",
+        video_url: str = "",
+        output_dir: str = "",
+        timeout: Optional[float] = None,
+    ) -> dict:
+        """
+        Passa a acompanhar um job. `kind`: render | studio | factory. Renders com
+        `output_dir` são baixados (ou registrados como remotos) ao concluir.
+        """
+        if kind not in POLLERS:
+            raise ValueError(f"kind must be one of {sorted(POLLERS)}")
+        if not job_id:
+            raise ValueError("job_id is required")
+        now = time.time()
+        record = {
+            "kind": kind,
+            "job_id": job_id,
+            "artifact_type": artifact_type,
+            "video_url": video_url,
+            "output_dir": output_dir,
+            "status": "tracking",
+            "progress": None,
+            "stage": "",
+            "submitted_at": now,
+            "deadline": now + (timeout if timeout is not None else videolm_client._poll_timeout()),
+            "next_poll_at": now,
+        }
+        key = f"{kind}:{job_id}"
+        with self._lock:
+            self._add(key, record)
+            if on_done:
+                self._callbacks[key] = on_done
+        self._save(key, record)
+        self._wake.set()
+        return record
+
+    def _add(self, key: str, record: dict) -> None:
+        min_delay, max_delay = videolm_client._poll_bounds()
+        self._jobs[key] = record
+        self._schedules[key] = videolm_client.RenderPollSchedule(videolm_client._poll_interval(), min_delay, max_delay)
+
+    def wait(self, kind: str, job_id: str, timeout: Optional[float] = None, **kwargs) -> dict:
+        """
+        `track` + espera o job terminar (as consultas continuam na thread do
+        tracker). Retorna o registro final, ou {} se o tracker não concluiu a tempo.
+        """
+        finished = threading.Event()
+        final: dict = {}
+
+        def on_done(record: dict) -> None:
+            final.update(record)
+            finished.set()
+
+        self.start()
+        self.track(kind, job_id, on_done=on_done, timeout=timeout, **kwargs)
+        limit = timeout if timeout is not None else videolm_client._poll_timeout()
+        finished.wait(limit + 60)
+        return final
+
+    def pending(self) -> List[dict]:
+        with self._lock:
+            return [dict(record) for record in self._jobs.values()]
+
+    def resume(self) -> int:
+        """Recarrega do StateStore os jobs que ainda estavam em andamento."""
+        if not self.state:
+            return 0
+        resumed = 0
+        for item in self.state.list_namespace(NAMESPACE, limit=1000):
+            record = item["value"]
+            if record.get("status") in DONE_STATUSES | FAILED_STATUSES | {"timeout"}:
+                continue
+            with self._lock:
+                if item["key"] not in self._jobs:
+                    record["next_poll_at"] = time.time()
+                    self._add(item["key"], record)
+                    resumed += 1
+        if resumed:
+            logger.info(f"↩️  VideoLM tracker retomou {resumed} job(s) do StateStore")
+            self._wake.set()
+        return resumed
+
+    # --- ciclo --------------------------------------------------------------
+
+    def start(self) -> "VideoLMTracker":
+        if self._thread and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="videolm-poll")
+        self.resume()
+        self._thread = threading.Thread(target=self._run, name="videolm-tracker", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        """Para de consultar; jobs em andamento continuam no StateStore para o próximo start()."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._pool:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"🔥 Erro no ciclo do VideoLM tracker: {e}", exc_info=True)
+            with self._lock:
+                upcoming = min((record["next_poll_at"] for record in self._jobs.values()), default=None)
+            delay = 60.0 if upcoming is None else max(0.0, upcoming - time.time())
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def poll_once(self, now: Optional[float] = None) -> int:
+        """Consulta os jobs cujo horário chegou; retorna quantos foram consultados."""
+        now = time.time() if now is None else now
+        with self._lock:
+            due = [key for key, record in self._jobs.items() if record["next_poll_at"] <= now]
+        if not due:
+            return 0
+        if self._pool:
+            list(self._pool.map(self._poll, due))
+        else:
+            for key in due:
+                self._poll(key)
+        return len(due)
+
+    def _poll(self, key: str) -> None:
+        """Consulta um job; qualquer erro fica neste job, que é reconsultado mais tarde."""
+        try:
+            self._poll_job(key)
+        except Exception as e:
+            logger.error(f"🔥 Erro acompanhando {key}: {e}", exc_info=True)
+            with self._lock:
+                record = self._jobs.get(key)
+                schedule = self._schedules.get(key)
+                if record is not None:
+                    record["next_poll_at"] = time.time() + schedule.next_delay()
+
+    def _poll_job(self, key: str) -> None:
+        with self._lock:
+            record = self._jobs.get(key)
+            schedule = self._schedules.get(key)
+        if record is None:
+            return
+        try:
+            result = POLLERS[record["kind"]](record)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"⚠️  Falha consultando {key}: {e}")
+            result = None
+
+        now = time.time()
+        if result is not None:
+            status, progress, stage = videolm_client._status_progress(result)
+            schedule.observe(progress, stage)
+            if (status, progress, stage) != (record["status"], record["progress"], record["stage"]):
+                logger.info(f"📡 {key}: {status}" + (f" | progress={progress}%" if progress is not None else ""))
+            record.update(status=status, progress=progress, stage=stage)
+            if str(status).lower() in DONE_STATUSES:
+                self._finish(key, record, result)
+                return
+            if str(status).lower() in FAILED_STATUSES:
+                record["error"] = result.get("error") or result.get("message") or "sem detalhe"
+                self._finish(key, record, result)
+                return
+        if now >= record["deadline"]:
+            record.update(status="timeout", error="timeout aguardando o VideoLM")
+            self._finish(key, record, result or {})
+            return
+        record["next_poll_at"] = now + schedule.next_delay()
+        self._save(key, record)
+
+    def _finish(self, key: str, record: dict, result: dict) -> None:
+        record["result"] = result
+        if record["kind"] == "render" and record.get("output_dir") and str(record["status"]).lower() in DONE_STATUSES:
+            with SLOTS.network():
+                record["output_path"] = videolm_client._download_render(
+                    result, record.get("video_url", ""), record["job_id"], record["output_dir"], videolm_client._headers()
+                )
+            if not record["output_path"]:
+                if time.time() < record["deadline"]:
+                    # Download falhou: o job continua e o próximo poll tenta de novo
+                    logger.warning(f"⚠️  Download de {key} falhou; nova tentativa no próximo poll")
+                    with self._lock:
+                        schedule = self._schedules.get(key)
+                    record["next_poll_at"] = time.time() + (schedule.next_delay() if schedule else videolm_client._poll_interval())
+                    self._save(key, record)
+                    return
+                record.update(status="failed", error="download do render falhou")
+        record["finished_at"] = time.time()
+        with self._lock:
+            self._jobs.pop(key, None)
+            self._schedules.pop(key, None)
+            callback = self._callbacks.pop(key, None)
+        self._save(key, record)
+        if self.state:
+            outcome = "completed" if str(record["status"]).lower() in DONE_STATUSES else "failed"
+            self.state.append_event(f"videolm.job.{outcome}", {"key": key, "status": record["status"],
+                                                               "output_path": record.get("output_path")})
+        for fn in ([callback] if callback else []) + self._listeners:
+            try:
+                fn(dict(record))
+            except Exception as e:
+                logger.error(f"❌ Callback de {key} falhou: {e}")
+
+    def _save(self, key: str, record: dict) -> None:
+        if self.state:
+            self.state.set(NAMESPACE, key, record)
+
+
+_shared: Optional[VideoLMTracker] = None
+_shared_lock = threading.Lock()
+
+
+def shared_tracker() -> VideoLMTracker:
+    """Tracker do processo (criado e iniciado no primeiro uso), com estado no StateStore padrão."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = VideoLMTracker(StateStore()).start()
+        return _shared
+
+
+def assemble_tracked(
+    audio_path: str,
+    image_paths: list,
+    script: str,
+    project_id: str,
+    bg_music_id: str = "",
+    output_dir: str = "output/renders",
+    render_size: str = "",
+    tracker: Optional[VideoLMTracker] = None,
+) -> Optional[str]:
+    """
+    Mesmo contrato de videolm_client.assemble_via_videolm, mas o acompanhamento
+    e o download ficam com o tracker compartilhado. Slot de rede só no upload.
+    """
+    with SLOTS.network():
+        submitted = videolm_client.submit_assembly(audio_path, image_paths, script, project_id, bg_music_id, render_size)
+    if submitted is None:
+        return None
+    record = (tracker or shared_tracker()).wait(
+        "render", submitted["project_id"], video_url=submitted["video_url"], output_dir=output_dir,
+    )
+    if str(record.get("status", "")).lower() not in DONE_STATUSES:
+        logger.error(f"❌ VideoLM não concluiu {project_id}: {record.get('error', 'timeout aguardando o tracker')}")
+        return None
+    return record.get("output_path")
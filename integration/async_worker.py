@@ -0,0 +1,217 @@
+"""
+async_worker.py — loop asyncio do HOMES-Engine worker
+
+Diferente de integration.worker (serial), aqui telemetria, comandos remotos
+e jobs rodam como tarefas independentes no mesmo event loop:
+
+  - heartbeat de telemetria a cada WORKER_TELEMETRY_INTERVAL
+  - poll de comandos a cada WORKER_COMMAND_INTERVAL, mesmo durante renders
+  - renovação dos leases de jobs reservados no Hub (a cada ~HUB_LEASE_TTL/3)
+  - jobs do Hub / fila local renderizados num process pool (até N em paralelo,
+    ver core.job_scheduler.plan_slots), com progresso reportado a cada
+    WORKER_PROGRESS_INTERVAL enquanto o render roda
+
+Uso:
+  python -m integration.async_worker
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import multiprocessing
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Awaitable, Callable, Optional, Set
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import async_hub_client as hub
+from core.job_acquisition import JobAcquirer, default_acquirer, job_succeeded
+from core.job_scheduler import configure_slots, plan_slots, shared_slot_semaphores
+from integration import worker
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL         = worker.POLL_INTERVAL
+COMMAND_POLL_INTERVAL = int(os.getenv("WORKER_COMMAND_INTERVAL", "5"))    # segundos
+TELEMETRY_INTERVAL    = worker.TELEMETRY_INTERVAL
+PROGRESS_INTERVAL     = int(os.getenv("WORKER_PROGRESS_INTERVAL", "30"))   # segundos
+
+
+async def _every(name: str, interval: float, step: Callable[[], Awaitable], stop: asyncio.Event):
+    """Roda `step` a cada `interval` segundos até `stop`; erros não derrubam o loop."""
+    while not stop.is_set():
+        try:
+            await step()
+        except Exception as e:
+            logger.error(f"🔥 Erro em {name}: {e}", exc_info=True)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def _commands_step():
+    for cmd in await hub.poll_commands():
+        await hub.execute_command(cmd)
+
+
+async def _render(executor: Executor, job_id: str, *render_args) -> Optional[str]:
+    """Render no executor; enquanto roda, reporta progresso ao Hub (heartbeat do job)."""
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, worker.render_job, *render_args)
+    started = time.monotonic()
+    beats = 0
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=PROGRESS_INTERVAL)
+        if done:
+            return future.result()
+        beats += 1
+        elapsed = int(time.monotonic() - started)
+        await hub.report_job_status(
+            job_id, "processing", progress=min(90, 20 + 5 * beats),
+            stage="rendering", message=f"Rendering video ({elapsed}s)",
+        )
+
+
+async def process_hub_job(job: dict, executor: Executor) -> bool:
+    """Versão assíncrona de worker.process_hub_job: o render roda fora do event loop."""
+    prepared = worker.prepare_hub_job(job)
+    job_id = prepared["job_id"]
+
+    logger.info(f"🎬 Processando job #{job_id}: {prepared['topic'][:60]}")
+
+    await hub.report_job_status(job_id, "processing", progress=5, stage="received", message="Engine accepted job")
+
+    try:
+        await hub.report_job_status(job_id, "processing", progress=20, stage="rendering", message="Rendering video")
+        output_path = await _render(
+            executor, job_id,
+            prepared["script_path"], prepared["theme"], prepared["brand"], prepared["encode_profile"],
+        )
+        if not output_path:
+            raise RuntimeError("generate_video retornou None")
+        await hub.report_job_status(job_id, "processing", progress=95, stage="reporting", message="Render complete")
+        await hub.report_job_done(job_id, output_path)
+        logger.info(f"✅ Job #{job_id} concluído → {output_path}")
+        return True
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"❌ Job #{job_id} falhou: {error_msg}")
+        await hub.report_job_error(job_id, error_msg)
+        return False
+
+
+async def _jobs_step(executor: Executor, active: Set[asyncio.Future], max_jobs: int, acquirer: JobAcquirer, wake: asyncio.Event) -> int:
+    """Preenche as vagas livres com jobs do Hub e da fila local, sem esperar os renders."""
+    dispatched = 0
+    while len(active) < max_jobs:
+        job = await asyncio.to_thread(acquirer.acquire)
+        if not job:
+            break
+        acquirer.got_job()
+        task = _track(active, process_hub_job(job, executor), wake)
+        task.add_done_callback(partial(acquirer.job_finished, job=job))
+        dispatched += 1
+
+    loop = asyncio.get_running_loop()
+    while len(active) < max_jobs:
+        running_path = worker.claim_local_script()
+        if not running_path:
+            break
+        _track(active, loop.run_in_executor(executor, worker.process_local_script, running_path), wake)
+        dispatched += 1
+    return dispatched
+
+
+def _track(active: Set[asyncio.Future], awaitable, wake: asyncio.Event) -> asyncio.Future:
+    task = asyncio.ensure_future(awaitable)
+    active.add(task)
+    task.add_done_callback(active.discard)
+    # Job concluído com sucesso: busca o próximo na hora (falha espera o intervalo normal)
+    task.add_done_callback(lambda done: wake.set() if job_succeeded(done) else None)
+    return task
+
+
+async def _jobs_loop(executor: Executor, active: Set[asyncio.Future], max_jobs: int, acquirer: JobAcquirer, stop: asyncio.Event):
+    wake = asyncio.Event()
+    stop_task = asyncio.ensure_future(stop.wait())
+    try:
+        while not stop.is_set():
+            delay = POLL_INTERVAL
+            try:
+                await _jobs_step(executor, active, max_jobs, acquirer, wake)
+                if len(active) < max_jobs:
+                    delay = acquirer.idle_delay()
+            except Exception as e:
+                logger.error(f"🔥 Erro em jobs: {e}", exc_info=True)
+            wake_task = asyncio.ensure_future(wake.wait())
+            await asyncio.wait({wake_task, stop_task}, timeout=delay, return_when=asyncio.FIRST_COMPLETED)
+            wake_task.cancel()
+            wake.clear()
+            if wake_task.done() and not wake_task.cancelled():
+                acquirer.backoff.reset()
+    finally:
+        stop_task.cancel()
+
+
+async def run_async_worker(
+    executor: Optional[Executor] = None,
+    stop: Optional[asyncio.Event] = None,
+    max_jobs: Optional[int] = None,
+    acquirer: Optional[JobAcquirer] = None,
+):
+    stop = stop or asyncio.Event()
+    plan = plan_slots()
+    max_jobs = max_jobs or plan.jobs
+    acquirer = acquirer or default_acquirer(max_jobs)
+    own_executor = executor is None
+    manager = None
+    if own_executor:
+        # spawn: o processo filho não herda threads do event loop.
+        # Os slots de rede/ffmpeg são semáforos de um Manager, compartilhados
+        # por todos os processos (o limite do plano vale para o pool inteiro).
+        context = multiprocessing.get_context("spawn")
+        manager = context.Manager()
+        executor = ProcessPoolExecutor(
+            max_workers=max_jobs,
+            mp_context=context,
+            initializer=configure_slots,
+            initargs=(plan.network, plan.cpu, shared_slot_semaphores(manager, plan)),
+        )
+
+    logger.info(f"🟢 HOMES-Engine Worker (async) iniciado")
+    logger.info(f"⏱️  Jobs: {acquirer.mode} | Comandos: {COMMAND_POLL_INTERVAL}s | Telemetria: {TELEMETRY_INTERVAL}s")
+    logger.info(f"🧮 Slots: {max_jobs} jobs | {plan.network} rede | {plan.cpu} ffmpeg")
+    if not await hub.hub_is_alive():
+        logger.warning("⚠️  Hub não responde — worker continua em modo offline (queue local)")
+
+    active: Set[asyncio.Future] = set()
+    try:
+        await asyncio.gather(
+            _every("telemetria", TELEMETRY_INTERVAL, hub.push_telemetry, stop),
+            _every("comandos", COMMAND_POLL_INTERVAL, _commands_step, stop),
+            _every("leases", POLL_INTERVAL, lambda: asyncio.to_thread(acquirer.renew_leases), stop),
+            _jobs_loop(executor, active, max_jobs, acquirer, stop),
+        )
+        # Jobs reservados que não começaram voltam para o Hub; os em andamento terminam
+        await asyncio.to_thread(acquirer.close)
+        if active:
+            await asyncio.gather(*active, return_exceptions=True)
+    finally:
+        if own_executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+            manager.shutdown()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [WORKER] %(levelname)s — %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    try:
+        asyncio.run(run_async_worker())
+    except KeyboardInterrupt:
+        logger.info("🛑 Worker encerrado pelo usuário")
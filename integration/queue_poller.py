@@ -7,6 +7,8 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core import hub_client
+from core import remote_artifact
+from core.job_acquisition import JobAcquirer
 from core.video_maker import generate_video
 from config import SCRIPTS_DIR
 
@@ -46,7 +48,7 @@ def process_job(job: dict):
         logger.info(f"🎬 Iniciando Renderização Local (Marca: {theme})...")
         video_path = generate_video(script_path, brand_name=theme)
         
-        if video_path and os.path.exists(video_path):
+        if video_path and remote_artifact.exists(video_path):
             logger.info(f"✅ Render concluído: {video_path}")
             # 3. Reportar ao Hub com Assinatura HMAC (automático via hub_client)
             hub_client.report_job_status(job_id, "processing", progress=95, stage="reporting", message="Render complete")
@@ -70,11 +72,14 @@ def main_loop():
         logger.warning("⚠️  Hub parece offline. Verifique a URL do Cloudflare.")
 
     last_telemetry = 0
-    
+    # Long-poll/SSE limitado a POLL_INTERVAL para não atrasar comandos remotos
+    acquirer = JobAcquirer(wait=POLL_INTERVAL)
+
     while True:
-        # A. Polling de Jobs (Passo 1 do Guia)
-        job = hub_client.fetch_pending_job()
+        # A. Aquisição de Jobs (Passo 1 do Guia)
+        job = acquirer.acquire()
         if job:
+            acquirer.got_job()
             process_job(job)
         
         # B. Telemetria de Saúde (A cada 30 segundos ou quando ocioso)
@@ -87,7 +92,9 @@ def main_loop():
         for cmd in commands:
             hub_client.execute_command(cmd)
 
-        time.sleep(POLL_INTERVAL)
+        # Depois de um job busca o próximo na hora; ocioso, backoff adaptativo
+        if not job:
+            acquirer.sleep(min(POLL_INTERVAL, acquirer.idle_delay()))
 
 if __name__ == "__main__":
     try:
@@ -3,7 +3,7 @@ worker.py — HOMES-Engine main worker loop
 
 Responsabilidades:
   1. Poll HOMES Hub por jobs de vídeo pendentes
-  2. Processar com video_maker → VideoLM
+  2. Processar com video_maker → VideoLM (vários jobs em paralelo, ver core.job_scheduler)
   3. Reportar status de volta ao Hub
   4. Poll de comandos remotos (generate_video, run_module, speak…)
   5. Push de telemetria a cada ciclo
@@ -11,12 +11,15 @@ Responsabilidades:
 Uso:
   python -m integration.worker          # loop infinito
   python integration/worker.py          # idem
+  python -m integration.async_worker    # loop asyncio (render em process pool)
 """
 import os
 import sys
 import time
 import logging
 import json
+from functools import partial
+from typing import Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -30,7 +33,9 @@ from core.hub_client import (
     execute_command,
     hub_is_alive,
 )
-from core.video_maker import generate_video
+from core.video_maker import generate_video, local_render
+from core.job_scheduler import JobScheduler, configure_slots, plan_slots
+from core.job_acquisition import JobAcquirer, default_acquirer
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,6 +45,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 POLL_INTERVAL   = int(os.getenv("WORKER_POLL_INTERVAL", "10"))  # segundos
+TELEMETRY_INTERVAL = int(os.getenv("WORKER_TELEMETRY_INTERVAL", "60"))  # segundos
 SCRIPTS_DIR     = os.path.join(os.path.dirname(__file__), "..", "queue")
 
 
@@ -57,10 +63,11 @@ def submit_video_job(topic: str):
     return script_path
 
 
-def process_hub_job(job: dict) -> bool:
+def prepare_hub_job(job: dict) -> dict:
     """
-    Processa um job vindo do HOMES Hub.
+    Normaliza um job do Hub e grava o roteiro em queue/job_<id>.txt.
     job = { id, topic, script, theme, status }
+    Retorna {job_id, topic, script_path, theme, brand, encode_profile}.
     """
     job_id = job.get("id", "unknown")
     params = _job_params(job)
@@ -68,10 +75,7 @@ def process_hub_job(job: dict) -> bool:
     script = job.get("script", "")
     theme  = _job_text(job, params, "theme", "style", default="yellow_punch")
     brand  = job.get("brand") or theme or "demo"
-
-    logger.info(f"🎬 Processando job #{job_id}: {topic[:60]}")
-
-    report_job_status(job_id, "processing", progress=5, stage="received", message="Engine accepted job")
+    encode_profile = _job_text(job, params, "encode_profile", "quality")
 
     # Salva script em arquivo para video_maker
     os.makedirs(SCRIPTS_DIR, exist_ok=True)
@@ -82,9 +86,39 @@ def process_hub_job(job: dict) -> bool:
     with open(script_path, "w", encoding="utf-8") as f:
         f.write(content)
 
+    return {
+        "job_id": job_id,
+        "topic": topic,
+        "script_path": script_path,
+        "theme": theme,
+        "brand": brand,
+        "encode_profile": encode_profile,
+    }
+
+
+def render_job(script_path: str, theme: str, brand: str, encode_profile: str = "") -> Optional[str]:
+    """Render de um job (também usado como alvo do process pool do worker assíncrono)."""
+    render_kwargs = {"encode_profile": encode_profile} if encode_profile else {}
+    return generate_video(script_path, theme_name=theme, brand_name=brand, **render_kwargs)
+
+
+def process_hub_job(job: dict) -> bool:
+    """
+    Processa um job vindo do HOMES Hub.
+    job = { id, topic, script, theme, status }
+    """
+    prepared = prepare_hub_job(job)
+    job_id = prepared["job_id"]
+
+    logger.info(f"🎬 Processando job #{job_id}: {prepared['topic'][:60]}")
+
+    report_job_status(job_id, "processing", progress=5, stage="received", message="Engine accepted job")
+
     try:
         report_job_status(job_id, "processing", progress=20, stage="rendering", message="Rendering video")
-        output_path = generate_video(script_path, theme_name=theme, brand_name=brand)
+        output_path = render_job(
+            prepared["script_path"], prepared["theme"], prepared["brand"], prepared["encode_profile"]
+        )
         if output_path:
             report_job_status(job_id, "processing", progress=95, stage="reporting", message="Render complete")
             report_job_done(job_id, output_path)
@@ -99,6 +133,60 @@ def process_hub_job(job: dict) -> bool:
         return False
 
 
+def _retry_due(path: str) -> bool:
+    """Roteiro que falhou (.failed) volta à fila POLL_INTERVAL segundos depois da falha."""
+    try:
+        return time.time() - os.path.getmtime(path) >= POLL_INTERVAL
+    except OSError:
+        return False
+
+
+def next_local_script() -> Optional[str]:
+    """Próximo .txt (ou .failed já vencido) da fila local (queue/), ignorando roteiros de jobs do Hub."""
+    if not os.path.exists(SCRIPTS_DIR):
+        return None
+    local_scripts = sorted(
+        f for f in os.listdir(SCRIPTS_DIR)
+        if not f.startswith("job_") and (
+            f.endswith(".txt") or (f.endswith(".failed") and _retry_due(os.path.join(SCRIPTS_DIR, f)))
+        )
+    )
+    return os.path.join(SCRIPTS_DIR, local_scripts[0]) if local_scripts else None
+
+
+def claim_local_script() -> Optional[str]:
+    """Reserva o próximo roteiro local (.txt/.failed → .running) para nenhum outro slot pegá-lo."""
+    script_path = next_local_script()
+    if not script_path:
+        return None
+    running_path = os.path.splitext(script_path)[0] + ".running"
+    try:
+        os.rename(script_path, running_path)
+    except FileNotFoundError:
+        return None
+    return running_path
+
+
+def process_local_script(running_path: str) -> bool:
+    """
+    Renderiza um roteiro reservado; sucesso vira .done, falha vira .failed
+    (nova tentativa depois de POLL_INTERVAL, sem girar o loop em cima dele).
+    """
+    fname = os.path.basename(running_path)
+    logger.info(f"📥 Fila local: {fname}")
+    base_path = running_path[: -len(".running")]
+    output = local_render(generate_video(running_path))
+    if output:
+        # Marca como processado renomeando
+        os.rename(running_path, base_path + ".done")
+        logger.info(f"✅ {fname} → {output}")
+        return True
+    failed_path = base_path + ".failed"
+    os.rename(running_path, failed_path)
+    os.utime(failed_path)  # o prazo da nova tentativa conta a partir da falha
+    return False
+
+
 def _job_params(job: dict) -> dict:
     params = job.get("params") or {}
     if isinstance(params, str):
@@ -155,46 +243,45 @@ def _script_from_job(topic: str, params: dict, theme: str = "") -> str:
 
 
 def run_worker():
+    plan = plan_slots()
+    configure_slots(plan.network, plan.cpu)
+    scheduler = JobScheduler(plan.jobs)
+    # Long-poll limitado ao intervalo antigo: comandos remotos continuam com a mesma latência.
+    # Com leases, reserva até um lote por slot de uma vez.
+    acquirer = default_acquirer(plan.jobs, wait=POLL_INTERVAL)
+
     logger.info(f"🟢 HOMES-Engine Worker iniciado")
     logger.info(f"🔌 Hub: {os.getenv('HOMES_HUB_URL', 'http://localhost:8080')}")
-    logger.info(f"⏱️  Poll interval: {POLL_INTERVAL}s")
+    logger.info(f"⏱️  Poll interval: {POLL_INTERVAL}s | Aquisição: {acquirer.mode}")
+    logger.info(f"🧮 Slots: {plan.jobs} jobs | {plan.network} rede | {plan.cpu} ffmpeg")
 
     # Avisa se o Hub não responde (não para o worker)
     if not hub_is_alive():
         logger.warning("⚠️  Hub não responde — worker continua em modo offline (queue local)")
 
     cycle = 0
+    last_telemetry = time.monotonic()
     while True:
         cycle += 1
+        delay = POLL_INTERVAL
         try:
-            # 1. Telemetria a cada 6 ciclos (~1 min)
-            if cycle % 6 == 0:
+            # 1. Telemetria a cada ~1 min
+            if time.monotonic() - last_telemetry >= TELEMETRY_INTERVAL:
                 push_telemetry()
+                last_telemetry = time.monotonic()
+
+            # 1b. Heartbeat dos leases (renova jobs reservados a cada ~TTL/3)
+            acquirer.renew_leases()
 
             # 2. Comandos remotos
             for cmd in poll_commands():
                 execute_command(cmd)
 
-            # 3. Job de vídeo pendente no Hub
-            job = fetch_pending_job()
-            if job:
-                process_hub_job(job)
-
-            # 4. Fila local (arquivos .txt em queue/)
-            local_scripts = sorted(
-                f for f in os.listdir(SCRIPTS_DIR)
-                if f.endswith(".txt") and not f.startswith("job_")
-            ) if os.path.exists(SCRIPTS_DIR) else []
-
-            for fname in local_scripts[:1]:  # 1 por ciclo
-                fpath = os.path.join(SCRIPTS_DIR, fname)
-                logger.info(f"📥 Fila local: {fname}")
-                output = generate_video(fpath)
-                if output:
-                    # Marca como processado renomeando
-                    done_path = fpath.replace(".txt", ".done")
-                    os.rename(fpath, done_path)
-                    logger.info(f"✅ {fname} → {output}")
+            # 3-4. Jobs do Hub, depois fila local (arquivos .txt em queue/), até lotar os slots.
+            # Sem vaga, espera um job terminar; sem job, backoff adaptativo.
+            dispatch_jobs(scheduler, acquirer)
+            if scheduler.free_slots() > 0:
+                delay = min(POLL_INTERVAL, acquirer.idle_delay())
 
         except KeyboardInterrupt:
             logger.info("🛑 Worker encerrado pelo usuário")
@@ -202,7 +289,41 @@ def run_worker():
         except Exception as e:
             logger.error(f"🔥 Erro no ciclo {cycle}: {e}", exc_info=True)
 
-        time.sleep(POLL_INTERVAL)
+        try:
+            acquirer.sleep(delay)
+        except KeyboardInterrupt:
+            logger.info("🛑 Worker encerrado pelo usuário")
+            break
+
+    # Jobs reservados que não começaram voltam para o Hub; os em andamento terminam
+    acquirer.close()
+    scheduler.shutdown(wait=True)
+
+
+def dispatch_jobs(scheduler: JobScheduler, acquirer: Optional[JobAcquirer] = None) -> int:
+    """Preenche os slots livres com jobs do Hub e da fila local. Retorna quantos agendou."""
+    dispatched = 0
+    while scheduler.free_slots() > 0:
+        job = acquirer.acquire() if acquirer else fetch_pending_job()
+        if not job:
+            break
+        _submit(scheduler, acquirer, process_hub_job, job, job=job)
+        dispatched += 1
+    while scheduler.free_slots() > 0:
+        running_path = claim_local_script()
+        if not running_path:
+            break
+        _submit(scheduler, acquirer, process_local_script, running_path)
+        dispatched += 1
+    return dispatched
+
+
+def _submit(scheduler: JobScheduler, acquirer: Optional[JobAcquirer], fn, arg, job: Optional[dict] = None) -> None:
+    future = scheduler.submit(fn, arg)
+    if future is not None and acquirer is not None:
+        acquirer.got_job()
+        # Job concluído libera o lease; se deu certo, acorda o loop para buscar o próximo na hora
+        future.add_done_callback(partial(acquirer.job_finished, job=job))
 
 
 if __name__ == "__main__":
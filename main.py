@@ -1,5 +1,5 @@
 import os, subprocess, sys, time, json, argparse
-from core.video_maker import generate_video
+from core.video_maker import generate_video, local_render
 from core.ai_writer import generate_script_from_topic
 from config import validate_config
 from core.error_handler import get_logger, ErrorContext
@@ -124,11 +124,12 @@ def print_manifest_summary():
         print(f"{RED}Falha lendo manifest:{RESET} {e}")
         return False
 
-def render_script(script_path, brand):
+def render_script(script_path, brand, encode_profile=""):
     if not script_path:
         return None
     print(f"\n{CYAN}🎨 Iniciando render pelo Engine...{RESET}")
-    output = generate_video(script_path, brand_name=brand)
+    render_kwargs = {"encode_profile": encode_profile} if encode_profile else {}
+    output = local_render(generate_video(script_path, brand_name=brand, **render_kwargs))
     if output:
         print(f"{GREEN}Render concluído:{RESET} {output}")
     else:
@@ -328,6 +329,7 @@ if __name__ == "__main__":
     parser.add_argument("--demo-url", action="store_true", help="Mostra a URL da demo web")
     parser.add_argument("--render", help="Renderiza um script .txt diretamente")
     parser.add_argument("--demo", action="store_true", help="Renderiza o roteiro demo local pelo Engine")
+    parser.add_argument("--encode-profile", default="", choices=["", "auto", "draft", "preview", "final", "archive"], help="Perfil de encode do render local")
     parser.add_argument("--notebooklm-submit", action="store_true", help="Submete um video NotebookLM hosted")
     parser.add_argument("--notebooklm-poll", help="Consulta um projectId NotebookLM hosted")
     parser.add_argument("--project-id", default="", help="Project ID para NotebookLM")
@@ -377,9 +379,9 @@ if __name__ == "__main__":
     elif args.demo_url:
         print_hosted_demo()
     elif args.render:
-        sys.exit(0 if render_script(args.render, args.brand) else 1)
+        sys.exit(0 if render_script(args.render, args.brand, args.encode_profile) else 1)
     elif args.demo:
-        sys.exit(0 if render_script(DEFAULT_DEMO_SCRIPT, args.brand) else 1)
+        sys.exit(0 if render_script(DEFAULT_DEMO_SCRIPT, args.brand, args.encode_profile) else 1)
     elif args.notebooklm_submit:
         try:
             submit_notebooklm_from_cli(
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+🔍 Benchmark das legendas ASS: writer em stream (core.subtitle_utils) contra a
+implementação anterior (lista de Dialogue em memória + timedelta por timestamp).
+
+Uso: python scripts/benchmark_subtitles.py [palavras] [repetições]
+Confere que os dois arquivos saem byte a byte iguais antes de medir.
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.subtitle_utils import generate_ass_from_text
+
+
+# --- Implementação anterior (referência) ------------------------------------
+
+def legacy_format_ass_timestamp(seconds: float) -> str:
+    td = timedelta(seconds=max(0, seconds))
+    total_seconds = int(td.total_seconds())
+    hours = total_seconds // 3600
+    minutes = (total_seconds % 3600) // 60
+    secs = total_seconds % 60
+    centis = int(td.microseconds / 10000)
+    return f"{hours}:{minutes:02d}:{secs:02d}.{centis:02d}"
+
+
+def legacy_generate_ass_from_text(text, total_duration, output_path, brand_colors=None, font_name="Montserrat-ExtraBold", font_size=24, start_offset=0.0):
+    words = text.replace('\n', ' ').split()
+    if not words: return False
+    primary, highlight, outline, back = "&H00FFFFFF", "&H0000FFFF", "&H00000000", "&H64000000"
+    if brand_colors:
+        if "primary" in brand_colors: primary = brand_colors["primary"]
+        if "highlight" in brand_colors: highlight = brand_colors["highlight"]
+    header = [
+        "[Script Info]", "ScriptType: v4.00+", "PlayResX: 720", "PlayResY: 1280", "ScaledBorderAndShadow: yes", "",
+        "[V4+ Styles]",
+        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding",
+        f"Style: Default,{font_name},{font_size},{primary},{highlight},{outline},{back},1,0,0,0,100,100,0,0,1,3,4,5,30,30,120,1", ""
+    ]
+    max_words_per_screen = 3
+    chunks = [words[i:i + max_words_per_screen] for i in range(0, len(words), max_words_per_screen)]
+    total_chars = sum(len(w) for w in words)
+    effective_duration = max(0.1, total_duration - start_offset)
+    time_per_char = effective_duration / total_chars
+    lines = ["[Events]", "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"]
+    current_time = start_offset
+    for chunk in chunks:
+        chunk_duration = sum(len(w) for w in chunk) * time_per_char
+        chunk_start = current_time
+        word_start_offset = 0.0
+        for i, target_word in enumerate(chunk):
+            word_duration = len(target_word) * time_per_char
+            event_start = legacy_format_ass_timestamp(chunk_start + word_start_offset)
+            event_end = legacy_format_ass_timestamp(chunk_start + word_start_offset + word_duration)
+            styled_parts = []
+            for j, w in enumerate(chunk):
+                if i == j:
+                    styled_parts.append(f"{{\\c{highlight}\\fscx110\\fscy110}}{w.upper()}{{\\fscx100\\fscy100\\c{primary}}}")
+                else:
+                    styled_parts.append(w.upper())
+            lines.append(f"Dialogue: 0,{event_start},{event_end},Default,,0,0,0,,{' '.join(styled_parts)}")
+            word_start_offset += word_duration
+        current_time += chunk_duration
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(header + lines))
+    return True
+
+
+# --- Medição -----------------------------------------------------------------
+
+VOCAB = (
+    "você sabia que no espaço ninguém ouve seus gritos o vácuo impede a propagação "
+    "do som incrível não é mesmo 20% das estrelas brilham — e isso muda tudo"
+).split()
+
+
+def make_script(words: int, seed: int = 42) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(VOCAB) for _ in range(words))
+
+
+def measure(fn, text, duration, path, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(text, duration, path, start_offset=1.0)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(text, duration, path, start_offset=1.0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    words = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    text = make_script(words)
+    duration = words / 2.5  # TTS_WORDS_PER_SECOND padrão
+
+    print("\033[1;33m🚀 BENCHMARK DE LEGENDAS ASS\033[0m")
+    print(f"{words} palavras | {duration / 60:.0f} min de narração | melhor de {repeats}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.ass")
+        stream_path = os.path.join(tmp, "stream.ass")
+        legacy_time, legacy_peak = measure(legacy_generate_ass_from_text, text, duration, legacy_path, repeats)
+        stream_time, stream_peak = measure(generate_ass_from_text, text, duration, stream_path, repeats)
+        with open(legacy_path, "rb") as a, open(stream_path, "rb") as b:
+            identical = a.read() == b.read()
+        size_kb = os.path.getsize(stream_path) / 1024
+
+    print(f"Arquivo: {size_kb:.0f} KB | saída idêntica: {'✅' if identical else '❌'}")
+    print(f"Anterior : {legacy_time * 1000:8.1f} ms | pico {legacy_peak / 1024:8.0f} KB")
+    print(f"Stream   : {stream_time * 1000:8.1f} ms | pico {stream_peak / 1024:8.0f} KB")
+    print(f"Ganho    : \033[1;32m{legacy_time / stream_time:.2f}x\033[0m tempo, {legacy_peak / max(1, stream_peak):.1f}x memória")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
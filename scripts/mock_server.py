@@ -1,70 +1,211 @@
 import http.server
-import socketserver
 import json
 import random
+import threading
 import time
-from urllib.parse import urlparse
+from urllib.parse import parse_qs, urlparse
 
 PORT = 3000
 
+# Fila de jobs para os endpoints de long-poll e SSE (alimentada por POST /mock/jobs
+# ou pelo produtor automático)
+JOBS = []
+JOBS_READY = threading.Condition()
+SSE_PING_INTERVAL = 15
+# Leases: job_id -> (job, engine_id, expira_em)
+LEASES = {}
+
+
+def make_job() -> dict:
+    job_id = int(time.time() * 1000)
+    return {
+        "id": str(job_id),
+        "topic": "Curiosidades sobre o Espaço",
+        "script": "Você sabia que no espaço ninguém ouve seus gritos? O vácuo impede a propagação do som. Incrível, não?",
+        "theme": "cyan_future"
+    }
+
+
+def enqueue_job(job: dict = None) -> dict:
+    job = job or make_job()
+    with JOBS_READY:
+        JOBS.append(job)
+        JOBS_READY.notify_all()
+    return job
+
+
+def take_job(timeout: float = 0):
+    """Tira o próximo job da fila, esperando até `timeout` segundos."""
+    with JOBS_READY:
+        JOBS_READY.wait_for(lambda: JOBS, timeout=timeout)
+        return JOBS.pop(0) if JOBS else None
+
+
+def _expire_leases():
+    now = time.time()
+    with JOBS_READY:
+        for job_id, (job, _engine, expires_at) in list(LEASES.items()):
+            if expires_at < now:
+                del LEASES[job_id]
+                JOBS.insert(0, job)
+                JOBS_READY.notify_all()
+
+
+def lease_jobs(engine_id: str, limit: int, ttl: float, wait: float = 0) -> list:
+    """Reserva até `limit` jobs para `engine_id`, esperando até `wait` segundos pelo primeiro."""
+    _expire_leases()
+    with JOBS_READY:
+        JOBS_READY.wait_for(lambda: JOBS, timeout=wait)
+        leased = JOBS[:limit]
+        del JOBS[:limit]
+        for job in leased:
+            LEASES[str(job["id"])] = (job, engine_id, time.time() + ttl)
+    return leased
+
+
+def renew_leases(engine_id: str, job_ids: list, ttl: float) -> list:
+    _expire_leases()
+    renewed = []
+    with JOBS_READY:
+        for job_id in map(str, job_ids):
+            lease = LEASES.get(job_id)
+            if lease and lease[1] == engine_id:
+                LEASES[job_id] = (lease[0], engine_id, time.time() + ttl)
+                renewed.append(job_id)
+    return renewed
+
+
+def release_leases(job_ids: list, requeue: bool = True):
+    with JOBS_READY:
+        for job_id in map(str, job_ids):
+            lease = LEASES.pop(job_id, None)
+            if lease and requeue:
+                JOBS.insert(0, lease[0])
+        JOBS_READY.notify_all()
+
+
 class MockBackendHandler(http.server.SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
         parsed_path = urlparse(self.path)
-        
-        # Simula endpoint de jobs pendentes
+
+        # Endpoint legado: 30% de chance de ter um job (para não spammar)
         if parsed_path.path == "/api/project/pending":
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            
-            # 30% de chance de ter um job (para não spammar)
             if random.random() < 0.3:
-                # Gera um ID único baseado no tempo
-                job_id = int(time.time())
-                job_data = {
-                    "id": str(job_id),
-                    "topic": "Curiosidades sobre o Espaço",
-                    "script": "Você sabia que no espaço ninguém ouve seus gritos? O vácuo impede a propagação do som. Incrível, não?",
-                    "theme": "cyan_future"
-                }
-                print(f"\n[SERVER] 📦 Enviando Job #{job_id} para o Worker...")
-                self.wfile.write(json.dumps(job_data).encode('utf-8'))
+                job_data = make_job()
+                print(f"\n[SERVER] 📦 Enviando Job #{job_data['id']} para o Worker...")
+                self._send_json(job_data)
             else:
-                # Sem jobs
-                self.wfile.write(json.dumps(None).encode('utf-8'))
-        else:
-            self.send_response(404)
+                self._send_json(None)
+
+        # Long-poll: segura a requisição até `wait` segundos esperando um job
+        elif parsed_path.path == "/api/projects/pending":
+            wait = float(parse_qs(parsed_path.query).get("wait", ["0"])[0])
+            job = take_job(timeout=wait)
+            if job:
+                print(f"\n[SERVER] 📦 Enviando Job #{job['id']} para o Worker...")
+            self._send_json(job, headers={"X-Homes-Long-Poll": "1"})
+
+        # Push: stream SSE, um evento por job e `: ping` quando ocioso
+        elif parsed_path.path == "/api/projects/stream":
+            self.send_response(200)
+            self.send_header('Content-type', 'text/event-stream')
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Connection', 'close')
             self.end_headers()
+            self.close_connection = True
+            try:
+                while True:
+                    job = take_job(timeout=SSE_PING_INTERVAL)
+                    if job:
+                        print(f"\n[SERVER] 📡 Job #{job['id']} enviado pelo stream")
+                        self.wfile.write(f"data: {json.dumps(job)}\n\n".encode('utf-8'))
+                    else:
+                        self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                return
+
+        else:
+            self._send_json({"error": "not found"}, status=404)
 
     def do_POST(self):
         parsed_path = urlparse(self.path)
-        
-        # Simula endpoint de conclusão
-        if parsed_path.path.endswith("/complete"):
-            content_length = int(self.headers['Content-Length'])
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
-            
-            print(f"\n[SERVER] ✅ Job #{data.get('id')} Concluído!")
-            print(f"         📁 Arquivo: {data.get('video_path')}")
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            self.wfile.write(json.dumps({"status": "success"}).encode('utf-8'))
+        content_length = int(self.headers.get('Content-Length') or 0)
+        post_data = self.rfile.read(content_length) if content_length else b""
+        try:
+            data = json.loads(post_data.decode('utf-8') or "null") or {}
+        except json.JSONDecodeError:
+            data = {}
+
+        # Leases: reserva em lote, renovação e devolução
+        if parsed_path.path == "/api/projects/lease":
+            jobs = lease_jobs(data.get("engine_id", ""), int(data.get("limit") or 1),
+                              float(data.get("ttl") or 120), float(data.get("wait") or 0))
+            if jobs:
+                print(f"\n[SERVER] 📦 {len(jobs)} job(s) reservados para {data.get('engine_id')}")
+            self._send_json({"jobs": jobs, "ttl": data.get("ttl")})
+        elif parsed_path.path == "/api/projects/lease/renew":
+            renewed = renew_leases(data.get("engine_id", ""), data.get("ids") or [], float(data.get("ttl") or 120))
+            self._send_json({"renewed": renewed})
+        elif parsed_path.path == "/api/projects/lease/release":
+            release_leases(data.get("ids") or [])
+            self._send_json({"status": "success"})
+
+        # Simula endpoint de conclusão (encerra o lease do job)
+        elif parsed_path.path.endswith("/complete"):
+            release_leases([parsed_path.path.split("/")[-2]], requeue=False)
+            print(f"\n[SERVER] ✅ Job #{data.get('id') or data.get('projectId')} Concluído!")
+            print(f"         📁 Arquivo: {data.get('video_path') or data.get('videoPath')}")
+            self._send_json({"status": "success"})
+        elif parsed_path.path.endswith("/error"):
+            release_leases([parsed_path.path.split("/")[-2]], requeue=False)
+            self._send_json({"status": "success"})
+        elif parsed_path.path.endswith("/status"):
+            self._send_json({"status": "success"})
+        # Enfileira um job para long-poll/SSE (corpo opcional)
+        elif parsed_path.path == "/mock/jobs":
+            job = enqueue_job(data if data.get("id") else None)
+            self._send_json(job, status=201)
         else:
-            self.send_response(404)
-            self.end_headers()
+            self._send_json({"error": "not found"}, status=404)
 
     def log_message(self, format, *args):
         # Silenciar logs padrão do HTTP para limpar o terminal
         return
 
-print(f"🌐 Mock Backend rodando em http://localhost:{PORT}")
-print("   (Simulando NestJS API - Pressione Ctrl+C para parar)")
 
-with socketserver.TCPServer(("", PORT), MockBackendHandler) as httpd:
-    try:
-        httpd.serve_forever()
-    except KeyboardInterrupt:
-        print("\n🛑 Server parado.")
+def make_server(port: int = PORT) -> http.server.ThreadingHTTPServer:
+    server = http.server.ThreadingHTTPServer(("", port), MockBackendHandler)
+    server.daemon_threads = True
+    return server
+
+
+def _produce_jobs(interval: float):
+    while True:
+        time.sleep(random.uniform(interval / 2, interval * 1.5))
+        enqueue_job()
+
+
+if __name__ == "__main__":
+    print(f"🌐 Mock Backend rodando em http://localhost:{PORT}")
+    print("   (Simulando NestJS API - Pressione Ctrl+C para parar)")
+    # Produtor automático: um job a cada ~30s na fila de long-poll/SSE
+    threading.Thread(target=_produce_jobs, args=(30,), daemon=True).start()
+
+    with make_server() as httpd:
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n🛑 Server parado.")
@@ -0,0 +1,62 @@
+import math
+import struct
+import wave
+
+from core import alignment
+from core.alignment import WordTiming
+from core.subtitle_utils import generate_ass_from_text
+
+
+def _write_wav(path, pattern, rate=16000):
+    """pattern: lista de (segundos, com_voz)."""
+    frames = bytearray()
+    for seconds, voiced in pattern:
+        for n in range(int(seconds * rate)):
+            value = int(8000 * math.sin(2 * math.pi * 220 * n / rate)) if voiced else 0
+            frames += struct.pack("<h", value)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(bytes(frames))
+
+
+def test_match_words_handles_punctuation_and_split_tokens():
+    tokens = [WordTiming("Custa", 0.1, 0.4), WordTiming("20", 0.5, 0.7), WordTiming("%", 0.7, 0.8), WordTiming("hoje", 1.0, 1.3)]
+
+    matched = alignment.match_words(["Custa", "20%", "—", "hoje."], tokens)
+
+    assert [(t.start, t.end) for t in matched] == [(0.1, 0.4), (0.5, 0.8), (0.8, 0.8), (1.0, 1.3)]
+    assert alignment.match_words(["outra", "frase"], tokens) is None
+
+
+def test_energy_alignment_skips_pauses_and_is_cached(tmp_path, monkeypatch):
+    monkeypatch.setattr(alignment, "ALIGN_CACHE_DIR", str(tmp_path / "cache"))
+    audio = tmp_path / "narration.wav"
+    _write_wav(audio, [(0.5, False), (1.0, True), (1.0, False), (1.0, True), (0.5, False)])
+
+    timings = alignment.align(str(audio), "ABCD EFGH")
+
+    assert [round(t.start, 2) for t in timings] == [0.5, 2.5]
+    assert [round(t.end, 2) for t in timings] == [1.5, 3.5]
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 1
+
+    monkeypatch.setattr(alignment, "energy_align", lambda *a: (_ for _ in ()).throw(AssertionError("cache miss")))
+    assert alignment.align(str(audio), "ABCD EFGH") == timings
+
+
+def test_edge_tts_boundaries_drive_ass_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(alignment, "ALIGN_CACHE_DIR", str(tmp_path / "cache"))
+    audio = tmp_path / "narration.mp3"
+    audio.write_bytes(b"mp3")
+    alignment.save_boundaries(str(audio), [
+        {"type": "WordBoundary", "offset": 5_000_000, "duration": 3_000_000, "text": "Olá"},
+        {"type": "WordBoundary", "offset": 12_000_000, "duration": 4_000_000, "text": "mundo"},
+    ])
+
+    timings = alignment.align(str(audio), "Olá, mundo!")
+    out = tmp_path / "subs.ass"
+    generate_ass_from_text("Olá, mundo!", 10.0, str(out), start_offset=1.0, word_timings=timings)
+
+    events = [line.split(",")[1:3] for line in out.read_text(encoding="utf-8").splitlines() if line.startswith("Dialogue")]
+    assert events == [["0:00:00.50", "0:00:01.20"], ["0:00:01.20", "0:00:01.60"]]
@@ -0,0 +1,79 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core import hub_client
+from core.job_acquisition import JobAcquirer
+from integration import async_worker, worker
+
+
+def _fake_hub(monkeypatch, jobs=(), commands=()):
+    calls = {"status": [], "done": [], "error": [], "polls": 0, "executed": []}
+    pending = list(jobs)
+
+    def poll_commands():
+        calls["polls"] += 1
+        return list(commands)
+
+    monkeypatch.setattr(hub_client, "fetch_pending_job", lambda wait=0: pending.pop(0) if pending else None)
+    monkeypatch.setattr(hub_client, "report_job_status", lambda job_id, status, progress=0, stage="", message="": calls["status"].append((stage, progress)))
+    monkeypatch.setattr(hub_client, "report_job_done", lambda job_id, path: calls["done"].append((job_id, path)))
+    monkeypatch.setattr(hub_client, "report_job_error", lambda job_id, error: calls["error"].append((job_id, error)))
+    monkeypatch.setattr(hub_client, "push_telemetry", lambda: True)
+    monkeypatch.setattr(hub_client, "poll_commands", poll_commands)
+    monkeypatch.setattr(hub_client, "execute_command", lambda cmd: calls["executed"].append(cmd))
+    monkeypatch.setattr(hub_client, "hub_is_alive", lambda: True)
+    return calls
+
+
+def test_process_hub_job_reports_progress_while_rendering(tmp_path, monkeypatch):
+    calls = _fake_hub(monkeypatch)
+    monkeypatch.setattr(worker, "SCRIPTS_DIR", str(tmp_path / "queue"))
+    monkeypatch.setattr(async_worker, "PROGRESS_INTERVAL", 0.01)
+
+    def slow_render(script_path, theme, brand, encode_profile=""):
+        threading.Event().wait(0.1)
+        return str(tmp_path / "HOMES_job7.mp4")
+
+    monkeypatch.setattr(worker, "render_job", slow_render)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        ok = asyncio.run(async_worker.process_hub_job({"id": "job7", "topic": "solar homes"}, executor))
+
+    assert ok
+    rendering = [progress for stage, progress in calls["status"] if stage == "rendering"]
+    assert len(rendering) >= 2 and rendering == sorted(rendering)
+    assert calls["done"] == [("job7", str(tmp_path / "HOMES_job7.mp4"))]
+
+
+def test_commands_keep_flowing_during_render(tmp_path, monkeypatch):
+    calls = _fake_hub(monkeypatch, jobs=[{"id": "job8", "topic": "batteries"}], commands=[{"command": "ping"}])
+    monkeypatch.setattr(worker, "SCRIPTS_DIR", str(tmp_path / "queue"))
+    monkeypatch.setattr(async_worker, "COMMAND_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(async_worker, "POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(async_worker, "PROGRESS_INTERVAL", 10)
+    render_may_finish = threading.Event()
+
+    def blocking_render(script_path, theme, brand, encode_profile=""):
+        # Só termina depois que comandos foram executados durante o render
+        assert render_may_finish.wait(timeout=2)
+        return str(tmp_path / "HOMES_job8.mp4")
+
+    monkeypatch.setattr(worker, "render_job", blocking_render)
+
+    async def scenario():
+        stop = asyncio.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            run = asyncio.create_task(async_worker.run_async_worker(executor, stop, acquirer=JobAcquirer(mode="poll")))
+            while len(calls["executed"]) < 3:
+                await asyncio.sleep(0.01)
+            render_may_finish.set()
+            while not calls["done"]:
+                await asyncio.sleep(0.01)
+            stop.set()
+            await run
+
+    asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert calls["done"][0][0] == "job8"
+    assert not calls["error"]
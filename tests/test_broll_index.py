@@ -0,0 +1,82 @@
+import os
+from pathlib import Path
+
+from PIL import Image
+
+from core import broll_index
+from core.broll_index import BrollIndex, candidate_timestamps
+
+
+def _fake_media(monkeypatch, extractions):
+    def fake_extract_frames(video_path, frames, size="720x1280", keyframes=None):
+        extractions.append((video_path, [ts for ts, _ in frames], keyframes))
+        for _, dest in frames:
+            Path(dest).write_bytes(b"j" * 2000)
+        return [dest for _, dest in frames]
+
+    monkeypatch.setattr(broll_index, "probe_media", lambda path: {"duration": 10.0, "width": 1920, "height": 1080})
+    monkeypatch.setattr(broll_index, "probe_keyframes", lambda path: [0.0, 2.0, 4.0, 6.0, 8.0])
+    monkeypatch.setattr(broll_index.FFmpegEngine, "extract_frames", staticmethod(fake_extract_frames))
+
+
+def _index(tmp_path, candidate_frames=3):
+    return BrollIndex(
+        broll_dir=str(tmp_path / "broll"),
+        db_path=str(tmp_path / "cache" / "broll.sqlite"),
+        frames_dir=str(tmp_path / "cache" / "frames"),
+        candidate_frames=candidate_frames,
+    )
+
+
+def test_candidate_timestamps_snap_to_keyframes():
+    assert candidate_timestamps(10.0, [0.0, 2.0, 4.0, 6.0, 8.0], 3) == [2.0, 4.0, 8.0]
+    assert candidate_timestamps(10.0, [], 1) == [5.0]
+    assert candidate_timestamps(0.0, [], 3) == []
+
+
+def test_refresh_indexes_only_new_or_changed_assets(tmp_path, monkeypatch):
+    extractions = []
+    _fake_media(monkeypatch, extractions)
+    broll = tmp_path / "broll"
+    broll.mkdir()
+    video = broll / "city.mp4"
+    video.write_bytes(b"video")
+    image = broll / "skyline.jpg"
+    Image.new("RGB", (720, 1280), "#101827").save(image)
+    (broll / "notes.txt").write_text("ignored", encoding="utf-8")
+
+    assets = _index(tmp_path).refresh()
+
+    assert [Path(asset.path).name for asset in assets] == ["city.mp4", "skyline.jpg"]
+    assert assets[0].keyframes == [0.0, 2.0, 4.0, 6.0, 8.0]
+    assert len(assets[0].candidates) == 3
+    assert assets[1].candidates == [str(image)]
+    assert len(extractions) == 1
+
+    # Nova instância (novo job): nada mudou, nada é re-extraído
+    _index(tmp_path).refresh()
+    assert len(extractions) == 1
+
+    stat = os.stat(video)
+    os.utime(video, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    image.unlink()
+    assets = _index(tmp_path).refresh()
+
+    assert len(extractions) == 2
+    assert [Path(asset.path).name for asset in assets] == ["city.mp4"]
+
+
+def test_candidate_for_follows_scene_position(tmp_path, monkeypatch):
+    _fake_media(monkeypatch, [])
+    broll = tmp_path / "broll"
+    broll.mkdir()
+    video = broll / "city.mp4"
+    video.write_bytes(b"video")
+    index = _index(tmp_path)
+    asset = index.refresh()[0]
+
+    assert index.candidate_for(str(video), 0, 10, scene_count=2) == asset.candidates[0]
+    assert index.candidate_for(str(video), 9, 10, scene_count=2) == asset.candidates[-1]
+    assert index.candidate_for(str(tmp_path / "missing.mp4"), 0, 10) is None
+    # Mais cenas neste vídeo que frames candidatos: extração por cena
+    assert index.candidate_for(str(video), 0, 10) is None
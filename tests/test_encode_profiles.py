@@ -0,0 +1,50 @@
+import pytest
+
+from core import encode_profiles
+from core.encode_profiles import auto_profile, get_profile, hosted_render_size, resolve_profile
+
+
+def test_final_profile_matches_historical_render_settings():
+    final = get_profile("final")
+
+    assert final.size == "720x1280"
+    assert final.fps == 24
+    assert final.video_args() == ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "22"]
+    assert final.audio_args() == ["-c:a", "aac", "-b:a", "128k"]
+
+
+def test_draft_profile_is_low_resolution_and_local_only():
+    draft = get_profile("draft")
+
+    assert draft.width < get_profile("preview").width < get_profile("final").width
+    assert draft.hosted is False
+
+
+def test_unknown_profile_raises():
+    with pytest.raises(KeyError):
+        get_profile("ultra")
+
+
+def test_auto_profile_uses_duration_and_cores():
+    assert auto_profile(60, cores=2).name == "final"
+    assert auto_profile(600, cores=2).name == "preview"
+    assert auto_profile(600, cores=16).name == "final"
+
+
+def test_resolve_profile_prefers_job_then_brand_then_default(monkeypatch):
+    monkeypatch.setattr(encode_profiles, "DEFAULT_PROFILE", "archive")
+
+    assert resolve_profile("draft", {"encode_profile": "preview"}).name == "draft"
+    assert resolve_profile("", {"encode_profile": "preview"}).name == "preview"
+    assert resolve_profile("", {}).name == "archive"
+    assert resolve_profile("bogus", {}, duration=30, cores=4).name == "final"
+
+
+def test_auto_is_opt_in_and_never_sizes_hosted_renders(monkeypatch):
+    monkeypatch.setattr(encode_profiles, "DEFAULT_PROFILE", "final")
+    assert resolve_profile("", {}, duration=600, cores=2).name == "final"
+
+    auto = resolve_profile("auto", {}, duration=600, cores=2)
+    assert auto.name == "preview"
+    assert hosted_render_size(auto, "auto", {}) == "720x1280"
+    assert hosted_render_size(get_profile("preview"), "preview", {}) == "540x960"
@@ -0,0 +1,231 @@
+import os
+from pathlib import Path
+
+from core import ffmpeg_engine
+from core.clip_cache import SceneClipCache
+from core.encode_profiles import get_profile
+from core.ffmpeg_engine import FFmpegEngine
+
+
+def test_split_segments_groups_contiguous_scenes():
+    segments = FFmpegEngine.split_segments(10, 4)
+
+    assert [list(segment) for segment in segments] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_assemble_video_segmented_renders_segments_then_concats(tmp_path, monkeypatch):
+    commands = []
+
+    def fake_run_command(cmd):
+        commands.append(cmd)
+        Path(cmd[-1]).write_bytes(b"mp4")
+        return True
+
+    monkeypatch.setattr(FFmpegEngine, "run_command", staticmethod(fake_run_command))
+    images = [str(tmp_path / f"scene_{i:03d}.jpg") for i in range(5)]
+    output = tmp_path / "renders" / "out.mp4"
+
+    monkeypatch.setattr(ffmpeg_engine, "default_clip_cache", lambda: None)
+
+    assert FFmpegEngine.assemble_video(
+        "narration.wav", images, "subs.ass", str(output), 10.0, segmented=True
+    )
+
+    segment_cmds = [cmd for cmd in commands if "[v_seg]" in cmd]
+    concat_cmds = [cmd for cmd in commands if "concat" in cmd and "-c" in cmd]
+    final_cmd = commands[-1]
+    assert len(segment_cmds) == 1
+    assert len(concat_cmds) == 1
+    assert final_cmd[-1] == str(output)
+    assert "narration.wav" in final_cmd
+    assert "[v_out]" in final_cmd and "[a_out]" in final_cmd
+    assert not any(p.name.startswith(".segments_") for p in output.parent.iterdir())
+
+
+def test_render_segment_keeps_global_ken_burns_modes(monkeypatch):
+    captured = {}
+
+    def fake_run_command(cmd):
+        captured["cmd"] = cmd
+        return True
+
+    monkeypatch.setattr(FFmpegEngine, "run_command", staticmethod(fake_run_command))
+    images = [f"scene_{i}.jpg" for i in range(4)]
+
+    assert FFmpegEngine.render_segment(images, range(2, 4), 2.0, get_profile("final"), "seg.mp4", threads=2)
+    filter_complex = captured["cmd"][captured["cmd"].index("-filter_complex") + 1]
+    assert filter_complex.startswith("[0:v]")
+    assert "(1-on/48)" in filter_complex  # cena 2 = pan_left
+    assert captured["cmd"][captured["cmd"].index("-threads") + 1] == "2"
+
+
+def test_auto_mode_only_segments_long_renders(monkeypatch):
+    monkeypatch.setattr(ffmpeg_engine, "RENDER_MODE", "auto")
+    monkeypatch.setattr(ffmpeg_engine.os, "cpu_count", lambda: 16)
+
+    # O clip cache (ligado por padrão) não força o modo segmentado em renders curtos
+    assert FFmpegEngine.use_segmented_render(ffmpeg_engine.SEGMENTED_MIN_SCENES)
+    assert not FFmpegEngine.use_segmented_render(3)
+
+    monkeypatch.setattr(ffmpeg_engine.os, "cpu_count", lambda: 1)
+    assert not FFmpegEngine.use_segmented_render(ffmpeg_engine.SEGMENTED_MIN_SCENES)
+
+
+def _fake_clip_render(tmp_path, monkeypatch):
+    """run_command falso: clipes de cena guardam a própria duração no conteúdo."""
+    commands = []
+
+    def fake_run_command(cmd):
+        commands.append(cmd)
+        filter_complex = cmd[cmd.index("-filter_complex") + 1] if "-filter_complex" in cmd else ""
+        if "[v_seg]" in filter_complex:
+            Path(cmd[-1]).write_text(filter_complex.split("trim=duration=")[1].split(",")[0])
+        else:
+            Path(cmd[-1]).write_bytes(b"mp4")
+        return True
+
+    def fake_duration(path):
+        try:
+            return float(Path(path).read_text())
+        except ValueError:
+            return 0.0
+
+    monkeypatch.setattr(FFmpegEngine, "run_command", staticmethod(fake_run_command))
+    monkeypatch.setattr(FFmpegEngine, "get_duration", staticmethod(fake_duration))
+    images = []
+    for i in range(3):
+        image = tmp_path / f"scene_{i}.jpg"
+        image.write_bytes(f"jpg-{i}".encode())
+        images.append(str(image))
+    return commands, images
+
+
+def _scene_renders(commands):
+    return [cmd for cmd in commands if "[v_seg]" in " ".join(cmd)]
+
+
+def test_segmented_render_reuses_cached_scene_clips(tmp_path, monkeypatch):
+    commands, images = _fake_clip_render(tmp_path, monkeypatch)
+    cache = SceneClipCache(root=str(tmp_path / "clips"))
+    output = tmp_path / "out.mp4"
+
+    assert FFmpegEngine.assemble_video_segmented("a.wav", images, "s.ass", str(output), 6.0, clip_cache=cache)
+    first_renders = _scene_renders(commands)
+    commands.clear()
+    assert FFmpegEngine.assemble_video_segmented("b.wav", images, "s.ass", str(output), 6.0, clip_cache=cache)
+
+    assert len(first_renders) == 3
+    assert "trim=duration=3.0" in " ".join(first_renders[0])
+    assert not _scene_renders(commands)
+
+
+def test_narration_length_change_keeps_cached_clips(tmp_path, monkeypatch):
+    commands, images = _fake_clip_render(tmp_path, monkeypatch)
+    cache = SceneClipCache(root=str(tmp_path / "clips"))
+    output = tmp_path / "out.mp4"
+    concat_lists = []
+    concat = FFmpegEngine.concat_segments
+
+    def spy_concat(paths, output_path, outpoint=None):
+        ok = concat(paths, output_path, outpoint)
+        concat_lists.append(Path(f"{output_path}.txt").read_text())
+        return ok
+
+    monkeypatch.setattr(FFmpegEngine, "concat_segments", staticmethod(spy_concat))
+
+    assert FFmpegEngine.assemble_video_segmented("a.wav", images, "s.ass", str(output), 6.0, clip_cache=cache)
+    commands.clear()
+
+    # Narração um pouco mais longa: cabe na folga do clipe, corta no concat
+    assert FFmpegEngine.assemble_video_segmented("b.wav", images, "s.ass", str(output), 7.5, clip_cache=cache)
+    assert not _scene_renders(commands)
+    assert concat_lists[-1].count("outpoint 2.500000") == 3
+
+    # Bem mais longa: o clipe curto é renderizado de novo e substituído
+    assert FFmpegEngine.assemble_video_segmented("c.wav", images, "s.ass", str(output), 12.0, clip_cache=cache)
+    assert len(_scene_renders(commands)) == 3
+    clips = [FFmpegEngine.cached_scene_clip(images, i, 4.0, get_profile("final"), cache) for i in range(3)]
+    assert [Path(clip).read_text() for clip in clips] == ["5.0"] * 3
+
+
+def test_single_render_uses_clip_cache_only_when_every_scene_is_cached(tmp_path, monkeypatch):
+    commands, images = _fake_clip_render(tmp_path, monkeypatch)
+    cache = SceneClipCache(root=str(tmp_path / "clips"))
+    monkeypatch.setattr(ffmpeg_engine, "default_clip_cache", lambda: cache)
+    monkeypatch.setattr(ffmpeg_engine, "RENDER_MODE", "auto")
+    output = tmp_path / "out.mp4"
+
+    assert FFmpegEngine.assemble_video("a.wav", images, "s.ass", str(output), 6.0)
+    assert len(commands) == 1 and "[v_base]" in commands[0][commands[0].index("-filter_complex") + 1]
+
+    assert FFmpegEngine.assemble_video_segmented("a.wav", images, "s.ass", str(output), 6.0, clip_cache=cache)
+    commands.clear()
+    assert FFmpegEngine.assemble_video("b.wav", images, "s.ass", str(output), 6.0)
+    assert not _scene_renders(commands)
+    assert [cmd[cmd.index("-f") + 1] for cmd in commands if "-f" in cmd] == ["concat"]
+
+
+def test_clip_cache_put_keeps_existing_entry(tmp_path):
+    cache = SceneClipCache(root=str(tmp_path / "clips"))
+    first, second = tmp_path / "first.mp4", tmp_path / "second.mp4"
+    first.write_bytes(b"first")
+    second.write_bytes(b"second")
+
+    path = cache.put("cc03", str(first))
+    # Outro worker renderizou a mesma cena: o clipe existente vale como hit
+    assert cache.put("cc03", str(second)) == path
+    assert Path(path).read_bytes() == b"first" and not second.exists()
+    assert os.listdir(os.path.dirname(path)) == [os.path.basename(path)]
+
+
+def test_clip_cache_evicts_least_recently_used(tmp_path):
+    cache = SceneClipCache(root=str(tmp_path / "clips"), max_bytes=10)
+    paths = []
+    for i, key in enumerate(["aa01", "bb02"]):
+        clip = tmp_path / f"clip{i}.mp4"
+        clip.write_bytes(b"12345678")
+        paths.append(cache.put(key, str(clip)))
+        os.utime(paths[-1], (1000 + i, 1000 + i))
+
+    cache.evict()
+
+    assert not os.path.exists(paths[0])
+    assert cache.get("bb02") == paths[1]
+
+
+def test_extract_frames_uses_one_process_per_video(tmp_path, monkeypatch):
+    commands = []
+
+    def fake_run_command(cmd):
+        commands.append(cmd)
+        for n, arg in enumerate(cmd):
+            if arg == "-frames:v":
+                Path(cmd[n + 2]).write_bytes(b"j" * 2000)
+        return True
+
+    monkeypatch.setattr(FFmpegEngine, "run_command", staticmethod(fake_run_command))
+    frames = [(1.5, str(tmp_path / "scene_001.jpg")), (7.25, str(tmp_path / "scene_006.jpg"))]
+
+    extracted = FFmpegEngine.extract_frames("broll.mp4", frames)
+
+    assert extracted == [path for _, path in frames]
+    assert len(commands) == 1
+    cmd = commands[0]
+    assert cmd.count("-i") == 1
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+    assert filter_complex.startswith("[0:v]split=2[f0][f1]")
+    assert "trim=start=1.500" in filter_complex and "trim=start=7.250" in filter_complex
+    assert "crop=720:1280" in filter_complex
+
+
+def test_extract_frames_seeks_to_keyframe_before_first_frame(monkeypatch):
+    commands = []
+    monkeypatch.setattr(FFmpegEngine, "run_command", staticmethod(lambda cmd: commands.append(cmd) or True))
+
+    FFmpegEngine.extract_frames("broll.mp4", [(9.0, "a.jpg"), (12.5, "b.jpg")], keyframes=[0.0, 4.0, 8.0, 12.0])
+
+    cmd = commands[0]
+    assert cmd[cmd.index("-ss") + 1] == "8.000"
+    assert cmd.index("-ss") < cmd.index("-i")
+    filter_complex = cmd[cmd.index("-filter_complex") + 1]
+    assert "trim=start=1.000" in filter_complex and "trim=start=4.500" in filter_complex
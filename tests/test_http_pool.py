@@ -0,0 +1,38 @@
+from core import http_pool
+
+
+def test_session_is_shared_per_host(monkeypatch):
+    monkeypatch.setattr(http_pool, "_sessions", {})
+
+    hub = http_pool.session_for("https://hub.example.com/api/projects/pending")
+    assert http_pool.session_for("https://hub.example.com/health") is hub
+    assert http_pool.session_for("https://videolm.example.com/api/engine/health") is not hub
+    assert hub.get_adapter("https://hub.example.com/").poolmanager.connection_pool_kw["maxsize"] == http_pool.HTTP_POOL_MAXSIZE
+
+    http_pool.close_all()
+    assert http_pool._sessions == {}
+
+
+def test_host_timeouts_override_caller_timeout(monkeypatch):
+    monkeypatch.setattr(
+        http_pool, "HOST_TIMEOUTS", http_pool._parse_host_timeouts("image.pollinations.ai=90, localhost:8080=2, bad")
+    )
+
+    assert http_pool.timeout_for("https://image.pollinations.ai/prompt/x", 60) == 90
+    assert http_pool.timeout_for("http://localhost:8080/health", 3) == 2
+    assert http_pool.timeout_for("http://localhost:9000/health", 3) == 3
+
+
+def test_request_uses_host_session(monkeypatch):
+    calls = []
+
+    class FakeSession:
+        def request(self, method, url, **kwargs):
+            calls.append((method, url, kwargs))
+            return "response"
+
+    monkeypatch.setattr(http_pool, "_sessions", {"https://hub.example.com": FakeSession()})
+    monkeypatch.setattr(http_pool, "HOST_TIMEOUTS", {})
+
+    assert http_pool.post("https://hub.example.com/api/x", data=b"{}", timeout=10) == "response"
+    assert calls == [("POST", "https://hub.example.com/api/x", {"data": b"{}", "timeout": 10})]
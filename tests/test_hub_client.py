@@ -1,7 +1,15 @@
 import json
 from pathlib import Path
 
-from core import hub_client
+import pytest
+
+from core import hub_client, media_probe
+
+
+@pytest.fixture(autouse=True)
+def isolated_probe_cache(monkeypatch, tmp_path):
+    # Nada de cache de ffprobe do teste em output/cache do repositório
+    monkeypatch.setattr(media_probe, "PROBE_CACHE_PATH", str(tmp_path / "media_probe.sqlite"))
 
 
 class FakeResponse:
@@ -32,7 +40,7 @@ def test_report_job_status_posts_signed(monkeypatch):
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.report_job_status("job1", "processing", progress=20, stage="rendering")
     assert calls["url"] == "https://homes.chefthi.hackclub.app/api/projects/job1/status"
@@ -48,7 +56,7 @@ def test_report_job_done_posts_complete(monkeypatch):
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.report_job_done("job1", "output.mp4")
     assert calls["url"] == "https://homes.chefthi.hackclub.app/api/projects/job1/complete"
@@ -68,7 +76,7 @@ def test_report_job_done_includes_public_video_url_from_sidecar(monkeypatch, tmp
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.report_job_done("job1", str(video_path))
     payload = json.loads(calls["data"].decode())
@@ -86,30 +94,24 @@ def test_report_job_done_includes_video_metadata(monkeypatch, tmp_path):
     video_path = tmp_path / "HOMES_job1.mp4"
     video_path.write_bytes(b"mp4-bytes")
 
-    class FakeCompletedProcess:
-        returncode = 0
-        stderr = ""
-        stdout = json.dumps(
-            {
-                "streams": [
-                    {
-                        "width": 1080,
-                        "height": 1920,
-                        "r_frame_rate": "30/1",
-                        "codec_name": "h264",
-                    }
-                ],
-                "format": {"duration": "20.123456"},
-            }
-        )
+    def fake_probe_media(path):
+        assert path == str(video_path)
+        return {
+            "size_bytes": len(b"mp4-bytes"),
+            "duration": 20.123456,
+            "width": 1080,
+            "height": 1920,
+            "fps": 30,
+            "codec": "h264",
+        }
 
     def fake_post(url, data, headers, timeout):
         calls.update({"url": url, "data": data, "headers": headers, "timeout": timeout})
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
-    monkeypatch.setattr(hub_client.subprocess, "run", lambda *args, **kwargs: FakeCompletedProcess())
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
+    monkeypatch.setattr(hub_client, "probe_media", fake_probe_media)
 
     assert hub_client.report_job_done("job1", str(video_path))
     payload = json.loads(calls["data"].decode())
@@ -129,7 +131,7 @@ def test_report_artifact_done_includes_generic_fields(monkeypatch):
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.report_artifact_done(
         "job1",
@@ -163,7 +165,7 @@ def test_push_telemetry_posts_signed(monkeypatch):
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.push_telemetry()
     assert calls["url"] == "https://homes.chefthi.hackclub.app/api/sensors"
@@ -178,7 +180,7 @@ def test_push_telemetry_includes_capability_catalog(monkeypatch):
         return FakeResponse()
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.push_telemetry()
     payload = json.loads(calls["data"].decode())
@@ -212,7 +214,7 @@ def test_push_telemetry_includes_videolm_artifact_types(monkeypatch):
         }
 
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     monkeypatch.setattr("core.videolm_client.fetch_engine_manifest", fake_manifest)
     monkeypatch.setattr(hub_client, "_VIDEOLM_ARTIFACT_TYPES_CACHE", None)
@@ -232,7 +234,7 @@ def test_push_telemetry_includes_recent_runtime_events(monkeypatch, tmp_path):
 
     monkeypatch.chdir(tmp_path)
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     from core.runtime import StateStore
 
@@ -375,8 +377,30 @@ def test_push_telemetry_includes_recent_command_results(monkeypatch):
     hub_client.COMMAND_RESULTS.clear()
     hub_client._remember_command_result("status", {"status": "completed"})
     monkeypatch.setattr(hub_client, "HUB_BASE", "https://homes.chefthi.hackclub.app")
-    monkeypatch.setattr(hub_client.requests, "post", fake_post)
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
 
     assert hub_client.push_telemetry()
     payload = json.loads(calls["data"].decode())
     assert payload["recent_command_results"][0]["command"] == "status"
+
+
+def test_post_signed_gzips_large_bodies_and_signs_plain_json(monkeypatch):
+    import gzip
+
+    calls = {}
+
+    def fake_post(url, data, headers, timeout):
+        calls.update({"data": data, "headers": headers})
+        return FakeResponse()
+
+    monkeypatch.setattr(hub_client.http_pool, "post", fake_post)
+    monkeypatch.setattr(hub_client, "HUB_GZIP_MIN_BYTES", 100)
+    payload = {"engine_id": "e1", "events": ["x" * 50] * 10}
+
+    hub_client._post_signed("/api/sensors", payload, compress=True)
+    assert calls["headers"]["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(calls["data"])) == payload
+    assert calls["headers"]["X-Homes-Signature"] == hub_client._sign(payload)
+
+    hub_client._post_signed("/api/sensors", {"small": 1}, compress=True)
+    assert "Content-Encoding" not in calls["headers"]
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from core import image_gen
@@ -18,3 +19,94 @@ def test_image_generator_creates_local_fallback(tmp_path, monkeypatch):
     assert result is not None
     assert Path(result).exists()
     assert Path(result).stat().st_size > 0
+
+
+def test_create_title_cards_renders_batch_on_shared_base(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_gen, "ASSETS_DIR", str(tmp_path))
+    image_gen._base_canvas.cache_clear()
+
+    results = ImageGenerator().create_title_cards(
+        [("first scene about solar roofs", "scene_000.jpg"), ("second scene about batteries", "scene_005.jpg")],
+        360,
+        640,
+        output_dir=str(tmp_path / "project"),
+    )
+
+    assert [Path(r).name for r in results] == ["scene_000.jpg", "scene_005.jpg"]
+    assert all(Path(r).parent == tmp_path / "project" for r in results)
+    assert image_gen._base_canvas.cache_info().misses == 1
+
+
+def test_base_canvas_gradient_matches_row_by_row_render():
+    canvas = image_gen._base_canvas(360, 640)
+
+    assert canvas.getpixel((5, 0)) == (17, 24, 39)
+    assert canvas.getpixel((5, 639)) == (35, 79, 124)
+    assert canvas.getpixel((5, 320)) == canvas.getpixel((300, 320))
+
+
+class FakeImageResponse:
+    status_code = 200
+    content = b"flux-image-bytes"
+
+
+def test_generate_reuses_cached_image_across_jobs(tmp_path, monkeypatch):
+    requests_made = []
+
+    def fake_get(url, timeout):
+        requests_made.append(url)
+        return FakeImageResponse()
+
+    monkeypatch.setattr(image_gen, "get_gemini_keys", lambda: [])
+    monkeypatch.setattr(image_gen.http_pool, "get", fake_get)
+    cache = image_gen.GeneratedImageCache(root=str(tmp_path / "cache"))
+
+    first = ImageGenerator(cache=cache).generate("solar roof at dusk", "scene_001.jpg", output_dir=str(tmp_path / "job_a"))
+    second = ImageGenerator(cache=cache).generate("solar roof at dusk", "scene_001.jpg", output_dir=str(tmp_path / "job_b"))
+
+    assert len(requests_made) == 1
+    assert "seed=" in requests_made[0]
+    assert first != second
+    assert Path(first).read_bytes() == Path(second).read_bytes() == b"flux-image-bytes"
+
+    # Apagar a cópia de um job não afeta o cache
+    Path(first).unlink()
+    ImageGenerator(cache=cache).generate("solar roof at dusk", "scene_001.jpg", output_dir=str(tmp_path / "job_c"))
+    assert len(requests_made) == 1
+
+
+def test_generate_falls_back_to_generation_when_cache_copy_fails(tmp_path, monkeypatch):
+    requests_made = []
+    monkeypatch.setattr(image_gen, "get_gemini_keys", lambda: [])
+    monkeypatch.setattr(image_gen.http_pool, "get", lambda url, timeout: requests_made.append(url) or FakeImageResponse())
+    cache = image_gen.GeneratedImageCache(root=str(tmp_path / "cache"))
+    ImageGenerator(cache=cache).generate("solar roof at dusk", "scene_001.jpg", output_dir=str(tmp_path / "job_a"))
+
+    materialize = cache.materialize
+    failures = []
+
+    def flaky_materialize(key, dest_path):
+        # Falha nas duas leituras do hit (Gemini e FLUX); a gravação do novo resultado funciona
+        if len(failures) < 2:
+            failures.append(key)
+            raise OSError("disco ilegível")
+        return materialize(key, dest_path)
+
+    monkeypatch.setattr(cache, "materialize", flaky_materialize)
+    result = ImageGenerator(cache=cache).generate("solar roof at dusk", "scene_001.jpg", output_dir=str(tmp_path / "job_b"))
+
+    assert len(requests_made) == 2
+    assert Path(result).read_bytes() == b"flux-image-bytes"
+
+
+def test_generated_image_cache_evicts_expired_entries(tmp_path):
+    cache = image_gen.GeneratedImageCache(root=str(tmp_path / "cache"), max_bytes=1_000_000, max_age=60)
+    old_key = cache.key("old prompt", "flux", 720, 1280, 1)
+    new_key = cache.key("new prompt", "flux", 720, 1280, 1)
+    old_path = cache.put_bytes(old_key, b"old")
+    cache.put_bytes(new_key, b"new")
+    os.utime(old_path, (1, 1))
+
+    assert cache.evict() == 3
+    assert cache.get(old_key) is None
+    assert cache.get(new_key) is not None
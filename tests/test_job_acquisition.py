@@ -0,0 +1,160 @@
+import importlib.util
+import os
+import threading
+from concurrent.futures import Future
+
+import pytest
+import requests
+
+from core import hub_client
+from core.job_acquisition import AdaptiveBackoff, JobAcquirer, LeasedJobQueue
+
+MOCK_SERVER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts", "mock_server.py")
+
+
+@pytest.fixture
+def mock_hub(monkeypatch):
+    spec = importlib.util.spec_from_file_location("mock_server", MOCK_SERVER)
+    mock_server = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mock_server)
+    mock_server.SSE_PING_INTERVAL = 0.2
+    server = mock_server.make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(hub_client, "HUB_BASE", f"http://127.0.0.1:{server.server_address[1]}")
+    yield mock_server
+    server.shutdown()
+    server.server_close()
+
+
+def test_backoff_grows_until_max_and_resets():
+    backoff = AdaptiveBackoff(min_delay=1, max_delay=5)
+    assert [backoff.next() for _ in range(5)] == [1, 2, 4, 5, 5]
+    backoff.reset()
+    assert backoff.next() == 1
+
+
+def test_poll_mode_backs_off_until_job_finishes():
+    acquirer = JobAcquirer(mode="poll", backoff=AdaptiveBackoff(min_delay=1, max_delay=8))
+    assert [acquirer.idle_delay() for _ in range(3)] == [1, 2, 4]
+    acquirer.job_finished()
+    assert acquirer.wake.is_set()
+    assert acquirer.idle_delay() == 1
+
+
+def _http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status}", response=response)
+
+
+def test_failed_job_does_not_wake_the_loop():
+    acquirer = JobAcquirer(mode="poll", backoff=AdaptiveBackoff(min_delay=1, max_delay=8))
+    failed, succeeded = Future(), Future()
+    failed.set_result(False)
+    succeeded.set_result(True)
+    acquirer.idle_delay()
+
+    acquirer.job_finished(failed)
+    assert not acquirer.wake.is_set()
+    assert acquirer.idle_delay() == 2
+
+    acquirer.job_finished(succeeded)
+    assert acquirer.wake.is_set()
+    assert acquirer.idle_delay() == 1
+
+
+def test_auto_downgrades_from_sse_to_long_poll_to_poll(monkeypatch):
+    def no_stream(idle_timeout=30):
+        raise _http_error(404)
+        yield  # pragma: no cover
+
+    calls = []
+    monkeypatch.setattr(hub_client, "stream_pending_jobs", no_stream)
+    monkeypatch.setattr(hub_client, "fetch_pending_job", lambda wait=0: calls.append(wait))
+    monkeypatch.setattr(hub_client, "HUB_LONG_POLL_SUPPORTED", False)
+
+    acquirer = JobAcquirer(mode="auto", wait=7)
+    assert acquirer.acquire() is None
+    assert acquirer.mode == "poll"
+    acquirer.acquire()
+    assert calls == [7, 0]
+
+
+def test_auto_keeps_mode_and_backs_off_on_connection_errors(monkeypatch):
+    def broken_stream(idle_timeout=30):
+        raise requests.ConnectionError("connection refused")
+        yield  # pragma: no cover
+
+    monkeypatch.setattr(hub_client, "stream_pending_jobs", broken_stream)
+    acquirer = JobAcquirer(mode="auto", wait=7, backoff=AdaptiveBackoff(min_delay=1, max_delay=8))
+    assert acquirer.acquire() is None
+    assert acquirer.mode == "sse"
+    assert [acquirer.idle_delay() for _ in range(3)] == [1, 2, 4]
+
+    # Long-poll sem resposta (HUB_LONG_POLL_SUPPORTED None) também não rebaixa para poll
+    acquirer.mode = "long-poll"
+    monkeypatch.setattr(hub_client, "fetch_pending_job", lambda wait=0: None)
+    monkeypatch.setattr(hub_client, "HUB_LONG_POLL_SUPPORTED", None)
+    assert acquirer.acquire() is None
+    assert acquirer.mode == "long-poll"
+    assert acquirer.idle_delay() == 8
+
+
+def test_long_poll_returns_job_enqueued_while_waiting(mock_hub):
+    acquirer = JobAcquirer(mode="long-poll", wait=5)
+    threading.Timer(0.2, mock_hub.enqueue_job, args=({"id": "lp1", "topic": "solar"},)).start()
+
+    job = acquirer.acquire()
+
+    assert job["id"] == "lp1"
+    assert hub_client.HUB_LONG_POLL_SUPPORTED
+
+
+def test_sse_stream_delivers_jobs_and_pings(mock_hub):
+    acquirer = JobAcquirer(mode="sse", wait=0.3)
+    mock_hub.enqueue_job({"id": "sse1", "topic": "batteries"})
+
+    assert acquirer.acquire()["id"] == "sse1"
+    # Fila vazia: o servidor manda `: ping` e o acquirer devolve None sem derrubar o stream
+    assert acquirer.acquire() is None
+    mock_hub.enqueue_job({"id": "sse2", "topic": "heat pumps"})
+    assert acquirer.acquire()["id"] == "sse2"
+    assert acquirer.mode == "sse"
+
+
+def test_leases_claim_batch_renew_and_release_on_shutdown(mock_hub):
+    for i in range(3):
+        mock_hub.enqueue_job({"id": f"L{i}", "topic": "lease"})
+    acquirer = JobAcquirer(mode="poll", leases=LeasedJobQueue(batch_size=2, ttl=60))
+
+    first = acquirer.acquire()
+    assert first["id"] == "L0"
+    # Um único request reservou o lote; o segundo job sai da fila local
+    assert [job["id"] for job in mock_hub.JOBS] == ["L2"]
+    assert acquirer.leases.held() == ["L0", "L1"]
+
+    # Lease perdido no Hub é descartado da fila local na renovação
+    mock_hub.release_leases(["L1"], requeue=False)
+    assert acquirer.renew_leases(force=True) == ["L1"]
+    acquirer.job_finished(job=first)
+    assert acquirer.leases.held() == []
+
+    mock_hub.enqueue_job({"id": "L3", "topic": "lease"})
+    assert acquirer.acquire()["id"] == "L2"
+    acquirer.close()
+    # L3 estava reservado sem começar: volta para o Hub; L0 e L2 seguem com o worker
+    assert [job["id"] for job in mock_hub.JOBS] == ["L3"]
+    assert sorted(mock_hub.LEASES) == ["L0", "L2"]
+
+
+def test_leases_fall_back_to_single_fetch_when_unsupported(monkeypatch):
+    calls = []
+    monkeypatch.setattr(hub_client, "lease_jobs", lambda limit, ttl=0, wait=0: calls.append(limit))
+    monkeypatch.setattr(hub_client, "fetch_pending_job", lambda wait=0: {"id": "single"})
+    acquirer = JobAcquirer(mode="poll", leases=LeasedJobQueue(batch_size=4))
+
+    assert acquirer.acquire()["id"] == "single"
+    assert acquirer.acquire()["id"] == "single"
+    assert calls == [4]
+    assert not acquirer.leases.supported
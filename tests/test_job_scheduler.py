@@ -0,0 +1,143 @@
+import multiprocessing
+import os
+import threading
+import time
+
+from core import job_scheduler
+from core.job_scheduler import JobScheduler, ResourceSlots, SlotPlan, plan_slots, shared_slot_semaphores
+from integration import worker
+
+
+def test_plan_slots_scales_with_cores_ram_and_profile(monkeypatch):
+    monkeypatch.setattr(job_scheduler, "MAX_CONCURRENT_JOBS", 0)
+    monkeypatch.setattr(job_scheduler, "NETWORK_SLOTS", 0)
+
+    final = plan_slots(cores=8, free_ram_mb=16000, profile_name="final")
+    assert (final.jobs, final.cpu, final.network) == (8, 4, 16)
+
+    # RAM curta limita os jobs; archive pesa mais por render
+    assert plan_slots(cores=8, free_ram_mb=2000, profile_name="final").jobs == 2
+    assert plan_slots(cores=8, free_ram_mb=16000, profile_name="archive").cpu == 2
+    assert plan_slots(cores=1, free_ram_mb=100, profile_name="draft").jobs == 1
+
+
+def test_resource_slots_bound_concurrency_per_kind():
+    slots = ResourceSlots(network=2, cpu=1)
+    running = {"cpu": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def ffmpeg():
+        with slots.cpu():
+            with lock:
+                running["cpu"] += 1
+                running["peak"] = max(running["peak"], running["cpu"])
+            time.sleep(0.02)
+            with lock:
+                running["cpu"] -= 1
+
+    threads = [threading.Thread(target=ffmpeg) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert running["peak"] == 1
+    assert slots.limits == {"network": 2, "cpu": 1}
+
+
+def test_shared_slots_bound_concurrency_across_instances():
+    manager = multiprocessing.get_context("spawn").Manager()
+    try:
+        shared = shared_slot_semaphores(manager, SlotPlan(jobs=2, network=2, cpu=1))
+        # Uma instância por processo do pool; aqui duas no mesmo processo bastam
+        first, second = ResourceSlots(2, 1, shared), ResourceSlots(2, 1, shared)
+        entered = threading.Event()
+
+        def ffmpeg():
+            with second.cpu():
+                entered.set()
+
+        with first.cpu():
+            thread = threading.Thread(target=ffmpeg)
+            thread.start()
+            assert not entered.wait(0.2)
+        thread.join(timeout=5)
+        assert entered.is_set()
+    finally:
+        manager.shutdown()
+
+
+def test_dispatch_jobs_fills_free_slots_from_hub_and_local_queue(tmp_path, monkeypatch):
+    queue = tmp_path / "queue"
+    queue.mkdir()
+    (queue / "cmd_1.txt").write_text("local one", encoding="utf-8")
+    (queue / "cmd_2.txt").write_text("local two", encoding="utf-8")
+    monkeypatch.setattr(worker, "SCRIPTS_DIR", str(queue))
+    pending = [{"id": "a"}]
+    monkeypatch.setattr(worker, "fetch_pending_job", lambda: pending.pop(0) if pending else None)
+
+    release = threading.Event()
+    started = []
+
+    def fake_job(arg):
+        started.append(arg)
+        release.wait(timeout=2)
+
+    monkeypatch.setattr(worker, "process_hub_job", fake_job)
+    monkeypatch.setattr(worker, "process_local_script", fake_job)
+    scheduler = JobScheduler(max_jobs=2)
+
+    assert worker.dispatch_jobs(scheduler) == 2
+    assert scheduler.free_slots() == 0
+    assert scheduler.submit(fake_job, "overflow") is None
+    assert sorted(p.name for p in queue.iterdir()) == ["cmd_1.running", "cmd_2.txt"]
+
+    release.set()
+    scheduler.shutdown(wait=True)
+    assert scheduler.active == 0
+
+
+def test_process_local_script_marks_done_or_requeues(tmp_path, monkeypatch):
+    queue = tmp_path / "queue"
+    queue.mkdir()
+    (queue / "cmd_1.txt").write_text("ok", encoding="utf-8")
+    (queue / "cmd_2.txt").write_text("fails", encoding="utf-8")
+    monkeypatch.setattr(worker, "SCRIPTS_DIR", str(queue))
+    monkeypatch.setattr(worker, "generate_video", lambda path: "out.mp4" if "cmd_1" in path else None)
+
+    assert worker.process_local_script(worker.claim_local_script())
+    assert not worker.process_local_script(worker.claim_local_script())
+    assert sorted(p.name for p in queue.iterdir()) == ["cmd_1.done", "cmd_2.failed"]
+
+    # Falha não volta para a fila na hora: só depois de POLL_INTERVAL
+    assert worker.claim_local_script() is None
+    failed = queue / "cmd_2.failed"
+    os.utime(failed, (failed.stat().st_atime, failed.stat().st_mtime - worker.POLL_INTERVAL))
+    assert worker.claim_local_script() == str(queue / "cmd_2.running")
+
+
+def test_process_local_script_downloads_remote_render(tmp_path, monkeypatch):
+    from core import remote_artifact
+
+    queue = tmp_path / "queue"
+    queue.mkdir()
+    (queue / "cmd_1.txt").write_text("remote", encoding="utf-8")
+    monkeypatch.setattr(worker, "SCRIPTS_DIR", str(queue))
+    render = tmp_path / "renders" / "HOMES_p1.mp4"
+    monkeypatch.setattr(
+        worker, "generate_video",
+        lambda path: remote_artifact.write_stub(str(render), {"video_url": "https://videolm.test/p1.mp4"}),
+    )
+    fetched = []
+
+    def fake_download(url, path, headers=None, expected_size=None):
+        fetched.append(url)
+        with open(path, "wb") as f:
+            f.write(b"mp4")
+
+    monkeypatch.setattr(remote_artifact.range_download, "download", fake_download)
+
+    # Fila local não tem Hub para receber a URL: o render precisa estar no disco
+    assert worker.process_local_script(worker.claim_local_script())
+    assert fetched == ["https://videolm.test/p1.mp4"]
+    assert render.read_bytes() == b"mp4"
@@ -0,0 +1,98 @@
+import json
+import os
+
+from core import media_probe
+
+
+class FakeCompletedProcess:
+    returncode = 0
+    stderr = ""
+
+    def __init__(self, duration="12.5"):
+        self.stdout = json.dumps(
+            {
+                "streams": [
+                    {"codec_type": "audio", "codec_name": "aac", "sample_rate": "44100"},
+                    {"codec_type": "video", "codec_name": "h264", "width": 720, "height": 1280, "r_frame_rate": "24/1"},
+                ],
+                "format": {"duration": duration},
+            }
+        )
+
+
+def _fake_ffprobe(monkeypatch, calls, duration="12.5"):
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd[-1])
+        return FakeCompletedProcess(duration)
+
+    monkeypatch.setattr(media_probe.subprocess, "run", fake_run)
+
+
+def test_probe_media_returns_summary_in_one_call(monkeypatch, tmp_path):
+    calls = []
+    _fake_ffprobe(monkeypatch, calls)
+    media_probe.clear_memory_cache()
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"video")
+
+    info = media_probe.probe_media(str(clip), db_path=str(tmp_path / "probe.sqlite"))
+
+    assert info["duration"] == 12.5
+    assert (info["width"], info["height"], info["fps"], info["codec"]) == (720, 1280, 24, "h264")
+    assert info["size_bytes"] == 5
+    assert len(info["streams"]) == 2
+    assert len(calls) == 1
+
+
+def test_probe_media_persists_across_processes(monkeypatch, tmp_path):
+    calls = []
+    _fake_ffprobe(monkeypatch, calls)
+    media_probe.clear_memory_cache()
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"video")
+    db_path = str(tmp_path / "probe.sqlite")
+
+    media_probe.probe_media(str(clip), db_path=db_path)
+    media_probe.clear_memory_cache()  # simula um novo processo
+    info = media_probe.probe_media(str(clip), db_path=db_path)
+
+    assert info["duration"] == 12.5
+    assert len(calls) == 1
+
+
+def test_probe_media_reprobes_when_file_changes(monkeypatch, tmp_path):
+    calls = []
+    _fake_ffprobe(monkeypatch, calls)
+    media_probe.clear_memory_cache()
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"video")
+    db_path = str(tmp_path / "probe.sqlite")
+
+    media_probe.probe_media(str(clip), db_path=db_path)
+    clip.write_bytes(b"a longer video")
+    stat = os.stat(clip)
+    os.utime(clip, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    _fake_ffprobe(monkeypatch, calls, duration="30")
+
+    assert media_probe.probe_media(str(clip), db_path=db_path)["duration"] == 30
+    assert len(calls) == 2
+
+
+def test_probe_media_does_not_cache_failures(monkeypatch, tmp_path):
+    class Failed:
+        returncode = 1
+        stdout = ""
+        stderr = "moov atom not found"
+
+    monkeypatch.setattr(media_probe.subprocess, "run", lambda cmd, **kwargs: Failed())
+    media_probe.clear_memory_cache()
+    clip = tmp_path / "partial.mp4"
+    clip.write_bytes(b"partial")
+    db_path = str(tmp_path / "probe.sqlite")
+
+    assert media_probe.probe_media(str(clip), db_path=db_path) == {}
+    assert media_probe.probe_media(str(tmp_path / "missing.mp4"), db_path=db_path) == {}
+
+    calls = []
+    _fake_ffprobe(monkeypatch, calls)
+    assert media_probe.probe_media(str(clip), db_path=db_path)["duration"] == 12.5
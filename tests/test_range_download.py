@@ -0,0 +1,114 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core import range_download
+
+DATA = bytes(range(256)) * 4  # 1 KB
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    ranges = []
+    drop_at = None   # início de faixa que cai no meio uma vez
+    accept_ranges = True
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        if not header or not self.accept_ranges:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(DATA)))
+            self.end_headers()
+            self.wfile.write(DATA)
+            return
+        start, _, end = header.split("=", 1)[1].partition("-")
+        start, end = int(start), min(int(end or len(DATA) - 1), len(DATA) - 1)
+        type(self).ranges.append(start)
+        body = DATA[start:end + 1]
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if start == type(self).drop_at:
+            type(self).drop_at = None
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return
+
+
+@pytest.fixture
+def server(monkeypatch):
+    RangeHandler.ranges = []
+    RangeHandler.drop_at = None
+    RangeHandler.accept_ranges = True
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setenv("DOWNLOAD_PART_MB", str(256 / 1_048_576))  # faixas de 256 bytes
+    monkeypatch.setenv("DOWNLOAD_CONNECTIONS", "3")
+    monkeypatch.setattr(range_download, "BUFFER_SIZE", 64)
+    monkeypatch.setattr(range_download.time, "sleep", lambda _: None)
+    yield f"http://127.0.0.1:{httpd.server_port}/video.mp4"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_parallel_ranges_resume_dropped_connection(server, tmp_path):
+    RangeHandler.drop_at = 512
+    dest = tmp_path / "renders" / "video.mp4"
+
+    range_download.download(server, str(dest), sha256=hashlib.sha256(DATA).hexdigest())
+
+    assert dest.read_bytes() == DATA
+    # 4 faixas + retomada da faixa 512 a partir do meio (640), sem baixar de novo o início
+    assert sorted(RangeHandler.ranges) == [0, 256, 512, 640, 768]
+    assert not (tmp_path / "renders" / "video.mp4.part").exists()
+    assert not (tmp_path / "renders" / "video.mp4.part.json").exists()
+
+
+def test_resumes_from_saved_progress(server, tmp_path):
+    dest = tmp_path / "video.mp4"
+    part = bytearray(len(DATA))
+    part[:512] = DATA[:512]
+    (tmp_path / "video.mp4.part").write_bytes(bytes(part))
+    (tmp_path / "video.mp4.part.json").write_text(
+        json.dumps({"url": server, "size": len(DATA), "part_size": 256, "done": [0, 256]})
+    )
+
+    range_download.download(server, str(dest))
+
+    assert dest.read_bytes() == DATA
+    assert sorted(RangeHandler.ranges) == [512, 768]
+
+
+def test_single_stream_without_range_support_and_checksum_mismatch(server, tmp_path):
+    RangeHandler.accept_ranges = False
+    dest = tmp_path / "video.mp4"
+
+    range_download.download(server, str(dest), expected_size=len(DATA))
+    assert dest.read_bytes() == DATA
+
+    with pytest.raises(range_download.DownloadError):
+        range_download.download(server, str(tmp_path / "bad.mp4"), sha256="0" * 64)
+    assert not (tmp_path / "bad.mp4").exists()
+    assert not (tmp_path / "bad.mp4.part").exists()
+
+
+def test_remote_artifact_is_fetched_on_demand(server, tmp_path):
+    from core import remote_artifact
+
+    dest = tmp_path / "HOMES_remote.mp4"
+    remote_artifact.write_stub(str(dest), {"video_url": server}, {"size_bytes": len(DATA), "codec": None})
+
+    assert remote_artifact.exists(str(dest))
+    assert remote_artifact.metadata(str(dest)) == {"size_bytes": len(DATA)}
+
+    assert remote_artifact.ensure_local(str(dest)) == str(dest)
+    assert dest.read_bytes() == DATA
+    assert not remote_artifact.is_remote(str(dest))
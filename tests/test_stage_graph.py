@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from core.stage_graph import StageError, StageGraph
+
+
+def test_stage_graph_passes_dependency_results():
+    graph = (
+        StageGraph()
+        .add("tts", lambda: "narration.wav")
+        .add("duration", lambda tts: len(tts), deps=["tts"])
+        .add("subtitles", lambda duration: f"subs:{duration}", deps=["duration"])
+    )
+
+    results = graph.run()
+
+    assert results == {"tts": "narration.wav", "duration": 13, "subtitles": "subs:13"}
+    assert set(graph.timings) == {"tts", "duration", "subtitles"}
+
+
+def test_stage_graph_runs_independent_stages_concurrently():
+    tts_started = threading.Event()
+
+    def tts():
+        tts_started.set()
+        return True
+
+    def scenes():
+        # Só termina se o TTS rodar ao mesmo tempo
+        assert tts_started.wait(timeout=2)
+        return ["scene_000.jpg"]
+
+    results = StageGraph(max_workers=2).add("scenes", scenes).add("tts", tts).run()
+
+    assert results["scenes"] == ["scene_000.jpg"]
+
+
+def test_stage_graph_skips_dependents_of_failed_stage():
+    ran = []
+
+    def tts():
+        raise RuntimeError("quota")
+
+    graph = (
+        StageGraph()
+        .add("tts", tts)
+        .add("subtitles", lambda tts: ran.append("subtitles"), deps=["tts"])
+    )
+
+    with pytest.raises(StageError) as excinfo:
+        graph.run()
+
+    assert excinfo.value.stage == "tts"
+    assert ran == []
+
+
+def test_stage_graph_rejects_unknown_dependency():
+    with pytest.raises(ValueError):
+        StageGraph().add("render", lambda scenes: None, deps=["scenes"])
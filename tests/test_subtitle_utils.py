@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from core import subtitle_utils
+
+
+def _timedelta_timestamp(seconds):
+    td = timedelta(seconds=max(0, seconds))
+    total = int(td.total_seconds())
+    return f"{total // 3600}:{(total % 3600) // 60:02d}:{total % 60:02d}.{int(td.microseconds / 10000):02d}"
+
+
+def test_centisecond_timestamps_match_timedelta_rounding():
+    for seconds in (0, -3, 1e-7, 0.005, 0.0099995, 2.675, 59.995, 3599.999, 3600.004999, 1.0000005, 123456.789):
+        assert subtitle_utils.format_ass_timestamp(seconds) == _timedelta_timestamp(seconds)
+
+
+class UpperOnlyStyle(subtitle_utils.KaraokeStyle):
+    def dialogue_text(self, words, index):
+        return f"[{words[index]}]"
+
+
+def test_streaming_writer_with_pluggable_style(tmp_path):
+    out = tmp_path / "subs.ass"
+
+    assert subtitle_utils.generate_ass_from_text("um dois três quatro", 5.0, str(out), style=UpperOnlyStyle())
+
+    content = out.read_text(encoding="utf-8")
+    assert not content.endswith("\n")
+    dialogues = [line.rsplit(",", 1)[1] for line in content.splitlines() if line.startswith("Dialogue")]
+    assert dialogues == ["[UM]", "[DOIS]", "[TRÊS]", "[QUATRO]"]
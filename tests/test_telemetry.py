@@ -0,0 +1,120 @@
+import os
+
+from core import telemetry
+from core.telemetry import HashedTelemetryDelta, RecentEvents, RendersCounter, StaticTelemetry, TelemetryDelta
+
+
+def test_renders_counter_tracks_new_growing_and_removed_files(tmp_path, monkeypatch):
+    renders = tmp_path / "renders"
+    renders.mkdir()
+    (renders / "a.mp4").write_bytes(b"x" * 100)
+    counter = RendersCounter(str(renders))
+
+    assert counter.refresh() == (100, 1)
+
+    # Render ainda sendo escrito: o diretório não muda, o arquivo cresce
+    with open(renders / "a.mp4", "ab") as f:
+        f.write(b"x" * 50)
+    assert counter.refresh() == (150, 1)
+
+    (renders / "b.mp4").write_bytes(b"y" * 10)
+    assert counter.refresh() == (160, 2)
+
+    os.remove(renders / "a.mp4")
+    assert counter.refresh() == (10, 1)
+
+
+def test_renders_counter_skips_stat_of_settled_files(tmp_path, monkeypatch):
+    renders = tmp_path / "renders"
+    renders.mkdir()
+    old = renders / "old.mp4"
+    old.write_bytes(b"x" * 100)
+    os.utime(old, (1_000_000, 1_000_000))
+    counter = RendersCounter(str(renders))
+    counter.refresh()
+
+    stats = []
+    real_stat_key = telemetry._stat_key
+    monkeypatch.setattr(telemetry, "_stat_key", lambda path: stats.append(path) or real_stat_key(path))
+
+    assert counter.refresh() == (100, 1)
+    assert stats == [str(renders)]
+
+
+def test_static_telemetry_rebuilds_only_when_recipes_change(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "recipes").mkdir()
+    builds = []
+    static = StaticTelemetry()
+    monkeypatch.setattr(static, "_build", lambda: builds.append(1) or {"recipes": len(builds)})
+
+    static.section()
+    static.section()
+    assert len(builds) == 1
+
+    (tmp_path / "recipes" / "new.json").write_text("{}")
+    assert static.section() == {"recipes": 2}
+
+
+def test_recent_events_requery_only_after_state_changes(tmp_path):
+    events = RecentEvents(str(tmp_path / "state.sqlite"), limit=5)
+    assert events.get() == []
+    first = events.get()
+
+    events._store.append_event("capability.completed", {"id": "demo"})
+    assert first is not events.get()
+    assert events.get()[0]["event_type"] == "capability.completed"
+
+
+def test_delta_omits_unchanged_sections_and_resends_after_failure():
+    delta = TelemetryDelta(full_every=3)
+    snapshot = {"engine_id": "e1", "ram_free_mb": 100, "capabilities": [1, 2], "recipes": ["r"]}
+
+    assert delta.payload(snapshot) == snapshot
+    delta.sent(snapshot, ok=True)
+
+    changed = {**snapshot, "ram_free_mb": 90, "recipes": ["r", "s"]}
+    payload = delta.payload(changed)
+    assert payload == {"engine_id": "e1", "ram_free_mb": 90, "recipes": ["r", "s"], "unchanged": ["capabilities"]}
+    delta.sent(changed, ok=False)
+
+    assert delta.payload(changed) == changed
+
+
+def test_full_protocol_sends_every_section_on_every_push():
+    delta = telemetry.telemetry_delta("full")
+    snapshot = {"engine_id": "e1", "capabilities": [1, 2], "recipes": ["r"]}
+
+    for _ in range(3):
+        assert delta.payload(snapshot) == snapshot
+        delta.sent(snapshot, ok=True)
+    assert isinstance(telemetry.telemetry_delta("sections"), TelemetryDelta)
+
+
+def test_dedupe_keys_drops_camel_case_twins():
+    value = {"artifactTypes": {"v": 1}, "artifact_types": {"v": 1}, "videolm": {"artifactTypes": 2, "artifact_types": 2}, "jobSlots": 3}
+    assert telemetry.dedupe_keys(value) == {"artifact_types": {"v": 1}, "videolm": {"artifact_types": 2}, "jobSlots": 3}
+
+
+def test_hashed_delta_sends_manifest_only_when_hash_changes():
+    delta = HashedTelemetryDelta(full_every=10)
+    manifest = {"capabilities": [{"id": "a"}], "recipes": []}
+    snapshot = {
+        "engine_id": "e1", "timestamp": "10:00:00", "ram_free_mb": 100, "renders_count": 2,
+        "runtime_manifest": manifest, "capabilities": [{"id": "a"}], "capabilities_count": 1,
+        "artifactTypes": {"video": 1}, "artifact_types": {"video": 1},
+    }
+
+    first = delta.payload(snapshot)
+    assert first["full"] and first["manifest"] == {"runtime_manifest": manifest, "artifact_types": {"video": 1}}
+    assert first["changed"] == {"ram_free_mb": 100, "renders_count": 2}
+    delta.sent(snapshot, ok=True)
+
+    second = delta.payload({**snapshot, "timestamp": "10:01:00", "ram_free_mb": 90})
+    assert second["manifest_hash"] == first["manifest_hash"]
+    assert "manifest" not in second
+    assert second["changed"] == {"ram_free_mb": 90} and second["removed"] == []
+
+    third = delta.payload({**snapshot, "runtime_manifest": {**manifest, "recipes": [{"id": "r"}]}})
+    assert third["manifest_hash"] != first["manifest_hash"]
+    assert third["manifest"]["runtime_manifest"]["recipes"] == [{"id": "r"}]
@@ -0,0 +1,72 @@
+import os
+
+from PIL import Image
+
+from core import upload_prep
+
+
+def test_negotiate_prefers_flac_then_opus_from_manifest(monkeypatch):
+    monkeypatch.setattr(upload_prep, "UPLOAD_AUDIO", "auto")
+
+    assert upload_prep.negotiate({"assemble": {"audioFormats": ["wav", "audio/opus", "flac"]}}).audio_format == "flac"
+    assert upload_prep.negotiate({"audio_formats": ["opus"]}).audio_format == "opus"
+    # Manifest sem declaração: WAV, que todo VideoLM aceita
+    assert upload_prep.negotiate({}).audio_format == "wav"
+
+
+def test_negotiate_size_prefers_manifest_over_profile():
+    assert upload_prep.negotiate({}, "720x1280").size == (720, 1280)
+    manifest = {"render": {"resolution": {"width": 1080, "height": 1920}}}
+    assert upload_prep.negotiate(manifest, "720x1280").size == (1080, 1920)
+
+
+def test_downsize_image_covers_target_without_crop_or_upscale(tmp_path):
+    big = tmp_path / "scene_000.jpg"
+    Image.new("RGB", (2000, 2000), (200, 40, 40)).save(big)
+    small = tmp_path / "scene_001.jpg"
+    Image.new("RGB", (600, 800), (40, 40, 200)).save(small)
+
+    resized = upload_prep.downsize_image(str(big), (720, 1280), str(tmp_path / "upload"))
+    with Image.open(resized) as img:
+        assert img.size == (1280, 1280)
+    assert upload_prep.downsize_image(str(small), (720, 1280), str(tmp_path / "upload")) == str(small)
+
+
+def test_downsize_image_redoes_output_when_target_size_changes(tmp_path):
+    big = tmp_path / "big.png"
+    Image.new("RGB", (2160, 3840), "white").save(big)
+    upload_dir = str(tmp_path / "upload")
+
+    small = upload_prep.downsize_image(str(big), (720, 1280), upload_dir)
+    large = upload_prep.downsize_image(str(big), (1080, 1920), upload_dir)
+
+    assert small != large
+    with Image.open(large) as img:
+        assert img.size == (1080, 1920)
+    assert upload_prep.downsize_image(str(big), (720, 1280), upload_dir) == small
+
+
+def test_transcode_audio_uses_ffmpeg_and_falls_back_to_wav(tmp_path, monkeypatch):
+    wav = tmp_path / "narration.wav"
+    wav.write_bytes(b"\0" * 4096)
+    commands = []
+
+    def fake_run(cmd, check, capture_output):
+        commands.append(cmd)
+        with open(cmd[-1], "wb") as f:
+            f.write(b"fLaC")
+
+    monkeypatch.setattr(upload_prep.subprocess, "run", fake_run)
+    flac = upload_prep.transcode_audio(str(wav), "flac", str(tmp_path / "upload"))
+    assert flac.endswith("narration.flac") and commands[0][commands[0].index("-c:a") + 1] == "flac"
+    assert upload_prep.content_type(flac) == "audio/flac"
+
+    # Reaproveita enquanto o WAV não muda
+    assert upload_prep.transcode_audio(str(wav), "flac", str(tmp_path / "upload")) == flac
+    assert len(commands) == 1
+
+    def missing_ffmpeg(cmd, check, capture_output):
+        raise FileNotFoundError("ffmpeg")
+
+    monkeypatch.setattr(upload_prep.subprocess, "run", missing_ffmpeg)
+    assert upload_prep.transcode_audio(str(wav), "opus", str(tmp_path / "upload")) == str(wav)
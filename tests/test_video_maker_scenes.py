@@ -24,3 +24,139 @@ def test_copy_broll_image(tmp_path):
     assert result == str(dest)
     assert dest.exists()
     assert dest.stat().st_size > 0
+
+
+def test_video_project_resumes_unfinished_project(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_maker, "CACHE_DIR", str(tmp_path / "cache"))
+    script = tmp_path / "job_42.txt"
+    script.write_text("A resumable script about solar homes.", encoding="utf-8")
+
+    first = video_maker.VideoProject(str(script), "demo")
+    Path(first.audio_file).write_bytes(b"wav" * 500)
+    first.manifest.record("tts", "hash", [first.audio_file], 0.0)
+
+    # Ainda rodando (dono vivo): não é retomado por outro job
+    assert video_maker._find_resumable_project("job_42", first.script_hash, "demo") is None
+    first.release("failed")
+
+    resumed = video_maker.VideoProject(str(script), "demo")
+    assert resumed.project_id == first.project_id
+    assert resumed.manifest.is_valid("tts", "hash")
+    assert not resumed.manifest.is_valid("tts", "other-hash")
+
+    resumed.manifest.set("status", "completed")
+    assert video_maker._find_resumable_project("job_42", first.script_hash, "demo") is None
+
+
+def test_video_project_does_not_resume_changed_script(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_maker, "CACHE_DIR", str(tmp_path / "cache"))
+    script = tmp_path / "job_43.txt"
+    script.write_text("First version of the script.", encoding="utf-8")
+    first = video_maker.VideoProject(str(script), "demo")
+
+    first.release("failed")
+    script.write_text("Second version of the script.", encoding="utf-8")
+
+    assert video_maker._find_resumable_project("job_43", video_maker._script_hash(str(script)), "demo") is None
+    assert video_maker._find_resumable_project("job_43", first.script_hash, "demo") == first.project_id
+
+
+def test_running_project_is_resumed_only_when_its_owner_died(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_maker, "CACHE_DIR", str(tmp_path / "cache"))
+    script = tmp_path / "job_44.txt"
+    script.write_text("A script whose worker crashed mid-render.", encoding="utf-8")
+    first = video_maker.VideoProject(str(script), "demo")
+    owner = first.manifest.data["owner"]
+
+    first.manifest.set("owner", {**owner, "pid": 4242})
+    monkeypatch.setattr(video_maker, "_pid_alive", lambda pid: pid != 4242)
+    resumed = video_maker.VideoProject(str(script), "demo")
+
+    assert resumed.project_id == first.project_id
+    assert resumed.manifest.data["owner"] == owner
+    assert video_maker._find_resumable_project("job_44", first.script_hash, "demo") is None
+
+
+def test_tts_stage_keeps_uploads_and_regenerates_stale_narration(tmp_path, monkeypatch):
+    monkeypatch.setattr(video_maker, "CACHE_DIR", str(tmp_path / "cache"))
+    script = tmp_path / "job_45.txt"
+    script.write_text("Narration uploaded by the user.", encoding="utf-8")
+    proj = video_maker.VideoProject(str(script), "demo")
+    generated = []
+
+    class FakeTTS:
+        def generate(self, content, path, voice=None):
+            generated.append(path)
+            Path(path).write_bytes(f"tts {voice}".encode())
+            return True
+
+    monkeypatch.setattr(video_maker, "GeminiTTS", FakeTTS)
+
+    # Narração colocada no projeto (não é saída de TTS anterior): fica
+    Path(proj.audio_file).write_bytes(b"user narration")
+    assert video_maker._run_tts_stage(proj, "Narration uploaded by the user.", "Kore")
+    assert Path(proj.audio_file).read_bytes() == b"user narration" and generated == []
+
+    # Saída de TTS com entradas antigas: gerada de novo, via arquivo temporário
+    proj.manifest.record("tts", "old", [proj.audio_file], 0.0, audio=video_maker._file_signature(proj.audio_file))
+    assert video_maker._run_tts_stage(proj, "Narration uploaded by the user.", "Puck")
+    assert Path(proj.audio_file).read_bytes() == b"tts Puck"
+    assert generated == [proj.audio_file.replace("narration.wav", "narration.partial.wav")]
+
+    # attach_audio registra o upload: vale mesmo com a voz trocada
+    upload = tmp_path / "voice.mp3"
+    upload.write_bytes(b"uploaded mp3")
+    proj.attach_audio(str(upload))
+    assert video_maker._run_tts_stage(proj, "Narration uploaded by the user.", "Kore")
+    assert proj.audio_file.endswith("narration.mp3") and len(generated) == 1
+    assert proj.manifest.get("tts")["outputs"] == [proj.audio_file]
+
+
+def test_extract_broll_frames_batches_scenes_per_video(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_extract_frames(video_path, frames, size="720x1280", keyframes=None):
+        calls.append((video_path, frames))
+        return [dest for _, dest in frames[:1]]
+
+    monkeypatch.setattr(video_maker, "_media_duration", lambda path: 20.0)
+    monkeypatch.setattr(video_maker.FFmpegEngine, "extract_frames", staticmethod(fake_extract_frames))
+    scenes = [(1, str(tmp_path / "scene_001.jpg")), (3, str(tmp_path / "scene_003.jpg"))]
+
+    result = video_maker._extract_broll_frames("broll.mp4", scenes, total_scenes=4)
+
+    assert len(calls) == 1
+    assert [round(ts, 2) for ts, _ in calls[0][1]] == [8.0, 16.0]
+    assert result == {1: str(tmp_path / "scene_001.jpg")}
+
+
+def test_tts_stage_edge_fallback_writes_mp3_with_word_timings(tmp_path, monkeypatch):
+    from core import alignment, tts_engine
+
+    monkeypatch.setattr(video_maker, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(alignment, "ALIGN_CACHE_DIR", str(tmp_path / "align"))
+    script = tmp_path / "job_46.txt"
+    script.write_text("Olá mundo", encoding="utf-8")
+    proj = video_maker.VideoProject(str(script), "demo")
+
+    class QuotaTTS:
+        def generate(self, content, path, voice=None):
+            return False
+
+    class FakeCommunicate:
+        def __init__(self, text, voice, boundary="SentenceBoundary"):
+            assert boundary == "WordBoundary"
+
+        async def stream(self):
+            yield {"type": "audio", "data": b"ID3mp3"}
+            yield {"type": "WordBoundary", "offset": 5_000_000, "duration": 3_000_000, "text": "Olá"}
+            yield {"type": "WordBoundary", "offset": 12_000_000, "duration": 4_000_000, "text": "mundo"}
+
+    monkeypatch.setattr(video_maker, "GeminiTTS", QuotaTTS)
+    monkeypatch.setattr(tts_engine.edge_tts, "Communicate", FakeCommunicate)
+
+    assert video_maker._run_tts_stage(proj, "Olá mundo", "Kore")
+    assert proj.audio_file.endswith("narration.mp3")
+    assert proj.manifest.get("tts")["outputs"] == [proj.audio_file]
+    timings = alignment.align(proj.audio_file, "Olá mundo")
+    assert [(t.start, t.end) for t in timings] == [(0.5, 0.8), (1.2, 1.6)]
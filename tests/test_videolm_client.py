@@ -5,12 +5,13 @@ from core import videolm_client
 
 
 class FakeResponse:
-    def __init__(self, ok=True, status_code=200, payload=None, text="", chunks=None):
+    def __init__(self, ok=True, status_code=200, payload=None, text="", chunks=None, headers=None):
         self.ok = ok
         self.status_code = status_code
         self._payload = payload or {}
         self.text = text
         self._chunks = chunks or [b"video-bytes"]
+        self.headers = headers or {}
 
     def json(self):
         return self._payload
@@ -22,6 +23,15 @@ class FakeResponse:
     def iter_content(self, chunk_size=8192):
         yield from self._chunks
 
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 def test_endpoint_uses_public_demo_contract_without_token(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://videolm-absolute-cinema.loca.lt")
@@ -74,7 +84,7 @@ def test_engine_demo_url_uses_base(monkeypatch):
 def test_fetch_engine_health(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     get = Mock(return_value=FakeResponse(payload={"status": "ok", "service": "VideoLM Engine Bridge"}))
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     health = videolm_client.fetch_engine_health()
 
@@ -85,7 +95,7 @@ def test_fetch_engine_health(monkeypatch):
 def test_fetch_engine_manifest(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     get = Mock(return_value=FakeResponse(payload={"name": "VideoLM Factory"}))
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     manifest = videolm_client.fetch_engine_manifest()
 
@@ -96,7 +106,7 @@ def test_fetch_engine_manifest(monkeypatch):
 def test_submit_notebooklm_video_posts_multipart(tmp_path, monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     post = Mock(return_value=FakeResponse(payload={"projectId": "nb1", "status": "submitted"}))
-    monkeypatch.setattr(videolm_client.requests, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
     asset = tmp_path / "source.txt"
     asset.write_text("asset")
 
@@ -130,7 +140,7 @@ def test_submit_notebooklm_video_posts_multipart(tmp_path, monkeypatch):
 def test_poll_notebooklm_video(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     get = Mock(return_value=FakeResponse(payload={"status": "completed", "videoUrl": "/videos/research_nb1.mp4"}))
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     result = videolm_client.poll_notebooklm_video("nb1")
 
@@ -151,7 +161,7 @@ def test_resolve_video_url(monkeypatch):
 def test_submit_studio_artifact_video_uses_notebooklm_bridge(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     post = Mock(return_value=FakeResponse(payload={"projectId": "studio1", "status": "submitted", "videoUrl": "/videos/studio1.mp4"}))
-    monkeypatch.setattr(videolm_client.requests, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
 
     result = videolm_client.submit_studio_artifact(
         project_id="studio1",
@@ -170,7 +180,7 @@ def test_submit_studio_artifact_video_uses_notebooklm_bridge(monkeypatch):
 def test_submit_studio_artifact_non_video_uses_generic_endpoint(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     post = Mock(return_value=FakeResponse(payload={"status": "submitted", "artifactUrl": "/artifacts/info.png"}))
-    monkeypatch.setattr(videolm_client.requests, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
 
     result = videolm_client.submit_studio_artifact(
         project_id="studio2",
@@ -202,7 +212,7 @@ def test_submit_studio_artifact_falls_back_to_legacy_research_flow(monkeypatch):
             FakeResponse(payload={"status": "submitted", "artifactUrl": "/artifacts/info.png"}),
         ]
     )
-    monkeypatch.setattr(videolm_client.requests, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
 
     result = videolm_client.submit_studio_artifact(
         project_id="studio2",
@@ -226,7 +236,7 @@ def test_normalize_artifact_type_aliases():
 def test_poll_studio_artifact_normalizes_url(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     get = Mock(return_value=FakeResponse(payload={"status": "completed", "imageUrl": "/images/info.png"}))
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     result = videolm_client.poll_studio_artifact("studio3", artifact_type="infographic")
 
@@ -238,8 +248,8 @@ def test_factory_infographic_assets_submit_and_poll(monkeypatch):
     monkeypatch.setenv("VIDEOLM_URL", "https://54-162-84-165.sslip.io")
     post = Mock(return_value=FakeResponse(payload={"status": "submitted", "jobId": "job1"}))
     get = Mock(return_value=FakeResponse(payload={"status": "completed", "imageUrl": "/images/job1.png"}))
-    monkeypatch.setattr(videolm_client.requests, "post", post)
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     submitted = videolm_client.submit_factory_infographic_assets("proj1", theme="Hack Club", urls=["https://hackclub.com/"])
     polled = videolm_client.poll_factory_infographic_assets("job1")
@@ -275,8 +285,8 @@ def test_assemble_posts_assets_polls_and_downloads_video(tmp_path, monkeypatch):
             FakeResponse(chunks=[b"mp4"]),
         ]
     )
-    monkeypatch.setattr(videolm_client.requests, "post", post)
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     result = videolm_client.assemble_via_videolm(
         audio_path=str(audio),
@@ -332,8 +342,8 @@ def test_assemble_falls_back_to_demo_endpoint(tmp_path, monkeypatch):
             FakeResponse(chunks=[b"fallback-mp4"]),
         ]
     )
-    monkeypatch.setattr(videolm_client.requests, "post", post)
-    monkeypatch.setattr(videolm_client.requests, "get", get)
+    monkeypatch.setattr(videolm_client.http_pool, "post", post)
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
 
     result = videolm_client.assemble_via_videolm(
         audio_path=str(audio),
@@ -346,3 +356,69 @@ def test_assemble_falls_back_to_demo_endpoint(tmp_path, monkeypatch):
     assert result == str(out_dir / "HOMES_fallback-project.mp4")
     assert post.call_args_list[0].args[0].endswith("/api/video/assemble")
     assert post.call_args_list[1].args[0].endswith("/api/video/demo/assemble")
+
+
+def test_render_poll_schedule_is_sparse_early_and_dense_near_completion():
+    schedule = videolm_client.RenderPollSchedule(initial=2, min_delay=1, max_delay=30)
+
+    # Sem progresso: cresce a partir do intervalo inicial
+    assert [schedule.next_delay() for _ in range(3)] == [2, 3.0, 4.5]
+
+    # 10% em 20s → ~160s restantes: consulta na metade, limitada ao máximo
+    schedule.observe(10, "rendering", now=100)
+    schedule.observe(20, "rendering", now=120)
+    assert schedule.next_delay() == 30
+
+    # 1%/s desde os 10% → 20s restantes
+    schedule.observe(80, "rendering", now=170)
+    assert schedule.next_delay() == 10
+
+    schedule.observe(92, "rendering", now=190)
+    assert schedule.next_delay() == 1
+
+    schedule.observe(None, "encoding", now=191)
+    assert schedule.next_delay() == 1
+
+
+def test_remote_artifact_mode_skips_download_and_reports_status_metadata(tmp_path, monkeypatch):
+    from core import hub_client
+
+    monkeypatch.setenv("VIDEOLM_URL", "https://videolm-absolute-cinema.loca.lt")
+    monkeypatch.setenv("VIDEOLM_REMOTE_ARTIFACTS", "1")
+    monkeypatch.setenv("VIDEOLM_POLL_INTERVAL", "0")
+    monkeypatch.setenv("VIDEOLM_POLL_TIMEOUT", "1")
+    monkeypatch.setattr(videolm_client.time, "sleep", lambda _: None)
+
+    audio = tmp_path / "narration.wav"
+    image = tmp_path / "scene.jpg"
+    audio.write_bytes(b"wav")
+    image.write_bytes(b"jpg")
+
+    monkeypatch.setattr(videolm_client.http_pool, "post", Mock(return_value=FakeResponse(payload={})))
+    get = Mock(return_value=FakeResponse(payload={
+        "status": "completed",
+        "videoPath": "/videos/remote.mp4",
+        "size": 2048,
+        "duration": 31.5,
+        "resolution": "1080x1920",
+    }))
+    monkeypatch.setattr(videolm_client.http_pool, "get", get)
+
+    result = videolm_client.assemble_via_videolm(
+        audio_path=str(audio),
+        image_paths=[str(image)],
+        script="hello",
+        project_id="remote",
+        output_dir=str(tmp_path / "renders"),
+    )
+
+    assert result == str(tmp_path / "renders" / "HOMES_remote.mp4")
+    assert get.call_count == 1  # só o status, nenhum download
+    assert not Path(result).exists()
+    assert hub_client._public_artifact_url(result) == "https://videolm-absolute-cinema.loca.lt/videos/remote.mp4"
+    assert hub_client._video_metadata(result) == {
+        "size_bytes": 2048,
+        "duration_seconds": 31.5,
+        "width": 1080,
+        "height": 1920,
+    }
@@ -80,3 +80,180 @@ def test_videolm_client_against_real_http_mock(tmp_path, monkeypatch):
 
     assert result == str(out_dir / "HOMES_http-integration.mp4")
     assert (out_dir / "HOMES_http-integration.mp4").read_bytes() == b"mock-mp4"
+
+
+class ChunkedVideoLMHandler(BaseHTTPRequestHandler):
+    assets = {}
+    known = set()
+    puts = []
+    fail_once = {"armed": True}
+    assembled = None
+
+    def _asset_hash(self):
+        return self.path.rsplit("/", 1)[-1]
+
+    def do_HEAD(self):
+        data = self.assets.get(self._asset_hash())
+        if data is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Upload-Offset", str(len(data)))
+        self.end_headers()
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+        start = int(self.headers["Content-Range"].split()[1].split("-")[0])
+        data = self.assets.setdefault(self._asset_hash(), bytearray())
+        if start == len(data):
+            data.extend(body)
+        type(self).puts.append(start)
+        if start > 0 and self.fail_once["armed"]:
+            # Parte recebida, mas a resposta "se perde": o cliente precisa retomar pelo HEAD
+            self.fail_once["armed"] = False
+            self.send_error(502)
+            return
+        self.send_response(200)
+        self.send_header("Upload-Offset", str(len(data)))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/video/demo/assets/check":
+            self._json(200, {"known": [h for h in payload["hashes"] if h in self.known]})
+            return
+        if self.path == "/api/video/demo/assemble/refs":
+            type(self).assembled = payload
+            self._json(200, {"videoUrl": "/videos/chunked.mp4"})
+            return
+        self.send_error(404)
+
+    def do_GET(self):
+        if self.path == "/api/video/chunked/status":
+            self._json(200, {"status": "completed", "videoPath": "/videos/chunked.mp4"})
+            return
+        if self.path == "/videos/chunked.mp4":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"chunked-mp4")
+            return
+        self.send_error(404)
+
+    _json = VideoLMMockHandler._json
+
+    def log_message(self, format, *args):
+        return
+
+
+def test_chunked_upload_skips_known_assets_and_resumes_failed_part(tmp_path, monkeypatch):
+    import hashlib
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ChunkedVideoLMHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    audio = tmp_path / "narration.wav"
+    image = tmp_path / "scene.jpg"
+    audio.write_bytes(b"wav-already-uploaded")
+    image_bytes = bytes(range(40))
+    image.write_bytes(image_bytes)
+    ChunkedVideoLMHandler.known = {hashlib.sha256(audio.read_bytes()).hexdigest()}
+
+    monkeypatch.setenv("VIDEOLM_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.delenv("VIDEOLM_TOKEN", raising=False)
+    monkeypatch.delenv("VIDEOLM_ASSEMBLE_PATH", raising=False)
+    monkeypatch.setenv("VIDEOLM_UPLOAD_MODE", "chunked")
+    monkeypatch.setenv("VIDEOLM_CHUNK_MB", str(16 / 1_048_576))  # partes de 16 bytes
+    monkeypatch.setenv("VIDEOLM_POLL_INTERVAL", "0")
+    monkeypatch.setenv("VIDEOLM_POLL_TIMEOUT", "1")
+    monkeypatch.setattr(videolm_client.time, "sleep", lambda _: None)
+
+    try:
+        result = videolm_client.assemble_via_videolm(
+            audio_path=str(audio),
+            image_paths=[str(image)],
+            script="script",
+            project_id="chunked",
+            output_dir=str(tmp_path / "renders"),
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    assert result == str(tmp_path / "renders" / "HOMES_chunked.mp4")
+    assert bytes(ChunkedVideoLMHandler.assets[image_hash]) == image_bytes
+    # 0, 16 (falhou após gravar), retomada em 32 — nenhuma parte reenviada
+    assert ChunkedVideoLMHandler.puts == [0, 16, 32]
+    assert ChunkedVideoLMHandler.assembled["images"][0]["hash"] == image_hash
+    assert ChunkedVideoLMHandler.assembled["audio"]["hash"] in ChunkedVideoLMHandler.known
+
+
+class StreamingStatusHandler(BaseHTTPRequestHandler):
+    status_polls = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        self._json(200, {"videoUrl": "/videos/streamed.mp4"})
+
+    def do_GET(self):
+        if self.path == "/api/video/streamed/events":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.end_headers()
+            for event in ({"status": "processing", "progress": 40}, {"status": "completed", "videoPath": "/videos/streamed.mp4"}):
+                self.wfile.write(b": ping\n\n")
+                self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            return
+        if self.path == "/api/video/streamed/status":
+            type(self).status_polls += 1
+            self._json(200, {"status": "processing"})
+            return
+        if self.path == "/videos/streamed.mp4":
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"streamed-mp4")
+            return
+        self.send_error(404)
+
+    _json = VideoLMMockHandler._json
+
+    def log_message(self, format, *args):
+        return
+
+
+def test_status_stream_replaces_polling(tmp_path, monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingStatusHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    audio = tmp_path / "narration.wav"
+    image = tmp_path / "scene.jpg"
+    audio.write_bytes(b"wav")
+    image.write_bytes(b"jpg")
+
+    monkeypatch.setenv("VIDEOLM_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.delenv("VIDEOLM_TOKEN", raising=False)
+    monkeypatch.setenv("VIDEOLM_ASSEMBLE_PATH", "/api/video/assemble")
+    monkeypatch.setenv("VIDEOLM_STATUS_STREAM", "on")
+    monkeypatch.setenv("VIDEOLM_POLL_TIMEOUT", "5")
+
+    try:
+        result = videolm_client.assemble_via_videolm(
+            audio_path=str(audio),
+            image_paths=[str(image)],
+            script="script",
+            project_id="streamed",
+            output_dir=str(tmp_path / "renders"),
+        )
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert result == str(tmp_path / "renders" / "HOMES_streamed.mp4")
+    assert (tmp_path / "renders" / "HOMES_streamed.mp4").read_bytes() == b"streamed-mp4"
+    assert StreamingStatusHandler.status_polls == 0
@@ -0,0 +1,115 @@
+import math
+import threading
+
+from core import videolm_tracker
+from core.runtime import StateStore
+from core.videolm_tracker import VideoLMTracker
+
+
+class FakeResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        pass
+
+
+def test_tracker_multiplexes_jobs_and_persists_state(tmp_path, monkeypatch):
+    monkeypatch.setenv("VIDEOLM_URL", "https://videolm.test")
+    render_statuses = iter([
+        {"status": "processing", "progress": 40, "stage": "rendering"},
+        {"status": "completed", "videoPath": "/videos/r1.mp4"},
+    ])
+
+    def fake_get(url, **kwargs):
+        if url.endswith("/api/video/r1/status"):
+            return FakeResponse(next(render_statuses))
+        if url.endswith("/api/research/s1/download"):
+            return FakeResponse({"status": "completed", "artifactUrl": "/artifacts/s1.png"})
+        raise AssertionError(url)
+
+    monkeypatch.setattr(videolm_tracker.videolm_client.http_pool, "get", fake_get)
+    state = StateStore(str(tmp_path / "state.sqlite"))
+    tracker = VideoLMTracker(state)
+    done = []
+    tracker.add_listener(lambda record: done.append(record["job_id"]))
+    studio_results = []
+
+    tracker.track("render", "r1", timeout=600)
+    tracker.track("studio", "s1", artifact_type="infographic", timeout=600, on_done=studio_results.append)
+
+    assert tracker.poll_once(now=math.inf) == 2
+    assert done == ["s1"]
+    assert studio_results[0]["result"]["artifact_url"] == "https://videolm.test/artifacts/s1.png"
+    assert [job["job_id"] for job in tracker.pending()] == ["r1"]
+    assert state.get("videolm_jobs", "render:r1")["progress"] == 40
+
+    # Reinício do engine: outro tracker retoma o render pelo StateStore
+    restarted = VideoLMTracker(state)
+    assert restarted.resume() == 1
+    restarted.add_listener(lambda record: done.append(record["job_id"]))
+    assert restarted.poll_once(now=math.inf) == 1
+
+    assert done == ["s1", "r1"]
+    assert restarted.pending() == []
+    assert state.get("videolm_jobs", "render:r1")["status"] == "completed"
+    assert [event["event_type"] for event in state.recent_events()] == ["videolm.job.completed"] * 2
+
+
+def test_unexpected_poll_error_stays_with_its_job(monkeypatch):
+    def flaky_studio(record):
+        if record["job_id"] == "bad":
+            raise KeyError("artifacts")
+        return {"status": "completed"}
+
+    monkeypatch.setitem(videolm_tracker.POLLERS, "studio", flaky_studio)
+    tracker = VideoLMTracker()
+    done = []
+    tracker.add_listener(lambda record: done.append(record["job_id"]))
+    tracker.track("studio", "bad", timeout=600)
+    tracker.track("studio", "good", timeout=600)
+
+    assert tracker.poll_once(now=math.inf) == 2
+    assert done == ["good"]
+    bad = tracker.pending()[0]
+    assert bad["job_id"] == "bad" and bad["next_poll_at"] > bad["submitted_at"]
+
+
+def test_failed_render_download_is_retried_not_dropped(monkeypatch):
+    monkeypatch.setitem(videolm_tracker.POLLERS, "render", lambda record: {"status": "completed", "videoPath": "/v.mp4"})
+    downloads = iter([None, "/renders/HOMES_r2.mp4"])
+    monkeypatch.setattr(videolm_tracker.videolm_client, "_download_render", lambda *a: next(downloads))
+    tracker = VideoLMTracker()
+    done = []
+    tracker.add_listener(done.append)
+    tracker.track("render", "r2", output_dir="renders", timeout=600)
+
+    tracker.poll_once(now=math.inf)
+    assert done == [] and tracker.pending()[0]["job_id"] == "r2"
+
+    tracker.poll_once(now=math.inf)
+    assert [(r["status"], r["output_path"]) for r in done] == [("completed", "/renders/HOMES_r2.mp4")]
+
+
+def test_assemble_tracked_polls_from_the_tracker_thread(monkeypatch):
+    monkeypatch.setattr(videolm_tracker.videolm_client, "submit_assembly",
+                        lambda *a: {"project_id": "p1", "video_url": "/api/video/p1/download"})
+    threads = set()
+
+    def fake_poll(record):
+        threads.add(threading.current_thread().name)
+        return {"status": "completed"}
+
+    monkeypatch.setitem(videolm_tracker.POLLERS, "render", fake_poll)
+    monkeypatch.setattr(videolm_tracker.videolm_client, "_download_render", lambda s, url, pid, out, h: f"{out}/HOMES_{pid}.mp4")
+    tracker = VideoLMTracker(workers=1)
+    try:
+        path = videolm_tracker.assemble_tracked("a.wav", ["s.jpg"], "texto", "p1", output_dir="renders", tracker=tracker)
+    finally:
+        tracker.stop()
+
+    assert path == "renders/HOMES_p1.mp4"
+    assert threads == {"videolm-poll_0"}